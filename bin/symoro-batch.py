@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+# This file is part of the OpenSYMORO project. Please see
+# https://github.com/symoro/symoro/blob/master/LICENCE for the licence.
+
+
+"""
+This script generates the models of several robots in parallel without
+the GUI. The output files are written next to the PAR files.
+"""
+
+
+import argparse
+import sys
+import time
+
+from symoroutils import batch
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate SYMORO models from PAR files in parallel.'
+    )
+    parser.add_argument(
+        'par_files', nargs='+', metavar='PAR_FILE',
+        help='robot description files'
+    )
+    parser.add_argument(
+        '-m', '--models', default=','.join(batch.MODELS.keys()),
+        help='comma separated list of models among %(default)s'
+    )
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=None,
+        help='number of worker processes (default: number of CPUs)'
+    )
+    parser.add_argument(
+        '--cache', action='store_true',
+        help='use the on-disk model cache'
+    )
+    args = parser.parse_args()
+    kinds = [kind.strip() for kind in args.models.split(',') if kind]
+    for kind in kinds:
+        if kind not in batch.MODELS:
+            parser.error('unknown model: %s' % kind)
+    def report(result):
+        print(batch.format_result(result))
+        sys.stdout.flush()
+    start = time.time()
+    results = batch.run_batch(
+        args.par_files, kinds, processes=args.jobs,
+        use_cache=args.cache, callback=report
+    )
+    print('')
+    print(batch.format_summary(results, time.time() - start))
+    if any(result.error is not None for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
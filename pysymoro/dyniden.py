@@ -12,12 +12,14 @@ Identification model.
 
 
 import copy
+import multiprocessing
 
 import sympy
 
 from pysymoro.geometry import compute_rot_trans
 from pysymoro.kinematics import compute_vel_acc
 from symoroutils.paramsinit import ParamsInit
+from symoroutils import symbolmgr
 from symoroutils import tools
 
 
@@ -103,7 +105,7 @@ def _compute_joint_torque(robo, symo, name, j, Fjnt, Njnt):
         tau = (robo.sigma[j] * Fjnt[j]) + ((1 - robo.sigma[j]) * Njnt[j])
         fric_rotor = robo.fric_s(j) + robo.fric_v(j) + robo.tau_ia(j)
         tau_total = tau[2] + fric_rotor
-    symo.replace(tau_total, get_symbol('DG', name, j), forced=True)
+    return symo.replace(tau_total, get_symbol('DG', name, j), forced=True)
 
 
 def _compute_joint_torque_deriv(symo, param, arg, index):
@@ -124,60 +126,214 @@ def _compute_joint_torque_deriv(symo, param, arg, index):
         symo.replace(arg, 'DG', index, forced=True)
 
 
-def dynamic_identification_model(robo, symo):
+def _compute_param_model(robo_tmp, symo, name, k, kin):
+    """
+    Compute the joint torques due to a single non-zero inertial
+    parameter of link k (internal function). `robo_tmp` has this
+    parameter set to 1 and all the others set to 0.
+
+    Note:
+        kin is the tuple (antRj, antPj, w, wdot, vdot, U)
+
+    Returns:
+        The list of the symbols created with forced replacement (base
+        reaction wrench and joint torques).
+    """
+    antRj, antPj, w, wdot, vdot, U = kin
+    F = ParamsInit.init_vec(robo_tmp)
+    N = ParamsInit.init_vec(robo_tmp)
+    Fjnt = ParamsInit.init_vec(robo_tmp)
+    Njnt = ParamsInit.init_vec(robo_tmp)
+    # compute the total forcec of the link k
+    _compute_dynamic_wrench(
+        robo_tmp, symo, name, k, w, wdot, U, vdot, F, N
+    )
+    # init external forces
+    Fex = ParamsInit.init_vec(robo_tmp)
+    Nex = ParamsInit.init_vec(robo_tmp)
+    # only the joints between link k and the base are affected
+    chain = robo_tmp.chain(k)
+    for j in chain:
+        _compute_reaction_wrench(
+            robo_tmp, symo, name, j, antRj, antPj,
+            vdot, F, N, Fjnt, Njnt, Fex, Nex
+        )
+    # reaction wrench for base
+    _compute_base_reaction_wrench(
+        robo_tmp, symo, name, antRj, antPj,
+        vdot, F, N, Fex, Nex, Fjnt, Njnt
+    )
+    forced = list(Fjnt[0]) + list(Njnt[0])
+    for j in reversed(chain):
+        forced.append(
+            _compute_joint_torque(robo_tmp, symo, name, j, Fjnt, Njnt)
+        )
+    return forced
+
+
+# state shared by the jobs of a worker process, set by _init_worker
+_worker_state = {}
+
+
+def _init_worker(robo_tmp, kin, sydi):
+    """
+    Store the data common to all the per-parameter jobs in the worker
+    process (internal function). The symbol manager holding the
+    kinematic equations is built once and restored after each job.
+    """
+    _worker_state['robo'] = robo_tmp
+    _worker_state['kin'] = kin
+    _worker_state['symo'] = symbolmgr.SymbolManager(None, sydi)
+    _worker_state['revdi'] = symbolmgr.SignedRevDict(
+        (sydi[sym], sym) for sym in sydi
+    )
+
+
+def _param_job(job):
+    """
+    Compute the model of one inertial parameter in a worker process
+    (internal function).
+
+    Args:
+        job: A tuple (k, i, name) with the link number, the index of
+            the parameter and the name suffix of the symbols.
+
+    Returns:
+        The list of the (symbol, expression, forced) tuples created for
+        this parameter in order.
+    """
+    k, i, name = job
+    robo_tmp = _worker_state['robo']
+    symo = _worker_state['symo']
+    symo.order_list = []
+    mask = sympy.zeros(10, 1)
+    mask[i] = 1
+    robo_tmp.put_inert_param(mask, k)
+    try:
+        forced = _compute_param_model(
+            robo_tmp, symo, name, k, _worker_state['kin']
+        )
+    finally:
+        robo_tmp.put_inert_param(sympy.zeros(10, 1), k)
+    forced = set(forced)
+    model = [
+        (sym, symo.sydi[sym], sym in forced) for sym in symo.order_list
+    ]
+    _remove_param_model(symo, model, _worker_state['revdi'])
+    return model
+
+
+def _remove_param_model(symo, model, base_revdi):
+    """
+    Remove the equations of a job from the symbol manager of the worker
+    process so that it only holds the kinematic equations again
+    (internal function).
+    """
+    for sym, expr, _ in model:
+        del symo.sydi[sym]
+        if symo.revdi.get(expr) == sym:
+            del symo.revdi[expr]
+            base_sym = base_revdi.get(expr)
+            if base_sym is not None:
+                symo.revdi[expr] = base_sym
+    symo.order_list = []
+    # the memoized results may refer to the removed symbols
+    symo.clear_caches()
+
+
+def _merge_param_model(symo, model, remap):
+    """
+    Add the symbols computed by a worker process to the symbol manager
+    (internal function). The expressions go through
+    `SymbolManager.replace` so that a symbol that was not forced and
+    whose expression is already known, or is reduced to an atom by the
+    previous replacements, is not added but replaced by the known
+    symbol or the atom in the following expressions.
+
+    Note:
+        remap is the output parameter
+    """
+    for sym, expr, forced in model:
+        if isinstance(expr, sympy.Basic):
+            expr = expr.xreplace(remap)
+        new_sym = symo.replace(expr, sym, forced=forced)
+        if new_sym != sym:
+            remap[sym] = new_sym
+
+
+def _compute_param_models(symo, robo_tmp, kin, jobs, processes):
+    """
+    Compute the models of all the inertial parameters with a pool of
+    worker processes (internal function).
+
+    Returns:
+        A dict with the list of (symbol, expression, forced) tuples of
+        each job.
+    """
+    pool = multiprocessing.Pool(
+        processes, _init_worker, (robo_tmp, kin, symo.sydi)
+    )
+    try:
+        results = pool.map(_param_job, jobs, 1)
+    finally:
+        pool.close()
+        pool.join()
+    return dict(zip(jobs, results))
+
+
+def dynamic_identification_model(robo, symo, processes=1):
     """
     Compute the Dynamic Identification model of a robot using
     Newton-Euler algorithm.
+
+    The model of each inertial parameter is independent from the
+    others. With `processes` different from 1 these models are
+    computed in parallel by a pool of worker processes (`None` means
+    the number of CPUs) and merged in `symo` in the same order as in
+    the sequential computation so that the output is the same.
     """
-    # init forces vectors
-    Fjnt = ParamsInit.init_vec(robo)
-    Njnt = ParamsInit.init_vec(robo)
     # init transformation
     antRj, antPj = compute_rot_trans(robo, symo)
     # init velocities and accelerations
     w, wdot, vdot, U = compute_vel_acc(
         robo, symo, antRj, antPj, floating=True
     )
+    kin = (antRj, antPj, w, wdot, vdot, U)
     # virtual robot with only one non-zero parameter at once
     robo_tmp = copy.deepcopy(robo)
     robo_tmp.IA = sympy.zeros(robo.NL, 1)
     robo_tmp.FV = sympy.zeros(robo.NL, 1)
     robo_tmp.FS = sympy.zeros(robo.NL, 1)
     # start link number
-    is_fixed = False if robo.is_floating or robo.is_mobile else True
     start_link = 0
+    jobs = []
     for k in xrange(start_link, robo.NL):
         param_vec = robo.get_inert_param(k)
-        F = ParamsInit.init_vec(robo)
-        N = ParamsInit.init_vec(robo)
         for i in xrange(10):
             if param_vec[i] == tools.ZERO:
                 continue
             # change link names according to current non-zero parameter
             name = '{index}{element}' + str(param_vec[i])
+            jobs.append((k, i, name))
+    if processes != 1 and len(jobs) > 1:
+        models = _compute_param_models(
+            symo, robo_tmp, kin, jobs, processes
+        )
+    else:
+        models = None
+    remap = {}
+    for k in xrange(start_link, robo.NL):
+        for job in jobs:
+            if job[0] != k:
+                continue
+            if models is not None:
+                _merge_param_model(symo, models[job], remap)
+                continue
             # set the parameter to 1
             mask = sympy.zeros(10, 1)
-            mask[i] = 1
+            mask[job[1]] = 1
             robo_tmp.put_inert_param(mask, k)
-            # compute the total forcec of the link k
-            _compute_dynamic_wrench(
-                robo_tmp, symo, name, k, w, wdot, U, vdot, F, N
-            )
-            # init external forces
-            Fex = ParamsInit.init_vec(robo)
-            Nex = ParamsInit.init_vec(robo)
-            for j in reversed(xrange(1, k + 1)):
-                _compute_reaction_wrench(
-                    robo_tmp, symo, name, j, antRj, antPj,
-                    vdot, F, N, Fjnt, Njnt, Fex, Nex
-                )
-            # reaction wrench for base
-            _compute_base_reaction_wrench(
-                robo_tmp, symo, name, antRj,antPj,
-                vdot, F, N, Fex, Nex, Fjnt, Njnt
-            )
-            for j in xrange(1, k + 1):
-                _compute_joint_torque(robo_tmp, symo, name, j, Fjnt, Njnt)
+            _compute_param_model(robo_tmp, symo, job[2], k, kin)
         # reset all the parameters to zero
         robo_tmp.put_inert_param(sympy.zeros(10, 1), k)
         # compute model for the joint parameters
@@ -193,5 +349,3 @@ def dynamic_identification_model(robo, symo):
             symo, robo.FV[k], robo.qdot[k], k
         )
     return symo
-
-
@@ -12,6 +12,7 @@ import copy
 from sympy import Matrix
 from sympy import sign
 
+from pysymoro import numdynmodel
 from pysymoro.screw import Screw
 from pysymoro.screw6 import Screw6
 from symoroutils.tools import skew
@@ -567,7 +568,7 @@ def _compute_star_inertia(model, robo, j, i):
     """
     i_inertia_i_s = Screw6()
     # local variables
-    j_s_i = robo.geos[j].tmat.s_j_wrt_i
+    j_s_i = robo.geos[j].tmat.s_i_wrt_j
     i_inertia_i = model.star_inertias[i].val
     j_k_j = model.no_qddot_inertias[j].val
     # actual computation
@@ -593,7 +594,7 @@ def _compute_star_beta(model, robo, j, i):
     """
     i_beta_i_s = Screw()
     # local variables
-    j_s_i = robo.geos[j].tmat.s_j_wrt_i
+    j_s_i = robo.geos[j].tmat.s_i_wrt_j
     i_beta_i = model.star_betas[i].val
     j_alpha_j = model.alphas[j].val
     # actual computation
@@ -618,7 +619,7 @@ def _compute_joint_acceleration(model, robo, j, i):
     """
     # local variables
     j_a_j = robo.geos[j].axisa
-    j_s_i = robo.geos[j].tmat.s_j_wrt_i
+    j_s_i = robo.geos[j].tmat.s_i_wrt_j
     j_gamma_j = model.gammas[j].val
     j_inertia_j_s = model.star_inertias[j].val
     j_beta_j_s = model.star_betas[j].val
@@ -649,7 +650,7 @@ def _compute_reaction_wrench_alpha(model, robo, j, i):
     """
     j_f_j = Screw()
     # local variables
-    j_s_i = robo.geos[j].tmat.s_j_wrt_i
+    j_s_i = robo.geos[j].tmat.s_i_wrt_j
     j_k_j = model.no_qddot_inertias[j].val
     j_alpha_j = model.alphas[j].val
     i_vdot_i = model.accels[i].val
@@ -697,6 +698,108 @@ def _compute_base_acceleration(model, robo):
     return model
 
 
+def _screw_of_array(vec):
+    """
+    Convert a NumPy array of size 6 from the numeric engine to a Screw.
+    """
+    screw = Screw()
+    screw.val = Matrix([float(val) for val in vec])
+    return screw
+
+
+def _screw6_of_array(mat):
+    """
+    Convert a (6x6) NumPy array from the numeric engine to a Screw6.
+    """
+    return Screw6(Matrix(6, 6, [float(val) for val in mat.flat]))
+
+
+def _numeric_inverse_dynamic_model(robo):
+    """
+    Compute the inverse dynamic model for the given robot with the
+    numeric engine. The recursion is the same as in
+    `inverse_dynamic_model` but runs on NumPy arrays.
+
+    Args:
+        robo: An instance of the FloatingRobot class whose parameters
+            are all numbers.
+
+    Returns:
+        The inverse dynamic model of the robot with the same Screw and
+        Screw6 components as the symbolic computation, filled with
+        floats. The torques are floats. The values are equal to the
+        ones of the symbolic computation up to the floating point
+        rounding.
+
+    Note:
+        The conversion of the NumPy buffers to Screw and Screw6 takes
+        most of the time. To evaluate the model many times, use the
+        methods of `robo.numeric_engine` that return NumPy arrays.
+    """
+    engine = robo.numeric_engine
+    q, qdot, qddot = numdynmodel.joint_state(robo)
+    engine.inverse_dynamic_model(q, qdot, qddot)
+    model = DynModel(robo.joint_nums, robo.is_symbolic, 'inverse')
+    for j in robo.joint_nums:
+        model.vels[j] = _screw_of_array(engine.vels[j])
+        model.gammas[j] = _screw_of_array(engine.gammas[j])
+        model.zetas[j] = _screw_of_array(engine.zetas[j])
+        model.betas[j] = _screw_of_array(engine.betas[j])
+        model.accels[j] = _screw_of_array(engine.accels[j])
+        model.wrenchs[j] = _screw_of_array(engine.wrenchs[j])
+        model.composite_inertias[j] = _screw6_of_array(
+            engine.composite_inertias[j]
+        )
+        model.composite_betas[j] = _screw_of_array(
+            engine.composite_betas[j]
+        )
+        if j != 0:
+            model.torques[j] = float(engine.torques[j])
+    return model
+
+
+def _numeric_direct_dynamic_model(robo):
+    """
+    Compute the direct dynamic model for the given robot with the
+    numeric engine. The recursion is the same as in
+    `direct_dynamic_model` but runs on NumPy arrays.
+
+    Args:
+        robo: An instance of the FloatingRobot class whose parameters
+            are all numbers.
+
+    Returns:
+        The direct dynamic model of the robot with the same Screw and
+        Screw6 components as the symbolic computation, filled with
+        floats. The joint accelerations are floats. The values are
+        equal to the ones of the symbolic computation up to the
+        floating point rounding.
+    """
+    engine = robo.numeric_engine
+    q, qdot, _ = numdynmodel.joint_state(robo)
+    torques = numdynmodel.joint_torques(robo)
+    engine.direct_dynamic_model(q, qdot, torques)
+    model = DynModel(robo.joint_nums, robo.is_symbolic, 'direct')
+    for j in robo.joint_nums:
+        model.vels[j] = _screw_of_array(engine.vels[j])
+        model.gammas[j] = _screw_of_array(engine.gammas[j])
+        model.zetas[j] = _screw_of_array(engine.zetas[j])
+        model.betas[j] = _screw_of_array(engine.betas[j])
+        model.accels[j] = _screw_of_array(engine.accels[j])
+        model.wrenchs[j] = _screw_of_array(engine.wrenchs[j])
+        model.star_inertias[j] = _screw6_of_array(engine.star_inertias[j])
+        model.star_betas[j] = _screw_of_array(engine.star_betas[j])
+        if j != 0:
+            model.no_qddot_inertias[j] = _screw6_of_array(
+                engine.no_qddot_inertias[j]
+            )
+            model.alphas[j] = _screw_of_array(engine.alphas[j])
+            model.joint_inertias[j] = float(engine.joint_inertias[j])
+            model.taus[j] = float(engine.taus[j])
+            model.qddots[j] = float(engine.qddots[j])
+    return model
+
+
 def inverse_dynamic_model(robo):
     """
     Compute the inverse dynamic model for the given robot by using the
@@ -708,6 +811,8 @@ def inverse_dynamic_model(robo):
     Returns:
         The inverse dynamic model of the robot.
     """
+    if not robo.is_symbolic:
+        return _numeric_inverse_dynamic_model(robo)
     # some book keeping variables
     model = DynModel(robo.joint_nums, robo.is_symbolic, 'inverse')
     # first forward recursion
@@ -772,6 +877,8 @@ def direct_dynamic_model(robo):
     Returns:
         The direct dynamic model of the robot.
     """
+    if not robo.is_symbolic:
+        return _numeric_direct_dynamic_model(robo)
     # some book keeping variables
     model = DynModel(robo.joint_nums, robo.is_symbolic, 'direct')
     # first forward recursion
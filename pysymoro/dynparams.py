@@ -8,7 +8,7 @@ This module contains the DynParams data structure.
 
 import re
 
-from sympy import eye, var
+from sympy import eye
 from sympy import Matrix
 
 from pysymoro.screw import Screw
@@ -203,7 +203,7 @@ class DynParams(object):
         """Initialise inertial terms."""
         for key, term in self._inertial_terms.iteritems():
             if self.link != 0:
-                value = var(term + str(self.link))
+                value = tools.syms(term + str(self.link))
             else:
                 value = 0
             setattr(self, key, value)
@@ -212,7 +212,7 @@ class DynParams(object):
         """Initialise mass tensor terms and mass of the link."""
         for key, term in self._ms_terms.iteritems():
             if self.link != 0:
-                value = var(term + str(self.link))
+                value = tools.syms(term + str(self.link))
             else:
                 value = 0
             setattr(self, key, value)
@@ -221,7 +221,7 @@ class DynParams(object):
         """Initialise rotor inertia and friction parameters."""
         for key, term in self._fr_terms.iteritems():
             if self.link != 0:
-                value = var(term + str(self.link))
+                value = tools.syms(term + str(self.link))
             else:
                 value = 0
             setattr(self, key, value)
@@ -230,7 +230,7 @@ class DynParams(object):
         """Initialise external force terms."""
         for key, term in self._ext_force_terms.iteritems():
             if self.link != 0:
-                value = var(term + str(self.link))
+                value = tools.syms(term + str(self.link))
             else:
                 value = 0
             setattr(self, key, value)
@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+
+
+# This file is part of the OpenSYMORO project. Please see
+# https://github.com/symoro/symoro/blob/master/LICENCE for the licence.
+
+
+"""
+This module computes exciting trajectories for the identification of
+the dynamic parameters. The joint trajectories are finite Fourier
+series and their coefficients are optimised to minimise the condition
+number of the stacked regressor (see `identification.Regressor`) while
+respecting the joint limits.
+"""
+
+
+from collections import namedtuple
+
+import numpy
+
+
+Limits = namedtuple('Limits', ['q_min', 'q_max', 'qdot_max', 'qddot_max'])
+
+
+Excitation = namedtuple(
+    'Excitation',
+    ['trajectory', 'cond', 'cost', 'evaluations', 'scale', 'max_violation']
+)
+
+
+class FourierTrajectory(object):
+    """
+    Periodic joint trajectories given by finite Fourier series:
+
+        q_j(t) = q0_j + sum_l a_jl / (w l) sin(w l t)
+                      - b_jl / (w l) cos(w l t)
+
+    where w is the base pulsation and l = 1..H.
+    """
+    def __init__(self, num_joints, num_harmonics=5, base_freq=0.1):
+        """
+        Constructor period.
+
+        Args:
+            num_joints: The number of joints n.
+            num_harmonics: The number of harmonics H.
+            base_freq: The base frequency in Hz. The period of the
+                trajectory is 1/base_freq.
+        """
+        self.num_joints = num_joints
+        self.num_harmonics = num_harmonics
+        self.pulsation = 2 * numpy.pi * base_freq
+        self.q0 = numpy.zeros(num_joints)
+        self.a = numpy.zeros((num_joints, num_harmonics))
+        self.b = numpy.zeros((num_joints, num_harmonics))
+
+    @property
+    def period(self):
+        """
+        Get the period of the trajectory.
+        """
+        return 2 * numpy.pi / self.pulsation
+
+    @property
+    def num_coefs(self):
+        """
+        Get the number of coefficients n * (2H + 1).
+        """
+        return self.num_joints * ((2 * self.num_harmonics) + 1)
+
+    def get_coefs(self):
+        """
+        Get the coefficients as a flat vector [q0, a, b].
+        """
+        return numpy.concatenate(
+            (self.q0, self.a.reshape(-1), self.b.reshape(-1))
+        )
+
+    def set_coefs(self, coefs):
+        """
+        Set the coefficients from a flat vector [q0, a, b].
+        """
+        n, h = self.num_joints, self.num_harmonics
+        self.q0 = numpy.array(coefs[:n], dtype=float)
+        self.a = numpy.array(coefs[n:n + (n*h)], dtype=float).reshape(n, h)
+        self.b = numpy.array(coefs[n + (n*h):], dtype=float).reshape(n, h)
+
+    def basis(self, times):
+        """
+        Compute the sin and cos terms at the given times.
+
+        Returns:
+            A tuple (sin, cos, wl) where sin and cos are (N x H)
+            arrays and wl is the array of the harmonic pulsations.
+        """
+        w_l = self.pulsation * numpy.arange(1, self.num_harmonics + 1)
+        angles = numpy.outer(times, w_l)
+        return numpy.sin(angles), numpy.cos(angles), w_l
+
+    def evaluate(self, times, basis=None):
+        """
+        Compute the joint positions, velocities and accelerations.
+
+        Args:
+            times: The N time instants.
+            basis: The result of `basis(times)` if already computed.
+
+        Returns:
+            A tuple of three (N x n) arrays (q, qdot, qddot).
+        """
+        sin, cos, w_l = self.basis(times) if basis is None else basis
+        q = self.q0 + numpy.dot(sin, (self.a / w_l).T) - \
+            numpy.dot(cos, (self.b / w_l).T)
+        qdot = numpy.dot(cos, self.a.T) + numpy.dot(sin, self.b.T)
+        qddot = numpy.dot(cos, (self.b * w_l).T) - \
+            numpy.dot(sin, (self.a * w_l).T)
+        return q, qdot, qddot
+
+
+def limits_penalty(q, qdot, qddot, limits):
+    """
+    Return the sum of the squared violations of the joint limits.
+
+    Args:
+        q, qdot, qddot: (N x n) arrays.
+        limits: A Limits instance. Fields that are None are ignored.
+    """
+    penalty = 0.0
+    if limits.q_min is not None:
+        penalty += numpy.sum(numpy.maximum(limits.q_min - q, 0) ** 2)
+    if limits.q_max is not None:
+        penalty += numpy.sum(numpy.maximum(q - limits.q_max, 0) ** 2)
+    if limits.qdot_max is not None:
+        penalty += numpy.sum(
+            numpy.maximum(abs(qdot) - limits.qdot_max, 0) ** 2
+        )
+    if limits.qddot_max is not None:
+        penalty += numpy.sum(
+            numpy.maximum(abs(qddot) - limits.qddot_max, 0) ** 2
+        )
+    return penalty
+
+
+def limits_violation(q, qdot, qddot, limits):
+    """
+    Return the largest violation of the joint limits, 0 if they are
+    respected.
+
+    Args:
+        q, qdot, qddot: (N x n) arrays.
+        limits: A Limits instance. Fields that are None are ignored.
+    """
+    violations = [0.0]
+    if limits.q_min is not None:
+        violations.append(numpy.max(limits.q_min - q))
+    if limits.q_max is not None:
+        violations.append(numpy.max(q - limits.q_max))
+    if limits.qdot_max is not None:
+        violations.append(numpy.max(abs(qdot) - limits.qdot_max))
+    if limits.qddot_max is not None:
+        violations.append(numpy.max(abs(qddot) - limits.qddot_max))
+    return max(violations)
+
+
+def scale_to_limits(trajectory, times, limits, iterations=40):
+    """
+    Make a trajectory respect the joint limits at the given times. The
+    offsets q0 are clipped to the position limits and the harmonics
+    are scaled down by the largest factor in [0, 1] found by
+    bisection for which the limits are respected.
+
+    Args:
+        trajectory: A FourierTrajectory that is modified in place.
+        times: The time instants where the limits are checked.
+        limits: A Limits instance.
+        iterations: The number of bisection steps.
+
+    Returns:
+        The scale factor of the harmonics.
+    """
+    basis = trajectory.basis(times)
+    if limits_violation(*trajectory.evaluate(times, basis),
+                        limits=limits) <= 0:
+        return 1.0
+    if limits.q_min is not None:
+        trajectory.q0 = numpy.maximum(trajectory.q0, limits.q_min)
+    if limits.q_max is not None:
+        trajectory.q0 = numpy.minimum(trajectory.q0, limits.q_max)
+    a, b = trajectory.a, trajectory.b
+    feasible, infeasible = 0.0, 1.0
+    for _ in xrange(iterations):
+        scale = 0.5 * (feasible + infeasible)
+        trajectory.a, trajectory.b = scale * a, scale * b
+        states = trajectory.evaluate(times, basis)
+        if limits_violation(*states, limits=limits) <= 0:
+            feasible = scale
+        else:
+            infeasible = scale
+    trajectory.a, trajectory.b = feasible * a, feasible * b
+    return feasible
+
+
+def regressor_cond(W):
+    """
+    Return the condition number of a stacked regressor. It is computed
+    from the R factor of the QR decomposition which is much smaller
+    than the regressor.
+    """
+    r_mat = numpy.linalg.qr(W, mode='r')
+    svals = numpy.linalg.svd(r_mat, compute_uv=False)
+    if svals[-1] == 0:
+        return numpy.inf
+    return svals[0] / svals[-1]
+
+
+def nelder_mead(func, x0, step, max_evals=5000, tol=1e-8):
+    """
+    Minimise a function with the Nelder-Mead simplex method. The
+    coefficients depend on the dimension (Gao and Han, 2012) which
+    works better than the standard ones for many variables.
+
+    Args:
+        func: The cost function f(x).
+        x0: The initial point.
+        step: The size of the initial simplex (scalar or array).
+        max_evals: The maximum number of evaluations of func.
+        tol: The simplex is considered converged when the spread of
+            the cost values is below tol.
+
+    Returns:
+        A tuple (x, f(x), evaluations).
+    """
+    x0 = numpy.asarray(x0, dtype=float)
+    dim = len(x0)
+    alpha = 1.0
+    beta = 1.0 + (2.0 / dim)
+    gamma = 0.75 - (1.0 / (2 * dim))
+    delta = 1.0 - (1.0 / dim)
+    simplex = numpy.tile(x0, (dim + 1, 1))
+    simplex[1:] += numpy.diag(numpy.ones(dim) * step)
+    costs = numpy.array([func(x) for x in simplex])
+    evals = dim + 1
+    while evals < max_evals:
+        order = numpy.argsort(costs)
+        simplex = simplex[order]
+        costs = costs[order]
+        if costs[-1] - costs[0] <= tol:
+            break
+        centroid = numpy.mean(simplex[:-1], axis=0)
+        worst = simplex[-1]
+        x_r = centroid + alpha * (centroid - worst)
+        f_r = func(x_r)
+        evals += 1
+        if f_r < costs[0]:
+            x_e = centroid + beta * (x_r - centroid)
+            f_e = func(x_e)
+            evals += 1
+            if f_e < f_r:
+                simplex[-1], costs[-1] = x_e, f_e
+            else:
+                simplex[-1], costs[-1] = x_r, f_r
+            continue
+        if f_r < costs[-2]:
+            simplex[-1], costs[-1] = x_r, f_r
+            continue
+        # contraction (outside or inside)
+        if f_r < costs[-1]:
+            x_c = centroid + gamma * (x_r - centroid)
+        else:
+            x_c = centroid + gamma * (worst - centroid)
+        f_c = func(x_c)
+        evals += 1
+        if f_c < min(f_r, costs[-1]):
+            simplex[-1], costs[-1] = x_c, f_c
+            continue
+        # shrink towards the best point
+        simplex[1:] = simplex[0] + delta * (simplex[1:] - simplex[0])
+        costs[1:] = [func(x) for x in simplex[1:]]
+        evals += dim
+    best = numpy.argmin(costs)
+    return simplex[best], costs[best], evals
+
+
+class ExcitationProblem(object):
+    """
+    Cost function of the excitation trajectory optimisation: the
+    logarithm of the condition number of the regressor sampled along
+    the trajectory plus a penalty on the violation of the limits.
+    """
+    def __init__(self, regressor, trajectory, limits, num_samples=100,
+                 penalty=1e3):
+        """
+        Constructor period.
+
+        Args:
+            regressor: An instance of identification.Regressor.
+            trajectory: An instance of FourierTrajectory.
+            limits: A Limits instance.
+            num_samples: The number of samples over one period.
+            penalty: The weight of the limits penalty.
+        """
+        self.regressor = regressor
+        self.trajectory = trajectory
+        self.limits = limits
+        self.penalty = penalty
+        self.times = numpy.linspace(
+            0, trajectory.period, num_samples, endpoint=False
+        )
+        self.basis = trajectory.basis(self.times)
+        rows, cols = regressor.shape
+        self.buffer = numpy.empty((num_samples * rows, cols))
+        self.states = None
+        """(q, qdot, qddot) sampled along the last trajectory."""
+        self.evaluations = 0
+
+    def cond(self, coefs):
+        """
+        Return the condition number of the regressor for the given
+        trajectory coefficients. The sampled joint states are kept in
+        `states`.
+        """
+        self.trajectory.set_coefs(coefs)
+        self.states = self.trajectory.evaluate(self.times, self.basis)
+        W = self.regressor.stack(*self.states, out=self.buffer)
+        return regressor_cond(W)
+
+    def __call__(self, coefs):
+        self.evaluations += 1
+        cond = self.cond(coefs)
+        if not numpy.isfinite(cond):
+            return numpy.inf
+        q, qdot, qddot = self.states
+        return numpy.log(cond) + \
+            self.penalty * limits_penalty(q, qdot, qddot, self.limits)
+
+
+def optimize_excitation(regressor, limits, num_harmonics=5,
+                        base_freq=0.1, num_samples=100, max_evals=5000,
+                        restarts=1, seed=0):
+    """
+    Compute an exciting trajectory for the identification.
+
+    Args:
+        regressor: An instance of identification.Regressor.
+        limits: A Limits instance with (n,) arrays or None.
+        num_harmonics: The number of harmonics of the Fourier series.
+        base_freq: The base frequency in Hz.
+        num_samples: The number of samples over one period used to
+            evaluate the condition number.
+        max_evals: The maximum number of cost evaluations of each
+            optimisation run.
+        restarts: The number of optimisation runs; each one restarts
+            from the best point found so far with a new simplex.
+        seed: The seed of the random initial coefficients.
+
+    Returns:
+        An Excitation with the optimised FourierTrajectory, the
+        condition number of its regressor, the final cost, the number
+        of regressor evaluations, the factor by which the harmonics
+        were scaled down to respect the limits (see
+        `scale_to_limits`, the limits are only a penalty during the
+        optimisation) and the largest violation of the limits at the
+        sampled instants (0 when they are respected).
+    """
+    num_joints = regressor.shape[0]
+    trajectory = FourierTrajectory(num_joints, num_harmonics, base_freq)
+    problem = ExcitationProblem(regressor, trajectory, limits, num_samples)
+    rand = numpy.random.RandomState(seed)
+    # start from the middle of the joint range with small random
+    # harmonics
+    q0 = numpy.zeros(num_joints)
+    if limits.q_min is not None and limits.q_max is not None:
+        q0 = 0.5 * (numpy.asarray(limits.q_min) + limits.q_max)
+    coefs = numpy.concatenate((
+        q0, rand.uniform(-0.5, 0.5, 2 * num_joints * num_harmonics)
+    ))
+    cost = problem(coefs)
+    step = 0.2
+    for _ in xrange(restarts):
+        coefs, cost, _ = nelder_mead(problem, coefs, step, max_evals)
+        step *= 0.5
+    trajectory.set_coefs(coefs)
+    scale = scale_to_limits(trajectory, problem.times, limits)
+    if scale < 1:
+        cost = problem(trajectory.get_coefs())
+    cond = problem.cond(trajectory.get_coefs())
+    max_violation = limits_violation(*problem.states, limits=limits)
+    return Excitation(
+        trajectory, cond, cost, problem.evaluations, scale, max_violation
+    )
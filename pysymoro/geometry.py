@@ -385,8 +385,7 @@ def compute_transform(robo, symo, j, antRj, antPj):
     antPj and antRj are the output parameters
     """
     antTj = _transform(robo, j)
-    for angle, name in robo.get_angles(j):
-        antTj = symo.trig_replace(antTj, angle, name)
+    antTj = symo.trig_replace_all(antTj, robo.get_angles(j))
     antRj[j] = symo.mat_replace(Transform.R(antTj), 'A', j)
     antPj[j] = symo.mat_replace(Transform.P(antTj), 'L', j)
 
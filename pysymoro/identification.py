@@ -0,0 +1,740 @@
+# -*- coding: utf-8 -*-
+
+
+# This file is part of the OpenSYMORO project. Please see
+# https://github.com/symoro/symoro/blob/master/LICENCE for the licence.
+
+
+"""
+This module contains the numeric identification of the dynamic
+parameters. The columns of the symbolic Dynamic Identification Model
+(`dyniden`) are compiled once into a vectorized function that stacks
+the regressor W(q, qdot, qddot) of a trajectory and the parameters are
+estimated with (weighted) least squares, or recursively from a stream
+of joint logs that does not fit in memory.
+"""
+
+
+import copy
+import itertools
+from collections import namedtuple
+
+import numpy
+from sympy import Float, Matrix, sympify, zeros
+
+from pysymoro import dyniden
+from symoroutils import symbolmgr
+from symoroutils import tools
+
+
+DEFAULT_CHUNK = 4096
+DEFAULT_TOL = 1e-8
+EPS = numpy.finfo(float).eps
+COEF_DECIMALS = 10
+
+
+Estimate = namedtuple(
+    'Estimate', ['params', 'residuals', 'std', 'relative_std', 'cond']
+)
+
+
+BaseParams = namedtuple(
+    'BaseParams', ['params', 'groups', 'coefficients', 'unidentifiable']
+)
+
+
+def regressor_params(robo):
+    """
+    Return the list of the (link, parameter) pairs that are the
+    columns of the Dynamic Identification Model in the order in which
+    they are computed.
+
+    Args:
+        robo: An instance of Robot.
+    """
+    params = []
+    for k in xrange(robo.NL):
+        for param in robo.get_inert_param(k):
+            if param != tools.ZERO:
+                params.append((k, param))
+        if k == 0:
+            continue
+        for param in (robo.IA[k], robo.FS[k], robo.FV[k]):
+            if param != tools.ZERO:
+                params.append((k, param))
+    return params
+
+
+class Regressor(object):
+    """
+    Compiled regressor of the inverse dynamic model that is linear in
+    the dynamic parameters: tau = W(q, qdot, qddot) * params.
+    """
+    def __init__(self, robo, values=None, processes=1):
+        """
+        Constructor period.
+
+        Args:
+            robo: An instance of Robot. To identify the base inertial
+                parameters use the robot returned by
+                `Robot.compute_baseparams` whose regrouped parameters
+                are the only non-zero ones.
+            values: A dict that gives the numeric values of the
+                constant symbols of the model (geometric parameters,
+                gravity).
+            processes: Passed to `dynamic_identification_model`.
+
+        Raises:
+            ValueError: If the regressor depends on symbols that are
+                neither joint variables nor given in `values`.
+        """
+        if values:
+            # the constants are folded while the model is generated
+            robo = robo.specialize(values)
+        if not (robo.is_floating or robo.is_mobile):
+            # the parameters of the base do not appear in the joint
+            # torques of a robot with fixed base
+            robo = copy.deepcopy(robo)
+            robo.put_inert_param(zeros(10, 1), 0)
+        symo = symbolmgr.SymbolManager(None)
+        dyniden.dynamic_identification_model(robo, symo, processes)
+        self.joints = [
+            j for j in xrange(1, robo.NL) if robo.sigma[j] != 2
+        ]
+        self.q = [robo.get_q(j) for j in self.joints]
+        self.qdot = [robo.qdot[j] for j in self.joints]
+        self.qddot = [robo.qddot[j] for j in self.joints]
+        # keep the columns that appear in the joint torques
+        columns = []
+        self.params = []
+        for k, param in regressor_params(robo):
+            column = []
+            for j in self.joints:
+                sym = sympify('DG%d%s' % (j, param))
+                column.append(sym if sym in symo.sydi else tools.ZERO)
+            if any(sym != tools.ZERO for sym in column):
+                columns.append(column)
+                self.params.append(param)
+        self.matrix = Matrix(columns).T
+        # sparsity pattern: link k only affects the joints of its chain
+        self.pattern = numpy.array([
+            [
+                symo.sydi.get(self.matrix[r, c], tools.ZERO) != tools.ZERO
+                for c in xrange(len(columns))
+            ]
+            for r in xrange(len(self.joints))
+        ], dtype=bool).reshape(len(self.joints), len(columns))
+        self.nonzeros = [
+            (int(r), int(c)) for r, c in zip(*numpy.nonzero(self.pattern))
+        ]
+        # positions in the nonzero entries and columns of each row
+        self.row_entries = []
+        self.row_columns = []
+        for row in xrange(len(self.joints)):
+            entries = [
+                idx for idx, (r, c) in enumerate(self.nonzeros) if r == row
+            ]
+            self.row_entries.append(numpy.array(entries, dtype=int))
+            self.row_columns.append(numpy.flatnonzero(self.pattern[row]))
+        args = (self.q, self.qdot, self.qddot)
+        symo.prune(self.matrix, args)
+        self.func = symo.gen_func(
+            'regressor', self.matrix, args, batch=True, strict=True
+        )
+        self.sparse_func = symo.gen_func(
+            'sparse_regressor',
+            [self.matrix[r, c] for r, c in self.nonzeros], args,
+            batch=True, strict=True
+        )
+
+    @property
+    def shape(self):
+        """
+        Get the shape (joints, parameters) of the regressor of one
+        sample.
+        """
+        return len(self.joints), len(self.params)
+
+    def stack(self, q, qdot, qddot, out=None, chunk=DEFAULT_CHUNK):
+        """
+        Compute the regressor of a trajectory.
+
+        Args:
+            q, qdot, qddot: (N x n) arrays of the joint positions,
+                velocities and accelerations.
+            out: A preallocated (N*n x p) array to fill.
+            chunk: The number of samples evaluated at once. It bounds
+                the memory used by the intermediate variables.
+
+        Returns:
+            The (N*n x p) regressor where the rows of each sample are
+            consecutive (same layout as `tau.reshape(-1)`).
+        """
+        q = numpy.asarray(q, dtype=float)
+        qdot = numpy.asarray(qdot, dtype=float)
+        qddot = numpy.asarray(qddot, dtype=float)
+        num = q.shape[0]
+        rows, cols = self.shape
+        if out is None:
+            out = numpy.empty((num * rows, cols))
+        samples = out.reshape(num, rows, cols)
+        for start in xrange(0, num, chunk):
+            stop = min(start + chunk, num)
+            samples[start:stop] = self.func(
+                (q[start:stop], qdot[start:stop], qddot[start:stop])
+            )
+        return out
+
+    @property
+    def density(self):
+        """
+        Get the ratio of the structurally non-zero entries.
+        """
+        return len(self.nonzeros) / float(self.pattern.size)
+
+    def stack_sparse(self, q, qdot, qddot, out=None, chunk=DEFAULT_CHUNK):
+        """
+        Compute only the structurally non-zero entries of the regressor
+        of a trajectory.
+
+        Args:
+            q, qdot, qddot: (N x n) arrays of the joint positions,
+                velocities and accelerations.
+            out: A preallocated (N x nnz) array to fill.
+            chunk: See `stack`.
+
+        Returns:
+            The (N x nnz) array of the entries in the order of
+            `nonzeros` (row, column pairs).
+        """
+        q = numpy.asarray(q, dtype=float)
+        qdot = numpy.asarray(qdot, dtype=float)
+        qddot = numpy.asarray(qddot, dtype=float)
+        num = q.shape[0]
+        if out is None:
+            out = numpy.empty((num, len(self.nonzeros)))
+        for start in xrange(0, num, chunk):
+            stop = min(start + chunk, num)
+            out[start:stop] = self.sparse_func(
+                (q[start:stop], qdot[start:stop], qddot[start:stop])
+            )
+        return out
+
+    def to_dense(self, values):
+        """
+        Expand the entries given by `stack_sparse` to the (N*n x p)
+        regressor given by `stack`.
+        """
+        num = values.shape[0]
+        rows, cols = self.shape
+        dense = numpy.zeros((num, rows, cols))
+        nz_rows, nz_cols = numpy.nonzero(self.pattern)
+        dense[:, nz_rows, nz_cols] = values
+        return dense.reshape(num * rows, cols)
+
+    def normal_equations(self):
+        """
+        Return an empty NormalEquations accumulator for this
+        regressor.
+        """
+        return NormalEquations(self)
+
+
+class NormalEquations(object):
+    """
+    Normal equations of the identification problem accumulated chunk
+    by chunk from the non-zero entries of the regressor. One block is
+    kept per joint with only the columns of that joint, so the stacked
+    regressor is never formed and the memory does not depend on the
+    number of samples. The joints can be weighted after the
+    accumulation.
+    """
+    def __init__(self, regressor):
+        """
+        Constructor period.
+
+        Args:
+            regressor: An instance of Regressor.
+        """
+        self.regressor = regressor
+        self.infos = [
+            numpy.zeros((len(cols), len(cols)))
+            for cols in regressor.row_columns
+        ]
+        self.vecs = [numpy.zeros(len(cols)) for cols in regressor.row_columns]
+        self.sq_norms = numpy.zeros(len(regressor.row_columns))
+        self.num_samples = 0
+        self._values = None
+
+    def add(self, q, qdot, qddot, tau, chunk=DEFAULT_CHUNK):
+        """
+        Add samples given as (N x n) arrays.
+        """
+        tau = numpy.asarray(tau, dtype=float)
+        num = len(tau)
+        for start in xrange(0, num, chunk):
+            stop = min(start + chunk, num)
+            size = stop - start
+            if self._values is None or len(self._values) < size:
+                self._values = numpy.empty(
+                    (size, len(self.regressor.nonzeros))
+                )
+            values = self.regressor.stack_sparse(
+                q[start:stop], qdot[start:stop], qddot[start:stop],
+                out=self._values[:size], chunk=size
+            )
+            for row, entries in enumerate(self.regressor.row_entries):
+                W_row = values[:, entries]
+                y_row = tau[start:stop, row]
+                self.infos[row] += numpy.dot(W_row.T, W_row)
+                self.vecs[row] += numpy.dot(W_row.T, y_row)
+                self.sq_norms[row] += numpy.dot(y_row, y_row)
+        self.num_samples += num
+
+    def solve(self, weights=None):
+        """
+        Solve the (weighted) least squares problem.
+
+        Args:
+            weights: The n weights of the joints (None for no
+                weighting).
+
+        Returns:
+            An Estimate (see `least_squares`) whose residuals field is
+            the array of the residual norm of each joint since the
+            residuals of the samples are not stored.
+        """
+        cols = self.regressor.shape[1]
+        if weights is None:
+            weights = numpy.ones(len(self.infos))
+        info = numpy.zeros((cols, cols))
+        vec = numpy.zeros(cols)
+        for row, columns in enumerate(self.regressor.row_columns):
+            sq_weight = weights[row] ** 2
+            info[numpy.ix_(columns, columns)] += sq_weight * self.infos[row]
+            vec[columns] += sq_weight * self.vecs[row]
+        num_rows = self.num_samples * len(self.infos)
+        # cond(W) = sqrt(cond(W^T W))
+        svals = numpy.linalg.svd(info, compute_uv=False)
+        if num_rows <= cols or svals[-1] <= svals[0] * num_rows * EPS:
+            params = numpy.linalg.lstsq(info, vec, rcond=-1)[0]
+            cond = numpy.inf
+            std = numpy.empty(cols)
+            std.fill(numpy.inf)
+        else:
+            params = numpy.linalg.solve(info, vec)
+            cond = numpy.sqrt(svals[0] / svals[-1])
+        residuals = self.residual_norms(params)
+        if numpy.isfinite(cond):
+            sigma2 = numpy.sum((weights * residuals) ** 2) / \
+                (num_rows - cols)
+            std = numpy.sqrt(sigma2 * numpy.diag(numpy.linalg.inv(info)))
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            relative_std = 100 * std / abs(params)
+        return Estimate(params, residuals, std, relative_std, cond)
+
+    def residual_norms(self, params):
+        """
+        Return the norm of the residuals of each joint for the given
+        parameters.
+        """
+        norms = numpy.zeros(len(self.infos))
+        for row, columns in enumerate(self.regressor.row_columns):
+            x_row = params[columns]
+            sq_norm = self.sq_norms[row] - \
+                (2 * numpy.dot(self.vecs[row], x_row)) + \
+                numpy.dot(x_row, numpy.dot(self.infos[row], x_row))
+            norms[row] = numpy.sqrt(max(sq_norm, 0.0))
+        return norms
+
+
+def least_squares(W, y, weights=None):
+    """
+    Solve the (weighted) least squares problem min ||w * (y - W x)||.
+
+    Args:
+        W: The (m x p) regressor.
+        y: The m measurements.
+        weights: The m weights of the rows (None for no weighting).
+
+    Returns:
+        An Estimate with the parameters, the residuals y - W x (not
+        weighted), the standard deviation of the parameters, their
+        relative standard deviation (in %) and the condition number
+        of the (weighted) regressor.
+    """
+    W = numpy.asarray(W, dtype=float)
+    y = numpy.asarray(y, dtype=float)
+    if weights is not None:
+        weights = numpy.asarray(weights, dtype=float)
+        W_w = W * weights[:, None]
+        y_w = y * weights
+    else:
+        W_w, y_w = W, y
+    rows, cols = W.shape
+    # the condition number and the covariance are obtained from the
+    # small triangular factor R instead of the whole regressor
+    q_mat, r_mat = numpy.linalg.qr(W_w)
+    svals = numpy.linalg.svd(r_mat, compute_uv=False)
+    if rows <= cols or svals[-1] <= svals[0] * rows * EPS:
+        params = numpy.linalg.lstsq(W_w, y_w, rcond=-1)[0]
+        residuals = y - numpy.dot(W, params)
+        cond = numpy.inf
+        std = numpy.empty(cols)
+        std.fill(numpy.inf)
+    else:
+        params = numpy.linalg.solve(r_mat, numpy.dot(q_mat.T, y_w))
+        residuals = y - numpy.dot(W, params)
+        cond = svals[0] / svals[-1]
+        res_w = residuals if weights is None else residuals * weights
+        sigma2 = numpy.dot(res_w, res_w) / (rows - cols)
+        # diagonal of (W^T W)^-1 = R^-1 R^-T
+        r_inv = numpy.linalg.inv(r_mat)
+        std = numpy.sqrt(sigma2 * numpy.sum(r_inv ** 2, axis=1))
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        relative_std = 100 * std / abs(params)
+    return Estimate(params, residuals, std, relative_std, cond)
+
+
+def joint_weights(residuals, num_joints):
+    """
+    Compute the row weights 1/sigma_j where sigma_j is the standard
+    deviation of the residuals of joint j.
+
+    Args:
+        residuals: The residuals of the stacked rows (sample major).
+        num_joints: The number of joints (rows per sample).
+    """
+    res = numpy.asarray(residuals).reshape(-1, num_joints)
+    sigma = numpy.sqrt(numpy.mean(res ** 2, axis=0))
+    sigma[sigma == 0] = 1.0
+    return numpy.tile(1.0 / sigma, res.shape[0])
+
+
+def identify(regressor, q, qdot, qddot, torques, weighted=True,
+             chunk=DEFAULT_CHUNK, sparse=False):
+    """
+    Identify the dynamic parameters from a trajectory.
+
+    With `weighted` the rows of each joint are weighted by the inverse
+    of the standard deviation of the residuals of the joint obtained
+    with ordinary least squares.
+
+    With `sparse` only the structurally non-zero entries of the
+    regressor are computed and the normal equations are accumulated
+    (see `NormalEquations`). It needs much less memory for long
+    trajectories and the regressor is computed only once for the
+    weighted solution, but the normal equations square the condition
+    number so it is less accurate for ill-conditioned regressors.
+
+    Args:
+        regressor: An instance of Regressor.
+        q, qdot, qddot: (N x n) arrays of the joint positions,
+            velocities and accelerations.
+        torques: (N x n) array of the joint torques.
+        weighted: True for weighted least squares.
+        chunk: See `Regressor.stack`.
+        sparse: True to solve the normal equations.
+
+    Returns:
+        An Estimate (see `least_squares` and `NormalEquations.solve`).
+        The parameters are in the order of `regressor.params`.
+    """
+    if sparse:
+        normal = regressor.normal_equations()
+        normal.add(q, qdot, qddot, torques, chunk)
+        estimate = normal.solve()
+        if weighted:
+            sigma = estimate.residuals / numpy.sqrt(normal.num_samples)
+            sigma[sigma == 0] = 1.0
+            estimate = normal.solve(1.0 / sigma)
+        return estimate
+    W = regressor.stack(q, qdot, qddot, chunk=chunk)
+    y = numpy.asarray(torques, dtype=float).reshape(-1)
+    estimate = least_squares(W, y)
+    if weighted:
+        weights = joint_weights(estimate.residuals, regressor.shape[0])
+        estimate = least_squares(W, y, weights)
+    return estimate
+
+
+def random_samples(num, num_joints, seed=0):
+    """
+    Return random joint positions, velocities and accelerations.
+
+    Returns:
+        A tuple of three (num x num_joints) arrays.
+    """
+    rand = numpy.random.RandomState(seed)
+    q = rand.uniform(-numpy.pi, numpy.pi, (num, num_joints))
+    qdot = rand.uniform(-2, 2, (num, num_joints))
+    qddot = rand.uniform(-2, 2, (num, num_joints))
+    return q, qdot, qddot
+
+
+def base_parameters(regressor, num_samples=None, tol=DEFAULT_TOL, seed=0):
+    """
+    Determine the base parameters numerically. The regressor is
+    evaluated at random samples and the columns that are linearly
+    independent of the previous ones are found with the QR
+    decomposition (|R_ii| > tol * max|R_ii|). The parameters are taken
+    in the order of `regressor.params` so that, as in the symbolic
+    grouping, the parameters of a link are regrouped with the ones of
+    its antecedent links.
+
+    Args:
+        regressor: An instance of Regressor.
+        num_samples: The number of random samples. By default there
+            are about 4 times more rows than parameters.
+        tol: The relative tolerance on the diagonal of R.
+        seed: The seed of the random samples.
+
+    Returns:
+        A BaseParams with the list of the base parameters, the list of
+        their expressions as functions of the standard parameters, the
+        (base x standard) matrix of the grouping coefficients and the
+        list of the parameters that have no effect on the model.
+    """
+    rows, cols = regressor.shape
+    if num_samples is None:
+        num_samples = max(10, (4 * cols) // rows + 1)
+    W = regressor.stack(*random_samples(num_samples, rows, seed))
+    # scale the columns so that the tolerance is relative
+    norms = numpy.sqrt(numpy.sum(W ** 2, axis=0))
+    unidentifiable = norms <= tol * norms.max()
+    norms[unidentifiable] = 1.0
+    r_diag = abs(numpy.diag(numpy.linalg.qr(W / norms, mode='r')))
+    independent = (r_diag > tol * r_diag.max()) & ~unidentifiable
+    base = numpy.flatnonzero(independent)
+    dependent = numpy.flatnonzero(~independent & ~unidentifiable)
+    coefficients = numpy.zeros((len(base), cols))
+    coefficients[range(len(base)), base] = 1.0
+    if len(dependent):
+        # W_dependent = W_base * beta
+        beta = numpy.linalg.lstsq(W[:, base], W[:, dependent], rcond=-1)[0]
+        # remove the round-off errors of the exact relations
+        beta = numpy.around(beta, COEF_DECIMALS)
+        coefficients[:, dependent] = beta
+    groups = [
+        sum(
+            (Float(c) * param if c != 1.0 else param)
+            for c, param in zip(row, regressor.params) if c != 0.0
+        )
+        for row in coefficients
+    ]
+    return BaseParams(
+        [regressor.params[idx] for idx in base], groups, coefficients,
+        [regressor.params[idx] for idx in numpy.flatnonzero(unidentifiable)]
+    )
+
+
+def csv_chunks(file_path, chunk=DEFAULT_CHUNK, delimiter=',', skip=0):
+    """
+    Read a CSV log file by chunks of rows.
+
+    Args:
+        file_path: The path of the file.
+        chunk: The number of rows per chunk.
+        delimiter: The column separator.
+        skip: The number of header lines.
+
+    Yields:
+        (chunk x columns) arrays.
+    """
+    with open(file_path, 'r') as log_file:
+        for _ in xrange(skip):
+            next(log_file)
+        while True:
+            lines = list(itertools.islice(log_file, chunk))
+            if not lines:
+                break
+            yield numpy.loadtxt(lines, delimiter=delimiter, ndmin=2)
+
+
+def binary_chunks(file_path, num_columns, chunk=DEFAULT_CHUNK,
+                  dtype='<f8'):
+    """
+    Read a binary log file of row-major samples by chunks of rows.
+
+    Args:
+        file_path: The path of the file.
+        num_columns: The number of values per sample.
+        chunk: The number of rows per chunk.
+        dtype: The type of the values (little-endian doubles by
+            default).
+
+    Yields:
+        (chunk x num_columns) arrays.
+    """
+    with open(file_path, 'rb') as log_file:
+        while True:
+            data = numpy.fromfile(log_file, dtype, chunk * num_columns)
+            if not len(data):
+                break
+            yield data.reshape(-1, num_columns).astype(float)
+
+
+def log_states(chunks, num_joints, dt=None):
+    """
+    Split the chunks of a joint log into joint states and torques.
+
+    Args:
+        chunks: An iterable of (N x columns) arrays. The columns are
+            q, qdot, qddot, tau (4n columns) or q, tau (2n columns) if
+            `dt` is given.
+        num_joints: The number of joints n.
+        dt: The sample time. If given, the velocities and the
+            accelerations are computed with central differences across
+            the chunk borders (the first and the last sample of the
+            log are dropped).
+
+    Yields:
+        Tuples (q, qdot, qddot, tau) of (N x n) arrays.
+    """
+    n = num_joints
+    if dt is None:
+        for data in chunks:
+            yield data[:, :n], data[:, n:2*n], data[:, 2*n:3*n], \
+                data[:, 3*n:4*n]
+        return
+    prev = None
+    for data in chunks:
+        if prev is not None:
+            data = numpy.concatenate((prev, data))
+        if len(data) < 3:
+            prev = data
+            continue
+        q = data[:, :n]
+        qdot = (q[2:] - q[:-2]) / (2 * dt)
+        qddot = (q[2:] - (2 * q[1:-1]) + q[:-2]) / (dt * dt)
+        yield q[1:-1], qdot, qddot, data[1:-1, n:2*n]
+        prev = data[-2:]
+
+
+class RecursiveLeastSquares(object):
+    """
+    Recursive least squares with a forgetting factor. The information
+    form is used: the weighted normal equations are accumulated block
+    by block, which is equivalent to the row by row update with
+    P = A^-1 and costs O(p^2) memory whatever the number of samples.
+    """
+    def __init__(self, num_params, forgetting=1.0, delta=1e6):
+        """
+        Constructor period.
+
+        Args:
+            num_params: The number of parameters p.
+            forgetting: The forgetting factor (0 < lambda <= 1) applied
+                at each sample.
+            delta: The initial covariance is delta * I.
+        """
+        self.forgetting = forgetting
+        self.info = numpy.eye(num_params) / delta
+        self.vec = numpy.zeros(num_params)
+        self.num_samples = 0
+        self.sq_error = 0.0
+        self._params = numpy.zeros(num_params)
+        self._solved = True
+
+    def update(self, W, y, rows_per_sample=1):
+        """
+        Add a block of rows.
+
+        Args:
+            W: The (m x p) regressor of the block.
+            y: The m measurements.
+            rows_per_sample: The number of consecutive rows that share
+                the same forgetting weight (the number of joints).
+        """
+        W = numpy.asarray(W, dtype=float)
+        y = numpy.asarray(y, dtype=float)
+        num = len(y) // rows_per_sample
+        # a priori prediction error of the block
+        error = y - numpy.dot(W, self.params)
+        self.sq_error = self.sq_error * self.forgetting ** num + \
+            numpy.dot(error, error)
+        if self.forgetting != 1.0:
+            ages = numpy.arange(num - 1, -1, -1)
+            weights = numpy.repeat(
+                numpy.sqrt(self.forgetting ** ages), rows_per_sample
+            )
+            W = W * weights[:, None]
+            y = y * weights
+            self.info *= self.forgetting ** num
+            self.vec *= self.forgetting ** num
+        self.info += numpy.dot(W.T, W)
+        self.vec += numpy.dot(W.T, y)
+        self.num_samples += num
+        self._solved = False
+
+    @property
+    def params(self):
+        """
+        Get the current estimate of the parameters.
+        """
+        if not self._solved:
+            self._params = numpy.linalg.solve(self.info, self.vec)
+            self._solved = True
+        return self._params
+
+    @property
+    def covariance(self):
+        """
+        Get the matrix P (covariance up to the noise variance).
+        """
+        return numpy.linalg.inv(self.info)
+
+
+class StreamingIdentifier(object):
+    """
+    Identification of the dynamic parameters from a stream of joint
+    states and torques with constant memory.
+    """
+    def __init__(self, regressor, forgetting=1.0, delta=1e6):
+        """
+        Constructor period.
+
+        Args:
+            regressor: An instance of Regressor.
+            forgetting: See RecursiveLeastSquares.
+            delta: See RecursiveLeastSquares.
+        """
+        self.regressor = regressor
+        self.rls = RecursiveLeastSquares(
+            regressor.shape[1], forgetting, delta
+        )
+        self._buffer = None
+
+    @property
+    def params(self):
+        """
+        Get the current estimate in the order of `regressor.params`.
+        """
+        return self.rls.params
+
+    def update(self, q, qdot, qddot, tau):
+        """
+        Add a chunk of samples, given as (N x n) arrays.
+        """
+        rows, cols = self.regressor.shape
+        size = len(q) * rows
+        if self._buffer is None or len(self._buffer) < size:
+            self._buffer = numpy.empty((size, cols))
+        W = self.regressor.stack(q, qdot, qddot, out=self._buffer[:size])
+        self.rls.update(W, numpy.asarray(tau).reshape(-1), rows)
+
+    def consume(self, states):
+        """
+        Consume a stream of chunks.
+
+        Args:
+            states: An iterable of (q, qdot, qddot, tau) tuples of
+                (N x n) arrays, e.g. from `log_states`.
+
+        Yields:
+            The number of samples used so far and the current estimate
+            after each chunk.
+        """
+        for q, qdot, qddot, tau in states:
+            self.update(q, qdot, qddot, tau)
+            yield self.rls.num_samples, self.params
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+
+
+# This file is part of the OpenSYMORO project. Please see
+# https://github.com/symoro/symoro/blob/master/LICENCE for the licence.
+
+
+"""
+This module regenerates the Inverse Dynamic Model of a robot after the
+edit of some of its parameters without computing the whole model again.
+The Newton-Euler algorithm (see `nealgos.fixed_inverse_dynmodel` and
+`nealgos.mobile_inverse_dynmodel`) is split into stages, one for each
+pass and link:
+    geo: transformation ant_T_j,
+    kin: velocities and accelerations (forward recursion),
+    dyn: total wrench of the link,
+    wrench: reaction wrench of the joint (backward recursion),
+    torque: joint torque.
+The equations and the outputs of every stage are recorded. When
+parameters change, only the stages that use them and the stages that
+depend on these ones are computed again (the subtree of the link in the
+forward recursion and the chain to the base in the backward recursion).
+The other stages are replayed from the record.
+"""
+
+
+from collections import namedtuple
+
+from sympy import zeros
+
+from pysymoro import nealgos
+from pysymoro.geometry import compute_transform
+from pysymoro.kinematics import compute_link_vel_acc
+from symoroutils import parfile
+from symoroutils import symbolmgr
+from symoroutils.paramsinit import ParamsInit
+
+
+# PAR file key -> passes of the stage of the link (or joint) that use
+# the parameter. The other keys change the structure of the model.
+PARAM_PASSES = dict(
+    [('sigma', ('geo', 'kin', 'torque'))] +
+    [(key, ('geo',)) for key in ('b', 'd', 'r', 'gamma', 'alpha', 'theta')] +
+    [(key, ('kin', 'torque')) for key in ('QP', 'QDP')] +
+    [(key, ('dyn', 'wrench')) for key in (
+        'XX', 'XY', 'XZ', 'YY', 'YZ', 'ZZ', 'MX', 'MY', 'MZ', 'M'
+    )] +
+    [(key, ('wrench',)) for key in ('FX', 'FY', 'FZ', 'CX', 'CY', 'CZ')] +
+    [(key, ('torque',)) for key in ('IA', 'FV', 'FS')] +
+    [(key, ()) for key in ('mu', 'GAM', 'k', 'Z')]
+)
+# base velocities, accelerations and gravity, used by the first links
+BASE_KEYS = ('W0', 'WP0', 'V0', 'VP0', 'G')
+BASE_STAGE = ('base', 0)
+# arrays of the algorithm written by each pass at the link index
+OUTPUTS = {
+    'geo': ('antRj', 'antPj'),
+    'kin': ('w', 'wdot', 'vdot', 'U'),
+    'dyn': ('F', 'N'),
+    'wrench': ('Fjnt', 'Njnt'),
+    'torque': ('torque',)
+}
+
+
+StageRecord = namedtuple(
+    'StageRecord', ['equations', 'sources', 'outputs', 'increments']
+)
+
+
+class IncrementalIDM(object):
+    """
+    Inverse Dynamic Model of a robot with rigid joints and fixed or
+    mobile base that is updated incrementally when its parameters are
+    changed. The robot instance is edited in place (e.g. with
+    `Robot.put_val`) and the changes are found by comparing the PAR
+    file parameters with the ones of the previous computation.
+    """
+    def __init__(self, robo):
+        """
+        Constructor period.
+
+        Args:
+            robo: The Robot instance.
+        """
+        self.robo = robo
+        self.records = {}
+        self.params = None
+        self.texts = {}
+        self.num_computed = 0
+        self.num_reused = 0
+
+    @property
+    def is_supported(self):
+        """
+        Get whether the model can be updated incrementally. Robots with
+        a floating base or flexible joints are computed as a whole.
+        """
+        return not self.robo.is_floating and 1 not in self.robo.eta
+
+    @property
+    def first_link(self):
+        """
+        Get the first link of the recursions.
+        """
+        return 0 if self.robo.is_mobile else 1
+
+    def stages(self):
+        """
+        Return the list of the stages (pass, link) in the order of
+        computation.
+        """
+        num = self.robo.NL
+        links = range(self.first_link, num)
+        return [('geo', j) for j in xrange(num)] + \
+            [('kin', j) for j in links] + \
+            [('dyn', j) for j in links] + \
+            [('wrench', j) for j in reversed(links)] + \
+            [('torque', j) for j in xrange(1, num)]
+
+    def stage_inputs(self, stage):
+        """
+        Return the stages whose outputs are used by the given stage.
+        """
+        name, j = stage
+        if name == 'geo':
+            return []
+        elif name == 'kin':
+            ant = self.robo.ant[j]
+            if ant < self.first_link:
+                return [('geo', j), BASE_STAGE]
+            return [('geo', j), ('kin', ant)]
+        elif name == 'dyn':
+            return [('kin', j)]
+        elif name == 'wrench':
+            children = [
+                ('wrench', k) for k in xrange(self.first_link, self.robo.NL)
+                if self.robo.ant[k] == j
+            ]
+            return [('geo', j), ('kin', j), ('dyn', j)] + children
+        return [('wrench', j)]
+
+    def changed_params(self, params=None):
+        """
+        Return the list of the PAR file parameters (key, index) changed
+        since the last computation or None if the model has to be
+        computed as a whole.
+        """
+        if params is None:
+            params = parfile.get_par_values(self.robo)
+        if self.params is None or set(params) != set(self.params):
+            return None
+        return [
+            key for key, value in params.iteritems()
+            if self.params[key] != value
+        ]
+
+    def dirty_stages(self, changed):
+        """
+        Return the set of the stages to compute again after the change
+        of the given parameters.
+
+        Args:
+            changed: A list of (key, index) as returned by
+                `changed_params` or None.
+        """
+        stages = self.stages()
+        if changed is None:
+            return set(stages)
+        dirty = set()
+        for key, j in changed:
+            if key in BASE_KEYS:
+                dirty.add(BASE_STAGE)
+            elif key in PARAM_PASSES:
+                dirty.update((name, j) for name in PARAM_PASSES[key])
+            else:
+                return set(stages)
+        for stage in stages:
+            if stage not in self.records:
+                dirty.add(stage)
+            elif stage in dirty:
+                continue
+            elif any(dep in dirty for dep in self.stage_inputs(stage)):
+                dirty.add(stage)
+            elif not self.records[stage].sources.isdisjoint(dirty):
+                # uses a symbol defined by a dirty stage
+                dirty.add(stage)
+        dirty.discard(BASE_STAGE)
+        return dirty.intersection(stages)
+
+    def title(self):
+        """
+        Return the title of the output file.
+        """
+        title = "Inverse Dynamic Model using Newton-Euler Algorithm\n"
+        if self.robo.is_mobile:
+            return title + "Robot with mobile base (Vdot0 is known)\n"
+        return title + "Robot with rigid joints and fixed base\n"
+
+    def compute(self, sink_format=None):
+        """
+        Compute the Inverse Dynamic Model, only the stages changed
+        since the last call are computed.
+
+        Args:
+            sink_format: The format of the output file (see
+                `sinks.FORMATS`).
+
+        Returns:
+            The SymbolManager instance with the model. The output file
+            is the same as the one of `Robot.compute_idym`.
+        """
+        if not self.is_supported:
+            self.records = {}
+            self.params = None
+            return self.robo.compute_idym()
+        params = parfile.get_par_values(self.robo)
+        dirty = self.dirty_stages(self.changed_params(params))
+        symo = symbolmgr.SymbolManager()
+        symo.file_open(self.robo, 'idm', sink_format)
+        # the replayed equations are not converted to text again
+        symo.file_out.texts = self.texts
+        symo.write_params_table(
+            self.robo, self.title(), inert=True, dynam=True
+        )
+        state = self._init_state()
+        owners = {}
+        records = {}
+        for stage in self.stages():
+            if stage in dirty:
+                record = self._run_stage(symo, state, stage, owners)
+            else:
+                record = self.records[stage]
+                self._replay_stage(symo, state, record)
+            for sym, _ in record.equations:
+                owners[sym] = stage
+            records[stage] = record
+        symo.file_close()
+        texts = {}
+        for record in records.itervalues():
+            for _, value in record.equations:
+                if value in self.texts:
+                    texts[value] = self.texts[value]
+        self.texts = texts
+        self.records = records
+        self.params = params
+        self.num_computed = len(dirty)
+        self.num_reused = len(records) - len(dirty)
+        return symo
+
+    def _init_state(self):
+        robo = self.robo
+        wdot, vdot = ParamsInit.init_wv_dot(robo)
+        return {
+            'antRj': ParamsInit.init_mat(robo),
+            'antPj': ParamsInit.init_vec(robo),
+            'w': ParamsInit.init_w(robo),
+            'wdot': wdot,
+            'vdot': vdot,
+            'U': ParamsInit.init_u(robo),
+            'F': ParamsInit.init_vec(robo),
+            'N': ParamsInit.init_vec(robo),
+            'Fjnt': ParamsInit.init_vec(robo),
+            'Njnt': ParamsInit.init_vec(robo),
+            'Fex': list(robo.Fex),
+            'Nex': list(robo.Nex),
+            'torque': ParamsInit.init_scalar(robo),
+            'masks': nealgos.ZeroMasks(robo)
+        }
+
+    def _run_stage(self, symo, state, stage, owners):
+        """
+        Compute a stage and return its record.
+        """
+        robo = self.robo
+        name, j = stage
+        start = len(symo.order_list)
+        increments = []
+        if name == 'geo':
+            compute_transform(robo, symo, j, state['antRj'], state['antPj'])
+        elif name == 'kin':
+            compute_link_vel_acc(
+                robo, symo, j, state['antRj'], state['antPj'],
+                state['w'], state['wdot'], state['vdot'], state['U']
+            )
+        elif name == 'dyn':
+            nealgos.compute_dynamic_wrench(
+                robo, symo, j, state['w'], state['wdot'], state['U'],
+                state['vdot'], state['F'], state['N'], state['masks']
+            )
+        elif name == 'wrench':
+            # the contribution to the external wrench of the antecedent
+            # is recorded separately since it is a sum over the children
+            i = robo.ant[j]
+            if i != -1:
+                prev = state['Fex'][i], state['Nex'][i]
+                state['Fex'][i] = zeros(3, 1)
+                state['Nex'][i] = zeros(3, 1)
+            nealgos.compute_joint_wrench(
+                robo, symo, j, state['antRj'], state['antPj'],
+                state['vdot'], state['F'], state['N'], state['Fjnt'],
+                state['Njnt'], state['Fex'], state['Nex'], state['masks']
+            )
+            if i != -1:
+                increments = [
+                    ('Fex', i, state['Fex'][i]), ('Nex', i, state['Nex'][i])
+                ]
+                state['Fex'][i], state['Nex'][i] = prev
+        else:
+            nealgos.compute_joint_torque(
+                robo, symo, j, state['Fjnt'], state['Njnt'], state['torque']
+            )
+        outputs = [(key, j, state[key][j]) for key in OUTPUTS[name]]
+        equations = [
+            (sym, symo.sydi[sym]) for sym in symo.order_list[start:]
+        ]
+        used = set()
+        for _, _, value in outputs + increments:
+            used.update(_free_symbols(value))
+        for _, value in equations:
+            used.update(_free_symbols(value))
+        sources = frozenset(
+            owners[sym] for sym in used if sym in owners
+        ).difference([stage])
+        record = StageRecord(equations, sources, outputs, increments)
+        self._apply(state, record)
+        return record
+
+    def _replay_stage(self, symo, state, record):
+        """
+        Write the recorded equations of a stage and set its outputs.
+        """
+        for sym, value in record.equations:
+            symo.add_to_dict(sym, value)
+        for key, j, value in record.outputs:
+            state[key][j] = value
+        self._apply(state, record)
+
+    @staticmethod
+    def _apply(state, record):
+        for key, i, value in record.increments:
+            state[key][i] = state[key][i] + value
+
+
+def _free_symbols(value):
+    if hasattr(value, 'free_symbols'):
+        return value.free_symbols
+    return ()
@@ -11,7 +11,7 @@ solutions for inverse geometric problem using Pieper Method.
 """
 
 
-from sympy import var, sin, cos, eye, atan2, atan, sqrt, pi
+from sympy import sin, cos, eye, atan2, atan, sqrt, pi
 from sympy import Matrix, Symbol, Expr, trigsimp, zeros
 from numpy import dot, array
 from numpy.linalg import inv
@@ -19,11 +19,11 @@ from numpy.linalg import inv
 from pysymoro.geometry import dgm, _rot, _trans_vec, _rot_trans
 from symoroutils import tools
 
-EMPTY = var("EMPTY")
+EMPTY = tools.syms("EMPTY")
 
-T_GENERAL = Matrix([var('sx,nx,ax,px'),
-                    var('sy,ny,ay,py'),
-                    var('sz,nz,az,pz'),
+T_GENERAL = Matrix([tools.syms('sx,nx,ax,px'),
+                    tools.syms('sy,ny,ay,py'),
+                    tools.syms('sz,nz,az,pz'),
                     [0, 0, 0, 1]])
 
 
@@ -728,7 +728,7 @@ def _equation_solve(symo, coef, eq_type, unknown, offset):
         r = unknown
         symo.write_line("# Equation in {0}: ".format(r))
         symo.write_line("#=================")
-        EPS = var('EPS'+str(r))
+        EPS = tools.syms('EPS'+str(r))
         symo.write_line("# Type {0}".format(eq_type))
         symo.write_line("# a*{0}**2 + b*{0} + c = 0".format(r) + "\r\n")
         a = symo.replace(coef[0],"a",r)
@@ -752,7 +752,7 @@ def _equation_solve(symo, coef, eq_type, unknown, offset):
         th = unknown
         symo.write_line("# Equation in {0}: ".format(th))
         symo.write_line("#=================")
-        EPS = var('EPS'+str(th))
+        EPS = tools.syms('EPS'+str(th))
         symo.write_line("# Type {0}".format(eq_type))
         symo.write_line("# a*C({0}) + b*S({0}) + c = 0".format(th) + "\r\n")
         a = symo.replace(coef[0], "a", th)
@@ -831,7 +831,7 @@ def _equation_solve(symo, coef, eq_type, unknown, offset):
         a4*r^4 + a3*r^3 + a2*r^2 + a1*r + a0 = 0
         """
         r = unknown
-        EPS = var('EPS'+str(r))
+        EPS = tools.syms('EPS'+str(r))
         symo.write_line("\r\n# Equation in {0}: ".format(r))
         symo.write_line("#=================")
         symo.write_line("# Type {0}".format(eq_type))
@@ -857,10 +857,10 @@ def _equation_solve(symo, coef, eq_type, unknown, offset):
         sol12 = -a3/(4*a4) - S + EPS*sqrt(-4*S**2 - 2*p + q/S)/2 - offset
         sol34 = -a3/(4*a4) + S + EPS*sqrt(-4*S**2 - 2*p - q/S)/2 - offset
         symo.write_line("\r\n# Solutions 1 and 2 are: ")
-        r_12 = var(str(r)+'_12')
+        r_12 = tools.syms(str(r)+'_12')
         symo.add_to_dict(r_12, sol12)
         symo.write_line("\r\n\r\n# Solutions 3 and 4 are: \r\n")
-        r_34 = var(str(r)+'_34')
+        r_34 = tools.syms(str(r)+'_34')
         symo.add_to_dict(r_34, sol34)
 
     elif eq_type == 6:
@@ -870,8 +870,8 @@ def _equation_solve(symo, coef, eq_type, unknown, offset):
         (a0 - a2)*t^4 + 2*(a1 - a3)*t^3 + 2*(a0 + 2*a4)*t^2 + 2*(a1 + a3)*t + (a0 + a2) = 0 , with t = tan(th/2)
         """
         th = unknown
-        t = var('t')
-        EPS = var('EPS'+str(th))
+        t = tools.syms('t')
+        EPS = tools.syms('EPS'+str(th))
         symo.write_line("# Equation in {0}: ".format(th))
         symo.write_line("#=================")
         symo.write_line("# Type {0}".format(eq_type))
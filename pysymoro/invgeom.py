@@ -12,7 +12,7 @@ solutions for inverse geompetric problem.
 
 
 from heapq import heapify, heappop
-from sympy import var, sin, cos, eye, atan2, sqrt, pi
+from sympy import sin, cos, eye, atan2, sqrt, pi
 from sympy import Matrix, Symbol, Expr, trigsimp
 
 from pysymoro.geometry import transform_list, to_matrix
@@ -20,10 +20,10 @@ from symoroutils import symbolmgr
 from symoroutils import tools
 
 
-EMPTY = var("EMPTY")
+EMPTY = tools.syms("EMPTY")
 
-T_GENERAL = Matrix([var("s1,n1,a1,p1"), var("s2,n2,a2,p2"),
-                    var("s3,n3,a3,p3"), [0, 0, 0, 1]])
+T_GENERAL = Matrix([tools.syms("s1,n1,a1,p1"), tools.syms("s2,n2,a2,p2"),
+                    tools.syms("s3,n3,a3,p3"), [0, 0, 0, 1]])
 
 # Dictionary for equation type classification.
 eq_dict = {(1, 0, 0): 0, (0, 1, 0): 1, (1, 1, 0): 2,
@@ -363,7 +363,7 @@ def _solve_type_2(symo, X, Y, Z, th):
     X = symo.replace(trigsimp(X), 'X', th)
     Y = symo.replace(trigsimp(Y), 'Y', th)
     Z = symo.replace(trigsimp(Z), 'Z', th)
-    YPS = var('YPS'+str(th))
+    YPS = tools.syms('YPS'+str(th))
     if X == tools.ZERO and Y != tools.ZERO:
         C = symo.replace(Z/Y, 'C', th)
         symo.add_to_dict(YPS, (tools.ONE, - tools.ONE))
@@ -419,7 +419,7 @@ def _solve_type_4(symo, X1, Y1, X2, Y2, th, r):
     Y1 = symo.replace(trigsimp(Y1), 'Y1', th)
     X2 = symo.replace(trigsimp(X2), 'X2', th)
     Y2 = symo.replace(trigsimp(Y2), 'Y2', th)
-    YPS = var('YPS' + r)
+    YPS = tools.syms('YPS' + r)
     symo.add_to_dict(YPS, (tools.ONE, - tools.ONE))
     symo.add_to_dict(r, YPS*sqrt((Y1/X1)**2 + (Y2/X2)**2))
     symo.add_to_dict(th, atan2(Y1/(X1*r), Y2/(X2*r)))
@@ -482,7 +482,7 @@ def _solve_type_8(symo, X, Y, Z1, Z2, th_i, th_j):
     Z1 = symo.replace(trigsimp(Z1), 'Z1', th_j)
     Z2 = symo.replace(trigsimp(Z2), 'Z2', th_j)
     Cj = symo.replace((Z1**2 + Z2**2 - X**2 - Y**2) / (2*X*Y), 'C', th_j)
-    YPS = var('YPS%s' % th_j)
+    YPS = tools.syms('YPS%s' % th_j)
     symo.add_to_dict(YPS, (tools.ONE, -tools.ONE))
     symo.add_to_dict(th_j, atan2(YPS*sqrt(1 - Cj**2), Cj))
     Q1 = symo.replace(X + Y*cos(th_j), 'Q1', th_i)
@@ -501,7 +501,7 @@ def _solve_square(symo, A, B, C, x):
     B = symo.replace(B, 'B', x)
     C = symo.replace(C, 'C', x)
     Delta = symo.repalce(B**2 - 4*A*C, 'Delta', x)
-    YPS = var('YPS' + x)
+    YPS = tools.syms('YPS' + x)
     symo.add_to_dict(YPS, (tools.ONE, - tools.ONE))
     symo.add_to_dict(x, (-B + YPS*sqrt(Delta))/(2*A))
 
@@ -204,6 +204,42 @@ def _kinematic_loop_constraints(robo, symo, proj=None):
     return W_a, W_p, W_ac, W_pc, W_c
 
 
+def compute_link_vel_acc(
+    robo, symo, j, antRj, antPj, w, wdot, vdot, U, forced=False
+):
+    """Internal function. Computes speeds and accelerations of link j
+    from the ones of its antecedent (one step of compute_vel_acc)
+
+    Notes
+    =====
+    w, wdot, vdot, U are the output parameters
+    """
+    if j == 0:
+        w[j] = symo.mat_replace(w[j], 'W', j)
+        wdot[j] = symo.mat_replace(wdot[j], 'WP', j)
+        vdot[j] = symo.mat_replace(vdot[j], 'VP', j)
+        dv0 = ParamsInit.product_combinations(w[j])
+        symo.mat_replace(dv0, 'DV', j)
+        hatw_hatw = Matrix([
+            [-dv0[3]-dv0[5], dv0[1], dv0[2]],
+            [dv0[1], -dv0[5]-dv0[0], dv0[4]],
+            [dv0[2], dv0[4], -dv0[3]-dv0[0]]
+        ])
+        U[j] = hatw_hatw + tools.skew(wdot[j])
+        symo.mat_replace(U[j], 'U', j)
+    else:
+        jRant = antRj[j].T
+        qdj = Z_AXIS * robo.qdot[j]
+        qddj = Z_AXIS * robo.qddot[j]
+        wi, w[j] = _omega_ij(robo, j, jRant, w, qdj)
+        symo.mat_replace(w[j], 'W', j)
+        symo.mat_replace(wi, 'WI', j)
+        _omega_dot_j(robo, j, jRant, w, wi, wdot, qdj, qddj)
+        symo.mat_replace(wdot[j], 'WP', j, forced)
+        _v_dot_j(robo, symo, j, jRant, antPj, w, wi, wdot, U, vdot, qdj, qddj)
+        symo.mat_replace(vdot[j], 'VP', j, forced)
+
+
 def compute_vel_acc(
     robo, symo, antRj, antPj, forced=False, gravity=True, floating=False
 ):
@@ -226,30 +262,9 @@ def compute_vel_acc(
     #init auxilary matrix
     U = ParamsInit.init_u(robo)
     for j in xrange(first_link, robo.NL):
-        if j == 0:
-            w[j] = symo.mat_replace(w[j], 'W', j)
-            wdot[j] = symo.mat_replace(wdot[j], 'WP', j)
-            vdot[j] = symo.mat_replace(vdot[j], 'VP', j)
-            dv0 = ParamsInit.product_combinations(w[j])
-            symo.mat_replace(dv0, 'DV', j)
-            hatw_hatw = Matrix([
-                [-dv0[3]-dv0[5], dv0[1], dv0[2]],
-                [dv0[1], -dv0[5]-dv0[0], dv0[4]],
-                [dv0[2], dv0[4], -dv0[3]-dv0[0]]
-            ])
-            U[j] = hatw_hatw + tools.skew(wdot[j])
-            symo.mat_replace(U[j], 'U', j)
-        else:
-            jRant = antRj[j].T
-            qdj = Z_AXIS * robo.qdot[j]
-            qddj = Z_AXIS * robo.qddot[j]
-            wi, w[j] = _omega_ij(robo, j, jRant, w, qdj)
-            symo.mat_replace(w[j], 'W', j)
-            symo.mat_replace(wi, 'WI', j)
-            _omega_dot_j(robo, j, jRant, w, wi, wdot, qdj, qddj)
-            symo.mat_replace(wdot[j], 'WP', j, forced)
-            _v_dot_j(robo, symo, j, jRant, antPj, w, wi, wdot, U, vdot, qdj, qddj)
-            symo.mat_replace(vdot[j], 'VP', j, forced)
+        compute_link_vel_acc(
+            robo, symo, j, antRj, antPj, w, wdot, vdot, U, forced
+        )
     return w, wdot, vdot, U
 
 
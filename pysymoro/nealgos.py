@@ -24,6 +24,73 @@ def inertia_spatial(inertia, ms_tensor, mass):
     ])
 
 
+class ZeroMasks(object):
+    """
+    Zero masks (see `tools.zero_mask`) of the inertial parameters and
+    of the transformations of the links. They are computed once per
+    model and used by the recursions to skip the products of the
+    known zero elements and the replacement of the zero blocks.
+    """
+    def __init__(self, robo, links=None):
+        """
+        Constructor period.
+
+        Args:
+            robo: Robot - instance of robot description container
+            links: The links whose masks are computed, all of them by
+                default.
+        """
+        if links is None:
+            links = xrange(robo.NL)
+        self.J = {}
+        self.MS = {}
+        self.skew_MS = {}
+        for j in links:
+            self.J[j] = tools.zero_mask(robo.J[j])
+            self.MS[j] = tools.zero_mask(robo.MS[j])
+            self.skew_MS[j] = tools.zero_mask(tools.skew(robo.MS[j]))
+        self.rot = {}
+        self.trans = {}
+        self.screw_t = {}
+
+    def add_transforms(self, antRj=None, antPj=None, jTant=None):
+        """
+        Compute the masks of the transformations of the links once
+        the model has computed them.
+
+        Args:
+            antRj: The rotations from the antecedent frames.
+            antPj: The translations from the antecedent frames.
+            jTant: The screw transformations, the masks are the ones
+                of their transposes.
+        """
+        for j in self.J:
+            if antRj is not None:
+                self.rot[j] = tools.zero_mask(antRj[j])
+            if antPj is not None:
+                self.trans[j] = tools.zero_mask(antPj[j])
+            if jTant is not None:
+                self.screw_t[j] = tools.zero_mask(jTant[j].transpose())
+
+    def has_inertia(self, j):
+        """
+        Return whether the inertia tensor of link j is not zero.
+        """
+        return not all(self.J[j])
+
+    def has_ms(self, j):
+        """
+        Return whether the first moments of link j are not zero.
+        """
+        return not all(self.MS[j])
+
+    def has_trans(self, j):
+        """
+        Return whether the translation to link j is not zero.
+        """
+        return not all(self.trans[j])
+
+
 def compute_torque(robo, symo, j, jaj, react_wrench, torque):
     """
     Compute torque (internal function).
@@ -57,43 +124,62 @@ def compute_joint_torque(robo, symo, j, Fjnt, Njnt, torque):
     torque[j] = symo.replace(tau_total, 'GAM', j, forced=True)
 
 
-def compute_dynamic_wrench(robo, symo, j, w, wdot, U, vdot, F, N):
+def compute_dynamic_wrench(
+    robo, symo, j, w, wdot, U, vdot, F, N, masks=None
+):
     """
     Compute total wrench of link j (internal function).
 
     Note:
-        F, N are the output parameters
+        F, N are the output parameters. masks is the ZeroMasks of
+        robo, computed for link j if not given.
     """
-    F[j] = (robo.M[j] * vdot[j]) + (U[j] * robo.MS[j])
+    if masks is None:
+        masks = ZeroMasks(robo, [j])
+    F[j] = robo.M[j] * vdot[j]
+    if masks.has_ms(j):
+        F[j] = F[j] + tools.masked_mul(U[j], robo.MS[j], mask_b=masks.MS[j])
     F[j] = symo.mat_replace(F[j], 'F', j)
-    Psi = robo.J[j] * w[j]
+    if not masks.has_inertia(j):
+        N[j] = Matrix([0, 0, 0])
+        return
+    Psi = tools.masked_mul(robo.J[j], w[j], mask_a=masks.J[j])
     Psi = symo.mat_replace(Psi, 'PSI', j)
-    N[j] = (robo.J[j] * wdot[j]) + (tools.skew(w[j]) * Psi)
+    N[j] = tools.masked_mul(robo.J[j], wdot[j], mask_a=masks.J[j]) + \
+        tools.masked_mul(tools.skew(w[j]), Psi)
     N[j] = symo.mat_replace(N[j], 'No', j)
 
 
 def compute_joint_wrench(
-    robo, symo, j, antRj, antPj, vdot, F, N, Fjnt, Njnt, Fex, Nex
+    robo, symo, j, antRj, antPj, vdot, F, N, Fjnt, Njnt, Fex, Nex,
+    masks=None
 ):
     """
     Compute reaction wrench (for default Newton-Euler) of joint j
     (internal function).
 
     Note:
-        Fjnt, Njnt, Fex, Nex are the output parameters
+        Fjnt, Njnt, Fex, Nex are the output parameters. masks is the
+        ZeroMasks of robo, computed for link j if not given.
     """
+    if masks is None:
+        masks = ZeroMasks(robo, [j])
     forced = True if j == 0 else False
     i = robo.ant[j]
     Fjnt[j] = F[j] + Fex[j]
     Fjnt[j] = symo.mat_replace(Fjnt[j], 'E', j, forced=forced)
-    Njnt[j] = N[j] + Nex[j] + (tools.skew(robo.MS[j]) * vdot[j])
+    Njnt[j] = N[j] + Nex[j]
+    if masks.has_ms(j):
+        Njnt[j] = Njnt[j] + tools.masked_mul(
+            tools.skew(robo.MS[j]), vdot[j], mask_a=masks.skew_MS[j]
+        )
     Njnt[j] = symo.mat_replace(Njnt[j], 'N', j, forced=forced)
-    f_ant = antRj[j] * Fjnt[j]
+    f_ant = tools.masked_mul(antRj[j], Fjnt[j])
     f_ant = symo.mat_replace(f_ant, 'FDI', j)
     if i != -1:
         Fex[i] = Fex[i] + f_ant
-        Nex[i] = Nex[i] + \
-            (antRj[j] * Njnt[j]) + (tools.skew(antPj[j]) * f_ant)
+        Nex[i] = Nex[i] + tools.masked_mul(antRj[j], Njnt[j]) + \
+            tools.masked_mul(tools.skew(antPj[j]), f_ant)
 
 
 def compute_beta(robo, symo, j, w, beta):
@@ -153,15 +239,19 @@ def compute_zeta(robo, symo, j, gamma, jaj, zeta, qddot=None):
 
 def compute_composite_inertia(
     robo, symo, j, antRj, antPj,
-    comp_inertia3, comp_ms, comp_mass, composite_inertia
+    comp_inertia3, comp_ms, comp_mass, composite_inertia, masks=None
 ):
     """
     Compute composite inertia (internal function).
 
     Note:
         comp_inertia3, comp_ms, comp_mass, composite_inertia are the
-        output parameters.
+        output parameters. masks is the ZeroMasks of robo with the
+        transformations added, computed for link j if not given.
     """
+    if masks is None:
+        masks = ZeroMasks(robo, [j])
+        masks.add_transforms(antRj, antPj)
     i = robo.ant[j]
     # update inertia3, ms, mass from inertia in order to have the
     # intermediate variables
@@ -171,18 +261,22 @@ def compute_composite_inertia(
     comp_inertia3[j] = composite_inertia[j][3:, 3:]
     comp_ms[j] = tools.skew2vec(composite_inertia[j][3:, 0:3])
     comp_mass[j] = composite_inertia[j][0, 0]
-    # actual computation
-    i_ms_j_c = antRj[j] * comp_ms[j]
+    # actual computation, the products with a zero antPj are skipped
+    rot_mask = masks.rot[j]
+    i_ms_j_c = tools.masked_mul(antRj[j], comp_ms[j], mask_a=rot_mask)
     i_ms_j_c = symo.mat_replace(i_ms_j_c, 'AS', j)
-    expr1 = antRj[j] * comp_inertia3[j]
+    expr1 = tools.masked_mul(antRj[j], comp_inertia3[j], mask_a=rot_mask)
     expr1 = symo.mat_replace(expr1, 'AJ', j)
-    expr2 = expr1 * antRj[j].transpose()
+    expr2 = tools.masked_mul(expr1, antRj[j].transpose())
     expr2 = symo.mat_replace(expr2, 'AJA', j)
-    expr3 = tools.skew(antPj[j]) * tools.skew(i_ms_j_c)
-    expr3 = symo.mat_replace(expr3, 'PAS', j)
-    i_comp_inertia3_j = expr2 - (expr3 + expr3.transpose()) + \
-        (comp_mass[j] * tools.skew(antPj[j]) * \
-        tools.skew(antPj[j]).transpose())
+    if not masks.has_trans(j):
+        i_comp_inertia3_j = expr2
+    else:
+        skew_p = tools.skew(antPj[j])
+        expr3 = tools.masked_mul(skew_p, tools.skew(i_ms_j_c))
+        expr3 = symo.mat_replace(expr3, 'PAS', j)
+        i_comp_inertia3_j = expr2 - (expr3 + expr3.transpose()) + \
+            tools.masked_mul(comp_mass[j] * skew_p, skew_p.transpose())
     i_comp_inertia3_j = symo.mat_replace(i_comp_inertia3_j, 'JJI', j)
     comp_inertia3[i] = comp_inertia3[i] + i_comp_inertia3_j
     i_comp_ms_j = i_ms_j_c + (antPj[j] * comp_mass[j])
@@ -196,20 +290,29 @@ def compute_composite_inertia(
 
 
 def compute_composite_beta(
-    robo, symo, j, jTant, zeta, composite_inertia, composite_beta
+    robo, symo, j, jTant, zeta, composite_inertia, composite_beta,
+    masks=None
 ):
     """
     Compute composite beta (internal function).
 
     Note:
-        composite_beta is the output parameter
+        composite_beta is the output parameter. masks is the ZeroMasks
+        of robo with the transformations added, computed for link j if
+        not given.
     """
     i = robo.ant[j]
+    if masks is None:
+        masks = ZeroMasks(robo, [j])
+        masks.add_transforms(jTant=jTant)
+    # the screw transformation has a zero block
+    trans = jTant[j].transpose()
+    trans_mask = masks.screw_t[j]
     expr1 = composite_inertia[j] * zeta[j]
     expr1 = symo.mat_replace(expr1, 'IZ', j)
-    expr2 = jTant[j].transpose() * expr1
+    expr2 = tools.masked_mul(trans, expr1, mask_a=trans_mask)
     expr2 = symo.mat_replace(expr2, 'SIZ', j)
-    expr3 = jTant[j].transpose() * composite_beta[j]
+    expr3 = tools.masked_mul(trans, composite_beta[j], mask_a=trans_mask)
     expr3 = symo.mat_replace(expr3, 'SBE', j)
     composite_beta[i] = composite_beta[i] + expr3 - expr2
 
@@ -253,22 +356,30 @@ def replace_star_terms(
 
 def compute_composite_terms(
     robo, symo, j, jTant, zeta,
-    composite_inertia, composite_beta
+    composite_inertia, composite_beta, masks=None
 ):
     """
     Compute composite inertia and beta (internal function).
 
     Note:
-        composite_inertia are composite_beta are the output parameters
+        composite_inertia are composite_beta are the output parameters.
+        masks is the ZeroMasks of robo with the transformations added,
+        computed for link j if not given.
     """
     i = robo.ant[j]
-    expr1 = jTant[j].transpose() * composite_inertia[j]
+    if masks is None:
+        masks = ZeroMasks(robo, [j])
+        masks.add_transforms(jTant=jTant)
+    # the screw transformation has a zero block
+    trans = jTant[j].transpose()
+    trans_mask = masks.screw_t[j]
+    expr1 = tools.masked_mul(trans, composite_inertia[j], mask_a=trans_mask)
     expr1 = symo.mat_replace(expr1, 'GX', j)
-    expr2 = expr1 * jTant[j]
+    expr2 = tools.masked_mul(expr1, jTant[j])
     expr2 = symo.mat_replace(expr2, 'TKT', j, symmet=True)
     expr3 = expr1 * zeta[j]
     expr3 = symo.mat_replace(expr3, 'SIZ', j)
-    expr4 = jTant[j].transpose() * composite_beta[j]
+    expr4 = tools.masked_mul(trans, composite_beta[j], mask_a=trans_mask)
     expr4 = symo.mat_replace(expr4, 'SBE', j)
     composite_inertia[i] = composite_inertia[i] + expr2
     composite_beta[i] = composite_beta[i] + expr4 - expr3
@@ -445,7 +556,7 @@ def get_numerical_base_acc_out(base_acc):
         if i > 2:
             idx = idx - 3
             vp_sym = 'WP{row}0'.format(row=idx)
-        base_acc[i, 0] = sympy.var(vp_sym)
+        base_acc[i, 0] = tools.syms(vp_sym)
     return base_acc
 
 
@@ -537,12 +648,16 @@ def fixed_inverse_dynmodel(robo, symo):
     Njnt = ParamsInit.init_vec(robo)
     # init torque list
     torque = ParamsInit.init_scalar(robo)
+    # structural zeros of the inertial parameters
+    masks = ZeroMasks(robo)
     for j in xrange(1, robo.NL):
-        compute_dynamic_wrench(robo, symo, j, w, wdot, U, vdot, F, N)
+        compute_dynamic_wrench(
+            robo, symo, j, w, wdot, U, vdot, F, N, masks
+        )
     for j in reversed(xrange(1, robo.NL)):
         compute_joint_wrench(
             robo, symo, j, antRj, antPj, vdot,
-            F, N, Fjnt, Njnt, Fex, Nex
+            F, N, Fjnt, Njnt, Fex, Nex, masks
         )
     for j in xrange(1, robo.NL):
         compute_joint_torque(robo, symo, j, Fjnt, Njnt, torque)
@@ -571,12 +686,16 @@ def mobile_inverse_dynmodel(robo, symo):
     Njnt = ParamsInit.init_vec(robo)
     # init torque list
     torque = ParamsInit.init_scalar(robo)
+    # structural zeros of the inertial parameters
+    masks = ZeroMasks(robo)
     for j in xrange(0, robo.NL):
-        compute_dynamic_wrench(robo, symo, j, w, wdot, U, vdot, F, N)
+        compute_dynamic_wrench(
+            robo, symo, j, w, wdot, U, vdot, F, N, masks
+        )
     for j in reversed(xrange(0, robo.NL)):
         compute_joint_wrench(
             robo, symo, j, antRj, antPj, vdot,
-            F, N, Fjnt, Njnt, Fex, Nex
+            F, N, Fjnt, Njnt, Fex, Nex, masks
         )
     for j in xrange(1, robo.NL):
         compute_joint_torque(robo, symo, j, Fjnt, Njnt, torque)
@@ -633,6 +752,9 @@ def composite_inverse_dynmodel(robo, symo):
         compute_beta(robo, symo, j, w, beta)
         # compute j^zeta_j : relative acceleration (6x1)
         compute_zeta(robo, symo, j, gamma, jaj, zeta)
+    # structural zeros of the transformations
+    masks = ZeroMasks(robo)
+    masks.add_transforms(antRj, antPj, jTant)
     # first backward recursion - initialisation step
     for j in reversed(xrange(0, robo.NL)):
         if j == 0:
@@ -653,10 +775,11 @@ def composite_inverse_dynmodel(robo, symo):
             continue
         compute_composite_inertia(
             robo, symo, j, antRj, antPj,
-            comp_inertia3, comp_ms, comp_mass, composite_inertia
+            comp_inertia3, comp_ms, comp_mass, composite_inertia, masks
         )
         compute_composite_beta(
-            robo, symo, j, jTant, zeta, composite_inertia, composite_beta
+            robo, symo, j, jTant, zeta,
+            composite_inertia, composite_beta, masks
         )
     # compute base acceleration : this returns the correct value for
     # fixed base and floating base robots
@@ -735,6 +858,9 @@ def flexible_inverse_dynmodel(robo, symo):
             # when rigid
             # compute j^zeta_j : relative acceleration (6x1)
             compute_zeta(robo, symo, j, gamma, jaj, zeta)
+    # structural zeros of the transformations
+    masks = ZeroMasks(robo)
+    masks.add_transforms(antRj, antPj, jTant)
     # decide first link
     first_link = 0 if robo.is_floating else 1
     # first backward recursion - initialisation step
@@ -761,10 +887,10 @@ def flexible_inverse_dynmodel(robo, symo):
             # use composite
             compute_composite_inertia(
                 robo, symo, j, antRj, antPj,
-                comp_inertia3, comp_ms, comp_mass, star_inertia
+                comp_inertia3, comp_ms, comp_mass, star_inertia, masks
             )
             compute_composite_beta(
-                robo, symo, j, jTant, zeta, star_inertia, star_beta
+                robo, symo, j, jTant, zeta, star_inertia, star_beta, masks
             )
         else:
             # use star
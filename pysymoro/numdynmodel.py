@@ -0,0 +1,458 @@
+# -*- coding: utf-8 -*-
+
+
+# This file is part of the OpenSYMORO project. Please see
+# https://github.com/symoro/symoro/blob/master/LICENCE for the licence.
+
+
+"""
+This module contains the numeric counterpart of the dynamic model
+computation in `dynmodel`. The same recursive Newton-Euler passes are
+run on NumPy arrays when all the parameters of the robot are numbers
+(`FloatingRobot` with `is_symbolic=False`).
+
+The engine of a robot is available as `FloatingRobot.numeric_engine`.
+Its methods take and return NumPy arrays and it is the fast way to
+evaluate the models many times.
+"""
+
+
+import math
+
+import numpy
+
+
+def _skew(vec, out):
+    """
+    Fill `out` with the skew-symmetric matrix of a 3-vector.
+
+    Args:
+        vec: A NumPy array of size 3.
+        out: A (3x3) NumPy array that is modified in place.
+
+    Returns:
+        The `out` array.
+    """
+    out[0, 0] = 0.0
+    out[0, 1] = -vec[2]
+    out[0, 2] = vec[1]
+    out[1, 0] = vec[2]
+    out[1, 1] = 0.0
+    out[1, 2] = -vec[0]
+    out[2, 0] = -vec[1]
+    out[2, 1] = vec[0]
+    out[2, 2] = 0.0
+    return out
+
+
+def _cross(vec_a, vec_b, out):
+    """
+    Fill `out` with the cross product of two 3-vectors. Faster than
+    numpy.cross for a single pair of vectors.
+
+    Args:
+        vec_a, vec_b: NumPy arrays of size 3.
+        out: A NumPy array of size 3 that is modified in place. It must
+            not share memory with the inputs.
+
+    Returns:
+        The `out` array.
+    """
+    a_x, a_y, a_z = vec_a
+    b_x, b_y, b_z = vec_b
+    out[0] = (a_y * b_z) - (a_z * b_y)
+    out[1] = (a_z * b_x) - (a_x * b_z)
+    out[2] = (a_x * b_y) - (a_y * b_x)
+    return out
+
+
+def _to_float_array(values):
+    """
+    Convert a sympy Matrix or a sequence of numbers to a flat NumPy
+    array of floats.
+    """
+    return numpy.array([float(val) for val in values], dtype=float)
+
+
+class NumericDynModel(object):
+    """
+    Numeric engine for the dynamic models of a robot. All the constant
+    parameters are read from the robot once and all the per-link
+    buffers are allocated in the constructor so that each evaluation
+    only does the arithmetic.
+    """
+    def __init__(self, robo):
+        """
+        Constructor period.
+
+        Args:
+            robo: An instance of FloatingRobot whose parameters are all
+                numbers.
+        """
+        self.robo = robo
+        self.is_floating = robo.is_floating
+        self.joints = list(robo.joint_nums)
+        num = len(self.joints)
+        self.num = num
+        # geometric parameters
+        self.ants = [robo.geos[j].ant for j in self.joints]
+        self.sigmas = [robo.geos[j].sigma for j in self.joints]
+        self.cos_gamma = numpy.zeros(num)
+        self.sin_gamma = numpy.zeros(num)
+        self.cos_alpha = numpy.zeros(num)
+        self.sin_alpha = numpy.zeros(num)
+        self.b = numpy.zeros(num)
+        self.d = numpy.zeros(num)
+        self.theta = numpy.zeros(num)
+        self.r = numpy.zeros(num)
+        self.axes = numpy.zeros((num, 6))
+        for j in self.joints:
+            geo = robo.geos[j]
+            self.cos_gamma[j] = math.cos(float(geo.gamma))
+            self.sin_gamma[j] = math.sin(float(geo.gamma))
+            self.cos_alpha[j] = math.cos(float(geo.alpha))
+            self.sin_alpha[j] = math.sin(float(geo.alpha))
+            self.b[j] = float(geo.b)
+            self.d[j] = float(geo.d)
+            self.theta[j] = float(geo.theta)
+            self.r[j] = float(geo.r)
+            self.axes[j] = _to_float_array(geo.axisa)
+        # dynamic parameters
+        self.inertias = numpy.zeros((num, 6, 6))
+        self.link_inertias = numpy.zeros((num, 3, 3))
+        self.ms = numpy.zeros((num, 3))
+        self.ext_wrenchs = numpy.zeros((num, 6))
+        self.ia = numpy.zeros(num)
+        self.frc = numpy.zeros(num)
+        self.frv = numpy.zeros(num)
+        for j in self.joints:
+            dyn = robo.dyns[j]
+            self.inertias[j] = numpy.array(
+                dyn.spatial_inertia.val.tolist(), dtype=float
+            )
+            self.link_inertias[j] = self.inertias[j, 3:6, 3:6]
+            self.ms[j] = _to_float_array(dyn.mass_tensor)
+            self.ext_wrenchs[j] = _to_float_array(dyn.wrench.val)
+            self.ia[j] = float(dyn.ia)
+            self.frc[j] = float(dyn.frc)
+            self.frv[j] = float(dyn.frv)
+        self.gravity = numpy.zeros(6)
+        self.gravity[0:3] = _to_float_array(robo.gravity)
+        self.base_vel = _to_float_array(robo.base_vel.val)
+        # preallocated buffers
+        self.rots = numpy.zeros((num, 3, 3))
+        self.trans = numpy.zeros((num, 3))
+        self.smats = numpy.zeros((num, 6, 6))
+        self.vels = numpy.zeros((num, 6))
+        self.gammas = numpy.zeros((num, 6))
+        self.zetas = numpy.zeros((num, 6))
+        self.betas = numpy.zeros((num, 6))
+        self.accels = numpy.zeros((num, 6))
+        self.wrenchs = numpy.zeros((num, 6))
+        self.composite_inertias = numpy.zeros((num, 6, 6))
+        self.composite_betas = numpy.zeros((num, 6))
+        self.torques = numpy.zeros(num)
+        self.star_inertias = numpy.zeros((num, 6, 6))
+        self.star_betas = numpy.zeros((num, 6))
+        self.joint_inertias = numpy.zeros(num)
+        self.no_qddot_inertias = numpy.zeros((num, 6, 6))
+        self.taus = numpy.zeros(num)
+        self.alphas = numpy.zeros((num, 6))
+        self.qddots = numpy.zeros(num)
+        self._skew = numpy.zeros((3, 3))
+        self._vec = numpy.zeros(3)
+        self._tmp1 = numpy.zeros(3)
+        self._tmp2 = numpy.zeros(3)
+
+    def set_joint_positions(self, q):
+        """
+        Compute the transformation matrices in screw form for the given
+        joint positions.
+
+        Args:
+            q: A sequence with the joint positions of joints 1 to n.
+                None means that the values stored in the robot
+                parameters are used.
+        """
+        for j in self.joints[1:]:
+            sigma = self.sigmas[j]
+            theta = self.theta[j]
+            r = self.r[j]
+            if q is not None and sigma == 0:
+                theta = q[j - 1]
+            elif q is not None and sigma == 1:
+                r = q[j - 1]
+            c_g = self.cos_gamma[j]
+            s_g = self.sin_gamma[j]
+            c_a = self.cos_alpha[j]
+            s_a = self.sin_alpha[j]
+            c_t = math.cos(theta)
+            s_t = math.sin(theta)
+            sg_ca = s_g * c_a
+            cg_ca = c_g * c_a
+            rot = self.rots[j]
+            rot[0, 0] = (c_g * c_t) - (sg_ca * s_t)
+            rot[0, 1] = -(c_g * s_t) - (sg_ca * c_t)
+            rot[0, 2] = s_g * s_a
+            rot[1, 0] = (s_g * c_t) + (cg_ca * s_t)
+            rot[1, 1] = -(s_g * s_t) + (cg_ca * c_t)
+            rot[1, 2] = -c_g * s_a
+            rot[2, 0] = s_a * s_t
+            rot[2, 1] = s_a * c_t
+            rot[2, 2] = c_a
+            trans = self.trans[j]
+            trans[0] = (self.d[j] * c_g) + (r * s_g * s_a)
+            trans[1] = (self.d[j] * s_g) - (r * c_g * s_a)
+            trans[2] = (r * c_a) + self.b[j]
+            # screw form of the inverse transformation matrix
+            smat = self.smats[j]
+            rot_t = rot.T
+            smat[0:3, 0:3] = rot_t
+            smat[0:3, 3:6] = -numpy.dot(rot_t, _skew(trans, self._skew))
+            smat[3:6, 3:6] = rot_t
+
+    def _forward_velocity(self, qdot):
+        """
+        Compute the link velocities, the gyroscopic accelerations and
+        the beta wrenches (first forward recursion).
+        """
+        self.vels[0] = self.base_vel
+        for j in self.joints[1:]:
+            i = self.ants[j]
+            smat = self.smats[j]
+            qdot_j = qdot[j - 1]
+            sigma = self.sigmas[j]
+            # j^V_j : link velocity
+            numpy.dot(smat, self.vels[i], out=self.vels[j])
+            self.vels[j] += qdot_j * self.axes[j]
+            # j^gamma_j : gyroscopic acceleration
+            i_omega_i = self.vels[i, 3:6]
+            rot_t = self.rots[j].T
+            term1 = _cross(
+                i_omega_i,
+                _cross(i_omega_i, self.trans[j], self._tmp1),
+                self._tmp2
+            )
+            j_omega_i = numpy.dot(rot_t, i_omega_i)
+            # term2 = j_omega_i x (qdot_j * z)
+            self._vec[0] = j_omega_i[1] * qdot_j
+            self._vec[1] = -j_omega_i[0] * qdot_j
+            self._vec[2] = 0.0
+            if sigma == 2:
+                self._vec[:] = 0.0
+            gamma = self.gammas[j]
+            gamma[0:3] = numpy.dot(rot_t, term1)
+            if sigma == 1:
+                gamma[0:3] += 2 * self._vec
+                gamma[3:6] = 0.0
+            elif sigma == 0:
+                gamma[3:6] = self._vec
+            else:
+                gamma[3:6] = 0.0
+        for j in self.joints:
+            self._compute_beta(j)
+
+    def _compute_beta(self, j):
+        """
+        Compute the wrench that combines the external forces, Coriolis
+        forces and centrifugal forces for link j.
+        """
+        omega = self.vels[j, 3:6]
+        beta = self.betas[j]
+        _cross(omega, _cross(omega, self.ms[j], self._tmp1), beta[0:3])
+        _cross(
+            omega, numpy.dot(self.link_inertias[j], omega), beta[3:6]
+        )
+        numpy.negative(beta, out=beta)
+        beta -= self.ext_wrenchs[j]
+
+    def _base_acceleration(self, inertia, beta):
+        """
+        Compute the base acceleration (with the effect of gravity
+        removed) and store it in the accelerations buffer.
+        """
+        if self.is_floating:
+            self.accels[0] = numpy.linalg.solve(inertia, beta)
+        else:
+            self.accels[0] = 0.0
+        self.accels[0] -= self.gravity
+
+    def inverse_dynamic_model(self, q=None, qdot=None, qddot=None):
+        """
+        Compute the joint torques using the recursive Newton-Euler
+        algorithm.
+
+        Args:
+            q: Joint positions of joints 1 to n.
+            qdot: Joint velocities of joints 1 to n.
+            qddot: Joint accelerations of joints 1 to n.
+            For each of them None means that the values stored in the
+            robot parameters are used.
+
+        Returns:
+            A NumPy array with the joint torques. Index 0 corresponds
+            to the virtual joint of the base. The array is a buffer of
+            the engine and is overwritten by the next evaluation.
+        """
+        if q is None or qdot is None or qddot is None:
+            robo_q, robo_qdot, robo_qddot = joint_state(self.robo)
+            q = robo_q if q is None else q
+            qdot = robo_qdot if qdot is None else qdot
+            qddot = robo_qddot if qddot is None else qddot
+        self.set_joint_positions(q)
+        self._forward_velocity(qdot)
+        # j^zeta_j : relative acceleration
+        for j in self.joints[1:]:
+            numpy.multiply(qddot[j - 1], self.axes[j], out=self.zetas[j])
+            self.zetas[j] += self.gammas[j]
+        # composite terms
+        self.composite_inertias[:] = self.inertias
+        self.composite_betas[:] = self.betas
+        for j in reversed(self.joints[1:]):
+            i = self.ants[j]
+            smat = self.smats[j]
+            j_inertia_j_c = self.composite_inertias[j]
+            inertia_s = numpy.dot(j_inertia_j_c, smat)
+            self.composite_inertias[i] += numpy.dot(smat.T, inertia_s)
+            self.composite_betas[i] += numpy.dot(
+                smat.T,
+                self.composite_betas[j] - numpy.dot(
+                    j_inertia_j_c, self.zetas[j]
+                )
+            )
+        self._base_acceleration(
+            self.composite_inertias[0], self.composite_betas[0]
+        )
+        # link accelerations, reaction wrenches and joint torques
+        for j in self.joints[1:]:
+            i = self.ants[j]
+            numpy.dot(self.smats[j], self.accels[i], out=self.accels[j])
+            self.accels[j] += self.zetas[j]
+            numpy.dot(
+                self.composite_inertias[j], self.accels[j],
+                out=self.wrenchs[j]
+            )
+            self.wrenchs[j] -= self.composite_betas[j]
+            qdot_j = qdot[j - 1]
+            self.torques[j] = numpy.dot(self.wrenchs[j], self.axes[j]) + \
+                (self.ia[j] * qddot[j - 1]) + \
+                (self.frc[j] * numpy.sign(qdot_j)) + \
+                (self.frv[j] * qdot_j)
+        return self.torques
+
+    def direct_dynamic_model(self, q=None, qdot=None, torques=None):
+        """
+        Compute the joint accelerations using the recursive
+        Newton-Euler algorithm with the star (articulated body) inertia
+        matrices.
+
+        Args:
+            q: Joint positions of joints 1 to n.
+            qdot: Joint velocities of joints 1 to n.
+            torques: Joint torques of joints 1 to n.
+            For each of them None means that the values stored in the
+            robot parameters are used.
+
+        Returns:
+            A NumPy array with the joint accelerations. Index 0
+            corresponds to the virtual joint of the base. The array is
+            a buffer of the engine and is overwritten by the next
+            evaluation.
+        """
+        if q is None or qdot is None:
+            robo_q, robo_qdot, _ = joint_state(self.robo)
+            q = robo_q if q is None else q
+            qdot = robo_qdot if qdot is None else qdot
+        if torques is None:
+            torques = joint_torques(self.robo)
+        self.set_joint_positions(q)
+        self._forward_velocity(qdot)
+        # star terms
+        self.star_inertias[:] = self.inertias
+        self.star_betas[:] = self.betas
+        for j in reversed(self.joints[1:]):
+            i = self.ants[j]
+            smat = self.smats[j]
+            axis = self.axes[j]
+            j_inertia_j_s = self.star_inertias[j]
+            j_beta_j_s = self.star_betas[j]
+            # H_j : joint inertia
+            inertia_a = numpy.dot(j_inertia_j_s, axis)
+            h_j = numpy.dot(axis, inertia_a) + self.ia[j]
+            self.joint_inertias[j] = h_j
+            # j^K_j : inertia without the effect of qddot
+            j_k_j = self.no_qddot_inertias[j]
+            j_k_j[:] = j_inertia_j_s
+            j_k_j -= numpy.outer(inertia_a, inertia_a) / h_j
+            # tau_j : torque without the friction terms
+            qdot_j = qdot[j - 1]
+            self.taus[j] = torques[j - 1] - \
+                (self.frc[j] * numpy.sign(qdot_j)) - \
+                (self.frv[j] * qdot_j)
+            # j^alpha_j : wrench as a function of tau
+            alpha = self.alphas[j]
+            numpy.dot(j_k_j, self.gammas[j], out=alpha)
+            alpha += inertia_a * (
+                (self.taus[j] + numpy.dot(axis, j_beta_j_s)) / h_j
+            )
+            alpha -= j_beta_j_s
+            # i^I_i^* and i^beta_i^*
+            self.star_inertias[i] += numpy.dot(
+                smat.T, numpy.dot(j_k_j, smat)
+            )
+            self.star_betas[i] -= numpy.dot(smat.T, alpha)
+        self._base_acceleration(self.star_inertias[0], self.star_betas[0])
+        # joint accelerations, reaction wrenches and link accelerations
+        for j in self.joints[1:]:
+            i = self.ants[j]
+            axis = self.axes[j]
+            i_vdot_j = numpy.dot(self.smats[j], self.accels[i])
+            self.qddots[j] = (
+                self.taus[j] + numpy.dot(axis, self.star_betas[j]) -
+                numpy.dot(
+                    axis, numpy.dot(
+                        self.star_inertias[j], i_vdot_j + self.gammas[j]
+                    )
+                )
+            ) / self.joint_inertias[j]
+            numpy.dot(self.no_qddot_inertias[j], i_vdot_j,
+                      out=self.wrenchs[j])
+            self.wrenchs[j] += self.alphas[j]
+            numpy.multiply(self.qddots[j], axis, out=self.zetas[j])
+            self.zetas[j] += self.gammas[j]
+            numpy.add(i_vdot_j, self.zetas[j], out=self.accels[j])
+        return self.qddots
+
+
+def joint_torques(robo):
+    """
+    Get the joint torques of joints 1 to n as stored in the robot
+    parameters.
+
+    Args:
+        robo: An instance of the FloatingRobot class with numeric
+            parameters.
+
+    Returns:
+        A list with the joint torques.
+    """
+    return [float(robo.torques[j]) for j in list(robo.joint_nums)[1:]]
+
+
+def joint_state(robo):
+    """
+    Get the joint positions, velocities and accelerations of joints 1
+    to n as stored in the robot parameters.
+
+    Args:
+        robo: An instance of the FloatingRobot class with numeric
+            parameters.
+
+    Returns:
+        A tuple of three lists (q, qdot, qddot).
+    """
+    joints = list(robo.joint_nums)[1:]
+    q = [float(robo.geos[j].q) for j in joints]
+    qdot = [float(robo.qdots[j]) for j in joints]
+    qddot = [float(robo.qddots[j]) for j in joints]
+    return q, qdot, qddot
@@ -11,7 +11,7 @@ solutions for inverse geometric problem using Pieper Method.
 """
 
 
-from sympy import var, sin, cos, eye, atan2, sqrt, pi
+from sympy import sin, cos, eye, atan2, sqrt, pi
 from sympy import Matrix, Symbol, Expr, trigsimp, zeros, ones
 from numpy import array, dot
 
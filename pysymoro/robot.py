@@ -14,23 +14,61 @@ of the robot parametrizaion container and symbol replacer class.
 import re
 import os
 import copy
+import functools
 from itertools import combinations
 
 from sympy import sin, cos, sign, pi
-from sympy import Symbol, Matrix, Expr, Integer
-from sympy import Mul, Add, factor, zeros, var, sympify, eye
+from sympy import Symbol, Matrix, Expr, Integer, Basic
+from sympy import Mul, Add, factor, zeros, sympify, eye
 
 from pysymoro import baseparams
 from pysymoro import dyniden
 from pysymoro import inertia
 from pysymoro import nealgos
 from symoroutils import filemgr
+from symoroutils import modelcache
 from symoroutils import symbolmgr
 from symoroutils import tools
 from symoroutils.tools import ZERO, ONE, FAIL, OK
 from symoroutils.tools import CLOSED_LOOP, SIMPLE, TREE, TYPES, INT_KEYS
 
 
+# parameters replaced by Robot.specialize
+SPECIALIZED_LISTS = [
+    'theta', 'r', 'alpha', 'd', 'gamma', 'b', 'J', 'MS', 'M',
+    'IA', 'FV', 'FS', 'Fex', 'Nex', 'qdot', 'qddot', 'k'
+]
+SPECIALIZED_ATTRS = ['G', 'w0', 'wdot0', 'v0', 'vdot0', 'Z']
+# appended to the name of the specialized robot (and of its files)
+SPECIALIZED_SUFFIX = '_num'
+
+
+def _specialize(value, subs):
+    """Replaces the symbols of a parameter (expression, matrix or
+    number) by their values.
+    """
+    if isinstance(value, Matrix):
+        return value.applyfunc(lambda elem: elem.xreplace(subs))
+    elif isinstance(value, Basic):
+        return value.xreplace(subs)
+    return value
+
+
+def specializable(compute):
+    """Decorator for the Robot methods that compute a model. The
+    decorated method accepts an extra keyword argument `specialize`,
+    a dictionary of numerical values of the parameters, and computes
+    the model of `Robot.specialize(specialize)`.
+    """
+    @functools.wraps(compute)
+    def wrapper(robo, *args, **kwargs):
+        values = kwargs.pop('specialize', None)
+        if values:
+            robo = robo.specialize(values)
+        return compute(robo, *args, **kwargs)
+    return wrapper
+
+
 class Robot(object):
     """Container of the robot parametric description.
     Responsible for low-level geometric transformation
@@ -67,7 +105,7 @@ class Robot(object):
         """actuated, if 1, then the joint is actuated"""
         self.mu = [1 for i in xrange(NF + 1)]
         """  geometrical parameter: list of var"""
-        self.theta = [0] + [var('th%s' % (i+1)) for i in xrange(NF)]
+        self.theta = [0] + [tools.syms('th%s' % (i+1)) for i in xrange(NF)]
         """  geometrical parameter: list of var"""
         self.r = [0 for i in xrange(NF + 1)]
         """  geometrical parameter: list of var"""
@@ -91,32 +129,38 @@ class Robot(object):
         """  base linear acceleration: 3x1 matrix"""
         self.vdot0 = zeros(3, 1)
         """  joint speed: list of var"""
-        self.qdot = [var('QP{0}'.format(i)) for i in numj]
+        self.qdot = [tools.syms('QP{0}'.format(i)) for i in numj]
         """  joint acceleration: list of var"""
-        self.qddot = [var('QDP{0}'.format(i)) for i in numj]
+        self.qddot = [tools.syms('QDP{0}'.format(i)) for i in numj]
         """  external moment of link: list of 3x1 matrix"""
         self.Nex = [zeros(3, 1) for i in num]
-        self.Nex[-1] = Matrix(var('CX{0}, CY{0}, CZ{0}'.format(self.NL - 1)))
+        self.Nex[-1] = Matrix(
+            tools.syms('CX{0}, CY{0}, CZ{0}'.format(self.NL - 1))
+        )
         """  external force of link: list of 3x1 matrix"""
         self.Fex = [zeros(3, 1) for i in num]
-        self.Fex[-1] = Matrix(var('FX{0}, FY{0}, FZ{0}'.format(self.NL - 1)))
+        self.Fex[-1] = Matrix(
+            tools.syms('FX{0}, FY{0}, FZ{0}'.format(self.NL - 1))
+        )
         """  dry friction coefficient: list of ver"""
-        self.FS = [var('FS{0}'.format(i)) for i in num]
+        self.FS = [tools.syms('FS{0}'.format(i)) for i in num]
         """  joint actuator inertia: list of var"""
-        self.IA = [var('IA{0}'.format(i)) for i in num]
+        self.IA = [tools.syms('IA{0}'.format(i)) for i in num]
         """  viscous friction coefficient: list of var"""
-        self.FV = [var('FV{0}'.format(i)) for i in num]
+        self.FV = [tools.syms('FV{0}'.format(i)) for i in num]
         """  first momentum of link: list of 3x1 matrix"""
-        self.MS = [Matrix(var('MX{0}, MY{0}, MZ{0}'.format(i))) for i in num]
+        self.MS = [
+            Matrix(tools.syms('MX{0}, MY{0}, MZ{0}'.format(i))) for i in num
+        ]
         """  mass of link: list of var"""
-        self.M = [var('M{0}'.format(i)) for i in num]
+        self.M = [tools.syms('M{0}'.format(i)) for i in num]
         """  joint torques: list of var"""
-        self.GAM = [var('GAM{0}'.format(i)) for i in numj]
+        self.GAM = [tools.syms('GAM{0}'.format(i)) for i in numj]
         """  inertia tensor of link: list of 3x3 matrix"""
         J_str = 'XX{0},XY{0},XZ{0},XY{0},YY{0},YZ{0},XZ{0},YZ{0},ZZ{0}'
-        self.J = [Matrix(3, 3, var(J_str.format(i))) for i in num]
+        self.J = [Matrix(3, 3, tools.syms(J_str.format(i))) for i in num]
         """  gravity vector: 3x1 matrix"""
-        self.G = Matrix([0, 0, var('GZ')])
+        self.G = Matrix([0, 0, tools.syms('GZ')])
         """  eta - rigid or flexible"""
         self.eta = [0 for j in numj]
         """  k - joint stiffness"""
@@ -243,42 +287,67 @@ class Robot(object):
         else:
             return 0
 
-    def compute_idym(self):
+    @specializable
+    @modelcache.cached('idm')
+    def compute_idym(self, outputs=None):
         """
         Compute the Inverse Dynamic Model of the robot using the
         recursive Newton-Euler algorithm. Also choose the Newton-Euler
         algorithm based on the robot type.
+
+        With outputs, a list of symbols of the model (e.g. some of the
+        joint torques GAMj), only the equations needed to compute them
+        are kept and written. ValueError is raised if they depend on
+        symbols that are not parameters of the robot and for floating
+        robots, whose base acceleration is solved numerically.
+
+        The keyword argument use_cache (True or a ModelCache instance)
+        enables the on-disk model cache and specialize (a dictionary of
+        numerical values, see `specialize`) folds the known constants.
         """
+        if outputs is not None and self.is_floating:
+            raise ValueError(
+                "The model of a floating robot cannot be pruned"
+            )
         symo = symbolmgr.SymbolManager()
         symo.file_open(self, 'idm')
         title = "Inverse Dynamic Model using Newton-Euler Algorithm\n"
         if 1 in self.eta:
             # with flexible joints
             title = title + "Robot with flexible joints\n"
-            symo.write_params_table(self, title, inert=True, dynam=True)
-            nealgos.flexible_inverse_dynmodel(self, symo)
+            algo = nealgos.flexible_inverse_dynmodel
         elif self.is_floating:
             # with rigid joints and floating base
             title = title + "Robot with rigid joints and floating base\n"
-            symo.write_params_table(self, title, inert=True, dynam=True)
-            nealgos.composite_inverse_dynmodel(self, symo)
+            algo = nealgos.composite_inverse_dynmodel
         elif self.is_mobile:
             # mobile robot with rigid joints - known base acceleration
             title = title + "Robot with mobile base (Vdot0 is known)\n"
-            symo.write_params_table(self, title, inert=True, dynam=True)
-            nealgos.mobile_inverse_dynmodel(self, symo)
+            algo = nealgos.mobile_inverse_dynmodel
         else:
             # with rigid joints and fixed base
             title = title + "Robot with rigid joints and fixed base\n"
-            symo.write_params_table(self, title, inert=True, dynam=True)
-            nealgos.fixed_inverse_dynmodel(self, symo)
+            algo = nealgos.fixed_inverse_dynmodel
+        symo.write_params_table(self, title, inert=True, dynam=True)
+        if outputs is None:
+            algo(self, symo)
+        else:
+            symo.compute_pruned(
+                functools.partial(algo, self), outputs, self.param_syms()
+            )
         symo.file_close()
         return symo
 
+    @specializable
+    @modelcache.cached('inm')
     def compute_inertiamatrix(self):
         """
         Compute the Inertia Matrix of the robot using the Composite link
         algorithm.
+
+        The keyword argument use_cache (True or a ModelCache instance)
+        enables the on-disk model cache and specialize (a dictionary of
+        numerical values, see `specialize`) folds the known constants.
         """
         symo = symbolmgr.SymbolManager()
         symo.file_open(self, 'inm')
@@ -296,10 +365,16 @@ class Robot(object):
         symo.file_close()
         return symo
 
+    @specializable
+    @modelcache.cached('ddm')
     def compute_ddym(self):
         """
         Compute the Direct Dynamic Model of the robot using the
         recursive Newton-Euler algorithm.
+
+        The keyword argument use_cache (True or a ModelCache instance)
+        enables the on-disk model cache and specialize (a dictionary of
+        numerical values, see `specialize`) folds the known constants.
         """
         symo = symbolmgr.SymbolManager()
         symo.file_open(self, 'ddm')
@@ -315,10 +390,16 @@ class Robot(object):
         symo.file_close()
         return symo
 
+    @specializable
+    @modelcache.cached('ccg')
     def compute_pseudotorques(self):
         """
         Compute Coriolis, Centrifugal, Gravity, Friction and external
         torques using Newton-Euler algortihm.
+
+        The keyword argument use_cache (True or a ModelCache instance)
+        enables the on-disk model cache and specialize (a dictionary of
+        numerical values, see `specialize`) folds the known constants.
         """
         pseudo_robo = copy.deepcopy(self)
         pseudo_robo.qddot = zeros(pseudo_robo.NL, 1)
@@ -348,9 +429,13 @@ class Robot(object):
         symo.file_close()
         return symo
 
+    @specializable
     def compute_baseparams(self):
         """
         Compute the Base Inertial Parameters of the robot.
+
+        The keyword argument specialize (a dictionary of numerical
+        values, see `specialize`) folds the known constants.
         """
         base_robo = copy.deepcopy(self)
         symo = symbolmgr.SymbolManager()
@@ -373,18 +458,75 @@ class Robot(object):
         base_robo.set_par_file_path(file_path)
         return symo, base_robo
 
-    def compute_dynidenmodel(self):
+    @specializable
+    @modelcache.cached('dim', ignore=('processes',))
+    def compute_dynidenmodel(self, processes=1):
         """
         Compute the Dynamic Identification model of the robot.
+
+        The models of the inertial parameters are computed by
+        `processes` worker processes (None for the number of CPUs).
+        The keyword argument use_cache (True or a ModelCache instance)
+        enables the on-disk model cache and specialize (a dictionary of
+        numerical values, see `specialize`) folds the known constants.
         """
         symo = symbolmgr.SymbolManager()
         symo.file_open(self, 'dim')
         title = "Dynamic Identification Model (Newton-Euler method)"
         symo.write_params_table(self, title, inert=True, dynam=True)
-        dyniden.dynamic_identification_model(self, symo)
+        dyniden.dynamic_identification_model(self, symo, processes)
         symo.file_close()
         return symo
 
+    def specialize(self, values):
+        """Returns a copy of the robot where the symbols of the
+        parameters are replaced by numerical values. The models of the
+        copy are generated with these constants folded: the terms
+        multiplied by a zero value vanish and, as for any model, the
+        intermediate expressions that fold to a constant are not
+        written (the forced ones such as the torques are). The name
+        of the copy has the suffix '_num', so its PAR and output
+        files do not overwrite the ones of the symbolic robot.
+
+        Parameters
+        ==========
+        values: dict
+            Numerical values of the symbols. The keys are symbols or
+            symbol names, e.g. {'D3': 0.45, 'XX2': 0}
+
+        Returns
+        =======
+        specialize: Robot
+        """
+        subs = dict(
+            (tools.syms(key) if isinstance(key, basestring) else key,
+             sympify(value))
+            for key, value in values.iteritems()
+        )
+        robo = copy.deepcopy(self)
+        robo.name = self.name + SPECIALIZED_SUFFIX
+        robo.set_par_file_path()
+        for name in SPECIALIZED_LISTS:
+            setattr(robo, name, [
+                _specialize(value, subs) for value in getattr(robo, name)
+            ])
+        for name in SPECIALIZED_ATTRS:
+            setattr(robo, name, _specialize(getattr(robo, name), subs))
+        return robo
+
+    def param_syms(self):
+        """Returns the list of the symbols of the parameters, the ones
+        that `specialize` replaces (joint variables included).
+        """
+        syms = set()
+        values = [getattr(self, name) for name in SPECIALIZED_ATTRS]
+        for name in SPECIALIZED_LISTS:
+            values.extend(getattr(self, name))
+        for value in values:
+            if isinstance(value, (Basic, Matrix)):
+                syms |= value.atoms(Symbol)
+        return sorted(syms, key=str)
+
     @property
     def q_vec(self):
         """Generates vector of joint variables
@@ -720,14 +862,14 @@ class Robot(object):
                     self.qddot[j] = 0
                     self.GAM[j] = 0
                 else:
-                    self.qdot[j] = var('QP{0}'.format(j))
-                    self.qddot[j] = var('QDP{0}'.format(j))
-                    self.GAM[j] = var('GAM{0}'.format(j))
+                    self.qdot[j] = tools.syms('QP{0}'.format(j))
+                    self.qddot[j] = tools.syms('QDP{0}'.format(j))
+                    self.GAM[j] = tools.syms('GAM{0}'.format(j))
             except IndexError:
                 # just ignore exception
                 pass
             if self.eta[j] == 1:
-                self.k[j] = var('k{0}'.format(j))
+                self.k[j] = tools.syms('k{0}'.format(j))
             else:
                 self.k[j] = 0
 
@@ -738,9 +880,9 @@ class Robot(object):
         """
         for j in xrange(1, self.NF):
             if self.sigma[j] == 0:
-                self.theta[j] = var('th{0}'.format(j))
+                self.theta[j] = tools.syms('th{0}'.format(j))
             elif self.sigma[j] == 1:
-                self.r[j] = var('r{0}'.format(j))
+                self.r[j] = tools.syms('r{0}'.format(j))
             elif self.sigma[j] == 2:
                 self.mu[j] = 0
 
@@ -750,16 +892,16 @@ class Robot(object):
         from the ones set in the ctor.
         """
         if self.is_floating or self.is_mobile:
-            self.G = Matrix([var('GX'), var('GY'), var('GZ')])
-            self.v0 = Matrix([var('VXb'), var('VYb'), var('VZb')])
-            self.w0 = Matrix([var('WXb'), var('WYb'), var('WZb')])
-            self.vdot0 = Matrix([var('VPXb'), var('VPYb'), var('VPZb')])
-            self.wdot0 = Matrix([var('WPXb'), var('WPYb'), var('WPZb')])
+            self.G = Matrix(tools.syms('GX, GY, GZ'))
+            self.v0 = Matrix(tools.syms('VXb, VYb, VZb'))
+            self.w0 = Matrix(tools.syms('WXb, WYb, WZb'))
+            self.vdot0 = Matrix(tools.syms('VPXb, VPYb, VPZb'))
+            self.wdot0 = Matrix(tools.syms('WPXb, WPYb, WPZb'))
             # Z matrix
             for i in range(0, 3):
                 for j in range(0, 3):
-                    self.Z[i, j] = var('Zr{0}{1}'.format(i+1, j+1))
+                    self.Z[i, j] = tools.syms('Zr{0}{1}'.format(i+1, j+1))
             for j in range(0, 3):
-                self.Z[j, 3] = var('Zt{0}'.format(j+1))
+                self.Z[j, 3] = tools.syms('Zt{0}'.format(j+1))
 
 
@@ -8,13 +8,14 @@ as well.
 """
 
 
-from sympy import eye, var
+from sympy import eye
 from sympy import Matrix
 
 from pysymoro.screw import Screw
 from pysymoro.dynparams import DynParams
 from pysymoro.geoparams import GeoParams
 from pysymoro import dynmodel
+from pysymoro import numdynmodel
 from symoroutils import filemgr
 from symoroutils import tools
 
@@ -70,11 +71,13 @@ class FloatingRobot(object):
         """Joint stiffness usually indicated by k."""
         self.stiffness = [0 for j in self.joint_nums]
         """Joint velocities."""
-        self.qdots = [var('QP{0}'.format(j)) for j in self.joint_nums]
+        self.qdots = [tools.syms('QP{0}'.format(j)) for j in self.joint_nums]
         """Joint accelerations."""
-        self.qddots = [var('QDP{0}'.format(j)) for j in self.joint_nums]
+        self.qddots = [tools.syms('QDP{0}'.format(j)) for j in self.joint_nums]
         """Joint torques."""
-        self.torques = [var('GAM{0}'.format(j)) for j in self.joint_nums]
+        self.torques = [
+            tools.syms('GAM{0}'.format(j)) for j in self.joint_nums
+        ]
         # properties dependent on number of frames
         """
         List to hold the geometric parameters. NOTE: This might be moved
@@ -86,7 +89,7 @@ class FloatingRobot(object):
         self.geos = [GeoParams(j) for j in self.frame_nums]
         # properties independent of number of links, joints and frames
         """Gravity vector a 3x1 Matrix."""
-        self.gravity = Matrix([0, 0, var('G3')])
+        self.gravity = Matrix([0, 0, tools.syms('G3')])
         # the values of properties below would be modified during
         # the computation of dynamic models.
         """Base velocity 6x1 column vector - a Screw."""
@@ -95,6 +98,8 @@ class FloatingRobot(object):
         self.base_accel = Screw()
         """Transformation matrix of base wrt a reference frame at time 0."""
         self.base_tmat = eye(4)
+        """Numeric engine of the dynamic models, see numeric_engine."""
+        self._numeric_engine = None
         # call init methods
         self._init_maps()
 
@@ -258,6 +263,8 @@ class FloatingRobot(object):
                 2: {'gravity': 'GZ'}
             }
         """
+        if not self._is_joint_state(kind, params):
+            self._numeric_engine = None
         if kind in ['dyns', 'geos']:
             self._update_dyns_geos(kind, params)
         elif kind is 'misc':
@@ -283,6 +290,7 @@ class FloatingRobot(object):
         """
         if links == None:
             links = self.link_nums
+        self._numeric_engine = None
         for link in links:
             if link in self.link_nums:
                 self.dyns[link].set_to_zero()
@@ -294,6 +302,12 @@ class FloatingRobot(object):
         """
         Compute the Inverse Dynamic Model of the robot using the
         recursive Newton-Euler algorithm.
+
+        Note:
+            For a numeric robot (`is_symbolic=False`) the model is
+            converted to Screw and Screw6 components. To evaluate the
+            model many times, use the `numeric_engine` that works on
+            NumPy arrays.
         """
         self.idym = dynmodel.inverse_dynamic_model(self)
 
@@ -301,9 +315,43 @@ class FloatingRobot(object):
         """
         Compute the Direct Dynamic Model of the robot using the
         recursive Newton-Euler algorithm.
+
+        Note:
+            See `compute_idym`.
         """
         self.ddym = dynmodel.direct_dynamic_model(self)
 
+    @property
+    def numeric_engine(self):
+        """
+        Get the numeric engine of the dynamic models for a robot whose
+        parameters are all numbers. This is the fast API of the
+        numeric models: the methods of the engine take and return
+        NumPy arrays (see `numdynmodel.NumericDynModel`).
+
+        The engine is kept by the robot and is rebuilt only when a
+        parameter other than the joint positions, velocities,
+        accelerations and torques is changed with `update_params` or
+        `set_dyns_to_zero`, or when `is_floating` is changed. After a
+        direct change of the attributes of `geos` or `dyns`, call
+        `reset_numeric_engine`.
+
+        Returns:
+            An instance of NumericDynModel.
+        """
+        engine = self._numeric_engine
+        if engine is None or engine.is_floating != self.is_floating:
+            engine = numdynmodel.NumericDynModel(self)
+            self._numeric_engine = engine
+        return engine
+
+    def reset_numeric_engine(self):
+        """
+        Drop the numeric engine so that it is rebuilt with the current
+        parameters at its next use.
+        """
+        self._numeric_engine = None
+
     @property
     def link_nums(self):
         """
@@ -425,6 +473,31 @@ class FloatingRobot(object):
                 joints.append(j)
         return joints
 
+    def _is_joint_state(self, kind, params):
+        """
+        Check if the parameters to update are only joint positions,
+        velocities, accelerations and torques. These are read at each
+        evaluation of the numeric engine.
+        """
+        if kind == 'misc':
+            names = ['qdots', 'qddots', 'torques']
+            return all(
+                attr in names for key in params for attr in params[key]
+            )
+        if kind == 'geos':
+            for key in params:
+                curr_params = params[key]
+                idx = int(key)
+                if idx not in self.joint_nums or 'sigma' in curr_params:
+                    return False
+                sigma = self.geos[idx].sigma
+                for attr in curr_params:
+                    if not ((attr == 'theta' and sigma == 0) or
+                            (attr == 'r' and sigma == 1)):
+                        return False
+            return True
+        return False
+
     def _update_base(self, params):
         """
         Update the base velocity and acceleration values of the robot.
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+
+
+# This file is part of the OpenSYMORO project. Please see
+# https://github.com/symoro/symoro/blob/master/LICENCE for the licence.
+
+
+"""
+This module contains the forward simulation of a robot. The joint
+accelerations are computed with the numeric direct dynamic model of
+`numdynmodel` and the joint state is integrated with a fixed-step
+(Runge-Kutta 4) or an adaptive-step (Dormand-Prince 5(4)) integrator.
+"""
+
+
+from collections import namedtuple
+
+import numpy
+
+from pysymoro import numdynmodel
+
+
+State = namedtuple('State', ['t', 'q', 'qdot', 'qddot'])
+
+
+# Dormand-Prince 5(4) Butcher tableau
+DP_C = numpy.array([0.0, 1.0/5, 3.0/10, 4.0/5, 8.0/9, 1.0, 1.0])
+DP_A = (
+    (),
+    (1.0/5,),
+    (3.0/40, 9.0/40),
+    (44.0/45, -56.0/15, 32.0/9),
+    (19372.0/6561, -25360.0/2187, 64448.0/6561, -212.0/729),
+    (9017.0/3168, -355.0/33, 46732.0/5247, 49.0/176, -5103.0/18656),
+    (35.0/384, 0.0, 500.0/1113, 125.0/192, -2187.0/6784, 11.0/84)
+)
+# 5th order weights (same as the last row of A - FSAL property)
+DP_B = numpy.array(DP_A[6] + (0.0,))
+# difference between the 5th and the 4th order weights
+DP_E = DP_B - numpy.array([
+    5179.0/57600, 0.0, 7571.0/16695, 393.0/640,
+    -92097.0/339200, 187.0/2100, 1.0/40
+])
+
+
+def rk4_step(func, t, y, h):
+    """
+    Do one step of the classical Runge-Kutta 4 method.
+
+    Args:
+        func: The function f(t, y) giving the derivative of the state.
+        t: The current time.
+        y: The current state as a NumPy array.
+        h: The step size.
+
+    Returns:
+        The state at time t+h.
+    """
+    k_1 = func(t, y)
+    k_2 = func(t + (h / 2), y + ((h / 2) * k_1))
+    k_3 = func(t + (h / 2), y + ((h / 2) * k_2))
+    k_4 = func(t + h, y + (h * k_3))
+    return y + ((h / 6) * (k_1 + (2 * k_2) + (2 * k_3) + k_4))
+
+
+def dopri_step(func, t, y, h, k_1=None):
+    """
+    Do one step of the Dormand-Prince 5(4) method.
+
+    Args:
+        func: The function f(t, y) giving the derivative of the state.
+        t: The current time.
+        y: The current state as a NumPy array.
+        h: The step size.
+        k_1: The derivative at (t, y) if it is already known.
+
+    Returns:
+        A tuple (y_new, error, k_last) with the 5th order estimate of
+        the state at time t+h, the local error estimate and the
+        derivative at (t+h, y_new) that is the k_1 of the next step.
+    """
+    stages = [func(t, y) if k_1 is None else k_1]
+    for row, c_i in zip(DP_A[1:], DP_C[1:]):
+        y_i = y + h * sum(a_ij * k_j for a_ij, k_j in zip(row, stages))
+        stages.append(func(t + (c_i * h), y_i))
+    # the 7th stage is evaluated at the new state
+    y_new = y + h * sum(b_j * k_j for b_j, k_j in zip(DP_A[6], stages))
+    error = h * sum(e_j * k_j for e_j, k_j in zip(DP_E, stages))
+    return y_new, error, stages[-1]
+
+
+def integrate_fixed(func, y0, t0, t_end, step):
+    """
+    Integrate an ODE with the Runge-Kutta 4 method and a fixed step.
+
+    Args:
+        func: The function f(t, y) giving the derivative of the state.
+        y0: The initial state.
+        t0: The initial time.
+        t_end: The final time.
+        step: The step size. The last step is shortened to end
+            exactly at `t_end`.
+
+    Yields:
+        Tuples (t, y) starting with the initial state.
+    """
+    t = float(t0)
+    y = numpy.array(y0, dtype=float)
+    yield t, y
+    num = int(numpy.ceil(((t_end - t0) / step) - 1e-9))
+    for k in xrange(1, num + 1):
+        t_new = min(t0 + (k * step), t_end)
+        y = rk4_step(func, t, y, t_new - t)
+        t = t_new
+        yield t, y
+
+
+def integrate_adaptive(func, y0, t0, t_end, step=None, rtol=1e-6,
+                       atol=1e-9, min_step=1e-12, max_step=None):
+    """
+    Integrate an ODE with the Dormand-Prince 5(4) method and an
+    adaptive step size.
+
+    Args:
+        func: The function f(t, y) giving the derivative of the state.
+        y0: The initial state.
+        t0: The initial time.
+        t_end: The final time.
+        step: The initial step size. By default it is 1/100 of the
+            time interval.
+        rtol: The relative tolerance on the local error.
+        atol: The absolute tolerance on the local error.
+        min_step: The smallest step size allowed.
+        max_step: The largest step size allowed.
+
+    Yields:
+        Tuples (t, y) of the accepted steps starting with the initial
+        state.
+
+    Raises:
+        RuntimeError: If the step size gets smaller than `min_step`.
+    """
+    t = float(t0)
+    y = numpy.array(y0, dtype=float)
+    if max_step is None:
+        max_step = t_end - t0
+    h = step if step is not None else (t_end - t0) / 100.0
+    h = min(h, max_step)
+    yield t, y
+    k_1 = func(t, y)
+    while t < t_end:
+        h = min(h, t_end - t)
+        y_new, error, k_last = dopri_step(func, t, y, h, k_1)
+        scale = atol + (rtol * numpy.maximum(abs(y), abs(y_new)))
+        err_norm = numpy.sqrt(numpy.mean((error / scale) ** 2))
+        if err_norm <= 1.0:
+            t = t + h
+            y = y_new
+            k_1 = k_last
+            yield t, y
+        # step size control with a safety factor
+        if err_norm == 0.0:
+            factor = 5.0
+        else:
+            factor = min(5.0, max(0.2, 0.9 * err_norm ** -0.2))
+        h = min(h * factor, max_step)
+        if h < min_step and t < t_end:
+            raise RuntimeError(
+                "Step size too small (%g) at t=%g" % (h, t)
+            )
+
+
+def torque_profile(times, torques):
+    """
+    Create a torque function that linearly interpolates tabulated
+    torque values. The values are held constant outside the table.
+
+    Args:
+        times: A sequence of N increasing time instants.
+        torques: A (N x n) array with the joint torques at each time.
+
+    Returns:
+        A function f(t, q, qdot) that returns the joint torques.
+    """
+    times = numpy.asarray(times, dtype=float)
+    torques = numpy.asarray(torques, dtype=float)
+    def profile(t, q, qdot):
+        return numpy.array([
+            numpy.interp(t, times, torques[:, k])
+            for k in xrange(torques.shape[1])
+        ])
+    return profile
+
+
+class Simulator(object):
+    """
+    Forward simulation of the joint motion of a robot with fixed base
+    for a given torque profile. The state of a floating base is not
+    integrated, so robots with floating base are not supported.
+    """
+    def __init__(self, robo, torques=None):
+        """
+        Constructor period.
+
+        Args:
+            robo: An instance of FloatingRobot with fixed base whose
+                parameters are all numbers.
+            torques: The joint torques (joints 1 to n). Either a
+                function f(t, q, qdot) or a constant sequence. By
+                default the torques stored in the robot parameters are
+                used.
+
+        Raises:
+            ValueError: If the robot has a floating base.
+        """
+        if robo.is_floating:
+            raise ValueError(
+                "Simulation of robots with floating base is not supported."
+            )
+        self.engine = numdynmodel.NumericDynModel(robo)
+        self.num = self.engine.num - 1
+        if torques is None:
+            torques = numdynmodel.joint_torques(robo)
+        if callable(torques):
+            self.torques = torques
+        else:
+            values = numpy.array(torques, dtype=float)
+            self.torques = lambda t, q, qdot: values
+
+    def qddot(self, t, q, qdot):
+        """
+        Compute the joint accelerations with the direct dynamic model.
+
+        Returns:
+            A NumPy array with the joint accelerations of joints 1 to n.
+        """
+        torques = self.torques(t, q, qdot)
+        qddots = self.engine.direct_dynamic_model(q, qdot, torques)
+        return qddots[1:].copy()
+
+    def derivative(self, t, state):
+        """
+        Compute the derivative of the state [q, qdot].
+        """
+        q = state[:self.num]
+        qdot = state[self.num:]
+        return numpy.concatenate((qdot, self.qddot(t, q, qdot)))
+
+    def states(self, q0, qdot0, t_end, t0=0.0, step=1e-3,
+               method='rk4', **options):
+        """
+        Simulate the robot and stream the joint states.
+
+        Args:
+            q0: The initial joint positions.
+            qdot0: The initial joint velocities.
+            t_end: The final time.
+            t0: The initial time.
+            step: The step size for `rk4` or the initial step size for
+                `dopri`.
+            method: `rk4` for the fixed-step Runge-Kutta 4 method or
+                `dopri` for the adaptive Dormand-Prince 5(4) method.
+            **options: The tolerance options of `integrate_adaptive`.
+
+        Yields:
+            A State (t, q, qdot, qddot) for each step.
+        """
+        y0 = numpy.concatenate((
+            numpy.asarray(q0, dtype=float),
+            numpy.asarray(qdot0, dtype=float)
+        ))
+        if method == 'rk4':
+            steps = integrate_fixed(self.derivative, y0, t0, t_end, step)
+        elif method == 'dopri':
+            steps = integrate_adaptive(
+                self.derivative, y0, t0, t_end, step, **options
+            )
+        else:
+            raise ValueError("Unknown integration method: %s" % method)
+        for t, y in steps:
+            q = y[:self.num].copy()
+            qdot = y[self.num:].copy()
+            yield State(t, q, qdot, self.qddot(t, q, qdot))
+
+    def simulate(self, q0, qdot0, t_end, **kwargs):
+        """
+        Simulate the robot and collect the trajectory. The arguments
+        are the same as in `states`.
+
+        Returns:
+            A State whose fields are NumPy arrays: the time instants
+            (N) and the joint positions, velocities and accelerations
+            (N x n).
+        """
+        traj = list(self.states(q0, qdot0, t_end, **kwargs))
+        return State(*(
+            numpy.array([getattr(state, field) for state in traj])
+            for field in State._fields
+        ))
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+# This file is part of the OpenSYMORO project. Please see
+# https://github.com/symoro/symoro/blob/master/LICENCE for the licence.
+
+
+"""
+This module compares the python and the C backends of
+SymbolManager.gen_func on the inverse dynamic model of the sample
+robots. It checks that both give the same results and prints the
+evaluation time of each of them.
+"""
+
+
+import random
+import timeit
+
+import numpy
+from sympy import Symbol
+
+from pysymoro import nealgos
+from symoroutils import samplerobots
+from symoroutils import symbolmgr
+
+
+def idm_funcs(robo):
+    """Generates the inverse dynamic model of the robot and returns
+    the python function, the C function and the number of arguments.
+    All the symbols the torques depend on are the arguments.
+    """
+    symo = symbolmgr.SymbolManager(None)
+    nealgos.fixed_inverse_dynmodel(robo, symo)
+    to_return = [s for s in symo.order_list if str(s).startswith('GAM')]
+    args = set()
+    for s in to_return:
+        args |= symo.unfold(symo.sydi[s]).atoms(Symbol)
+    args = sorted(args, key=str)
+    name = 'idm_%s' % robo.name
+    func_py = symo.gen_func(name + '_py', to_return, args)
+    func_c = symo.gen_func(name + '_c', to_return, args, syntax='c')
+    return func_py, func_c, len(args)
+
+
+def bench(robo, number=2000):
+    """Prints the evaluation time of both functions."""
+    func_py, func_c, num_args = idm_funcs(robo)
+    vals = [random.uniform(-1, 1) for i in xrange(num_args)]
+    # the C compiler may contract or reorder the floating point
+    # operations
+    if not numpy.allclose(func_py(vals), func_c(vals),
+                          rtol=1e-10, atol=1e-12):
+        raise AssertionError(
+            "Python and C results differ for %s" % robo.name
+        )
+    t_py = min(timeit.repeat(lambda: func_py(vals), number=number, repeat=3))
+    t_c = min(timeit.repeat(lambda: func_c(vals), number=number, repeat=3))
+    print("%-8s args: %3d  python: %8.2f us  C: %8.2f us  speedup: %.1f" % (
+        robo.name, num_args, 1e6 * t_py / number, 1e6 * t_c / number,
+        t_py / t_c
+    ))
+
+
+def main():
+    """Main function."""
+    for robo in (samplerobots.rx90(), samplerobots.sr400()):
+        bench(robo)
+
+
+if __name__ == '__main__':
+    main()
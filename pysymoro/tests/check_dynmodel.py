@@ -10,6 +10,8 @@ from sympy import var
 
 from symoroutils import tools
 from pysymoro.robotf import FloatingRobot as Robot
+from pysymoro.screw import Screw
+from pysymoro.screw6 import Screw6
 
 
 def planar2r():
@@ -212,9 +214,40 @@ class TestDynModelPlanar2rFixed(unittest.TestCase):
         print(qddot)
         print(robo.idym.torques)
         print(robo.ddym.qddots)
-        # check if input to IDyM is same as output of DDyM
-        self.assertEqual(robo.ddym.qddots[1], robo.qddots[1])
-        self.assertEqual(robo.ddym.qddots[2], robo.qddots[2])
+        # check if input to IDyM is same as output of DDyM (up to the
+        # floating point rounding)
+        self.assertAlmostEqual(robo.ddym.qddots[1], robo.qddots[1])
+        self.assertAlmostEqual(robo.ddym.qddots[2], robo.qddots[2])
+
+    def test_when_random_symbolic(self):
+        """
+        Same as `test_when_random` with the symbolic computation of
+        the dynamic models.
+        """
+        robo = planar2r_numerical()
+        robo.is_symbolic = True
+        random.seed(math.pi)
+        q = list(random.uniform(-math.pi, math.pi) for j in range(2))
+        qdot = list(random.uniform(-math.pi, math.pi) for j in range(2))
+        qddot = list(random.uniform(-math.pi, math.pi) for j in range(2))
+        # set joint state
+        robo = set_planar2r_joint_state(robo, q, qdot, qddot)
+        # compute IDyM
+        robo.compute_idym()
+        # set torque values for DDyM
+        robo = set_planar2r_joint_torque(
+            robo, [robo.idym.torques[1], robo.idym.torques[2]]
+        )
+        # compute DDyM
+        robo.compute_ddym()
+        # check if input to IDyM is same as output of DDyM (up to the
+        # floating point rounding)
+        self.assertAlmostEqual(
+            float(robo.ddym.qddots[1]), robo.qddots[1], places=10
+        )
+        self.assertAlmostEqual(
+            float(robo.ddym.qddots[2]), robo.qddots[2], places=10
+        )
 
 
 class TestDynModelPlanar2rFloating(unittest.TestCase):
@@ -285,9 +318,60 @@ class TestDynModelPlanar2rFloating(unittest.TestCase):
         print(robo.idym.torques)
         print(robo.ddym.qddots)
         # assertions
-        # check if input to IDyM is same as output of DDyM
-        self.assertEqual(robo.ddym.qddots[1], robo.qddots[1])
-        self.assertEqual(robo.ddym.qddots[2], robo.qddots[2])
+        # check if input to IDyM is same as output of DDyM (up to the
+        # floating point rounding)
+        self.assertAlmostEqual(robo.ddym.qddots[1], robo.qddots[1])
+        self.assertAlmostEqual(robo.ddym.qddots[2], robo.qddots[2])
+
+
+class TestDynModelNumeric(unittest.TestCase):
+    """
+    Unit test for checking that the numeric computation of the inverse
+    dynamic model (`is_symbolic=False`) gives the same results as the
+    symbolic computation with the same numerical values.
+    """
+    def _compare_idym(self, is_floating):
+        robo = planar2r_numerical(is_floating=is_floating)
+        random.seed(math.pi)
+        for k in range(10):
+            q = list(random.uniform(-math.pi, math.pi) for j in range(2))
+            qdot = list(random.uniform(-math.pi, math.pi) for j in range(2))
+            qddot = list(random.uniform(-math.pi, math.pi) for j in range(2))
+            robo = set_planar2r_joint_state(robo, q, qdot, qddot)
+            # numeric computation
+            robo.is_symbolic = False
+            robo.compute_idym()
+            num_idym = robo.idym
+            # symbolic computation
+            robo.is_symbolic = True
+            robo.compute_idym()
+            sym_idym = robo.idym
+            self.assertIsInstance(num_idym.wrenchs[1], Screw)
+            self.assertIsInstance(num_idym.composite_inertias[1], Screw6)
+            for j in range(1, 3):
+                self.assertAlmostEqual(
+                    num_idym.torques[j], float(sym_idym.torques[j]),
+                    places=10
+                )
+                for idx in range(6):
+                    self.assertAlmostEqual(
+                        num_idym.wrenchs[j].val[idx],
+                        float(sym_idym.wrenchs[j].val[idx]),
+                        places=10
+                    )
+            for idx in range(6):
+                self.assertAlmostEqual(
+                    num_idym.accels[0].val[idx],
+                    float(sym_idym.accels[0].val[idx]), places=10
+                )
+
+    def test_fixed(self):
+        """Compare the numeric and symbolic IDyM for fixed base."""
+        self._compare_idym(is_floating=False)
+
+    def test_floating(self):
+        """Compare the numeric and symbolic IDyM for floating base."""
+        self._compare_idym(is_floating=True)
 
 
 def run_tests():
@@ -295,6 +379,9 @@ def run_tests():
     unit_suite = unittest.TestLoader().loadTestsFromTestCase(
         TestDynModelPlanar2rFixed
     )
+    unit_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(
+        TestDynModelNumeric
+    ))
     unittest.TextTestRunner(verbosity=2).run(unit_suite)
 
 
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+"""Unit test module for the dynamic identification model."""
+
+
+import unittest
+
+from sympy import pi
+from sympy.abc import A, B, C
+
+from pysymoro import dyniden
+from pysymoro.robot import Robot
+from symoroutils import samplerobots
+from symoroutils import symbolmgr
+from symoroutils import tools
+
+
+def twin_robot():
+    """Return a robot whose links 1 and 2 have the same geometric
+    parameters, so that their models share subexpressions."""
+    robo = Robot('IdenTwin', 2, 2, 2)
+    robo.ant = [-1, 0, 1]
+    robo.sigma = [2, 2, 0]
+    robo.alpha = [0, pi/2, pi/2]
+    robo.d = [0, tools.syms('D2'), tools.syms('D2')]
+    robo.theta = [0, tools.syms('th1'), tools.syms('th1')]
+    return robo
+
+
+class TestDynIdenModel(unittest.TestCase):
+    """Unit test for dynamic_identification_model."""
+    def _compute(self, robo, processes):
+        symo = symbolmgr.SymbolManager(None)
+        dyniden.dynamic_identification_model(robo, symo, processes)
+        return symo
+
+    def test_parallel(self):
+        """The parallel computation gives the sequential model."""
+        robots = (samplerobots.rx90(), samplerobots.planar2r(), twin_robot())
+        for robo in robots:
+            serial = self._compute(robo, 1)
+            parallel = self._compute(robo, 2)
+            self.assertEqual(parallel.order_list, serial.order_list)
+            self.assertEqual(parallel.sydi, serial.sydi)
+
+    def test_worker_state(self):
+        """The symbol manager of a worker is restored after each job."""
+        robo = samplerobots.planar2r()
+        symo = symbolmgr.SymbolManager(None)
+        antRj, antPj = dyniden.compute_rot_trans(robo, symo)
+        kin = (antRj, antPj) + dyniden.compute_vel_acc(
+            robo, symo, antRj, antPj, floating=True
+        )
+        dyniden._init_worker(robo, kin, symo.sydi)
+        worker_symo = dyniden._worker_state['symo']
+        job = (2, 0, '{index}{element}XX2')
+        model = dyniden._param_job(job)
+        self.assertTrue(model)
+        self.assertEqual(worker_symo.sydi, symo.sydi)
+        self.assertEqual(worker_symo.revdi, symo.revdi)
+        self.assertEqual(dyniden._param_job(job), model)
+
+    def test_merge(self):
+        """The merged expressions that are known or reduced to an atom
+        do not get a new symbol."""
+        u1, u2, u3, u4, x1 = tools.syms('U1, U2, U3, U4, X1')
+        symo = symbolmgr.SymbolManager(None)
+        symo.add_to_dict(x1, A*B)
+        remap = {}
+        dyniden._merge_param_model(symo, [
+            (u1, A*B, False),
+            (u2, x1 - u1 + C, False),
+            (u3, x1*C + u1*A, False),
+            (u4, u3 + u2*B, True)
+        ], remap)
+        self.assertEqual(remap, {u1: x1, u2: C})
+        self.assertEqual(symo.order_list, [x1, u3, u4])
+        self.assertEqual(symo.sydi[u3], x1*C + x1*A)
+        self.assertEqual(symo.sydi[u4], u3 + B*C)
+
+
+def run_tests():
+    """Load and run the unittests"""
+    unit_suite = unittest.TestLoader().loadTestsFromTestCase(
+        TestDynIdenModel
+    )
+    unittest.TextTestRunner(verbosity=2).run(unit_suite)
+
+
+def main():
+    """Main function."""
+    run_tests()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+"""Unit test module for the excitation module."""
+
+
+import unittest
+
+import numpy
+
+from pysymoro import excitation
+from pysymoro import identification
+from symoroutils import samplerobots
+
+
+class TestExcitation(unittest.TestCase):
+    """Unit test for the excitation trajectory optimisation."""
+    def test_fourier(self):
+        """The velocities and accelerations are the derivatives."""
+        traj = excitation.FourierTrajectory(2, 3, 0.5)
+        rand = numpy.random.RandomState(0)
+        coefs = rand.uniform(-1, 1, traj.num_coefs)
+        traj.set_coefs(coefs)
+        numpy.testing.assert_allclose(traj.get_coefs(), coefs)
+        times = numpy.linspace(0, 2, 50)
+        h = 1e-5
+        q, qdot, qddot = traj.evaluate(times)
+        q_p, qdot_p, _ = traj.evaluate(times + h)
+        q_m, qdot_m, _ = traj.evaluate(times - h)
+        numpy.testing.assert_allclose((q_p - q_m) / (2*h), qdot, atol=1e-6)
+        numpy.testing.assert_allclose(
+            (qdot_p - qdot_m) / (2*h), qddot, atol=1e-6
+        )
+        # periodic trajectory
+        numpy.testing.assert_allclose(
+            traj.evaluate([traj.period])[0], traj.evaluate([0])[0]
+        )
+
+    def test_nelder_mead(self):
+        rosen = lambda x: (1 - x[0])**2 + 100 * (x[1] - x[0]**2)**2
+        x, cost, evals = excitation.nelder_mead(
+            rosen, [-1.2, 1.0], 0.5, max_evals=2000, tol=1e-14
+        )
+        numpy.testing.assert_allclose(x, [1.0, 1.0], atol=1e-4)
+        self.assertLessEqual(evals, 2000 + 2)
+
+    def test_optimize(self):
+        """The condition number decreases within the joint limits."""
+        symo, base_robo = samplerobots.rx90().compute_baseparams()
+        regressor = identification.Regressor(
+            base_robo, {'D3': 0.5, 'RL4': 0.4, 'G3': -9.81}
+        )
+        ones = numpy.ones(6)
+        limits = excitation.Limits(-2 * ones, 2 * ones, 3 * ones, None)
+        result = excitation.optimize_excitation(
+            regressor, limits, num_harmonics=2, num_samples=50,
+            max_evals=300
+        )
+        problem = excitation.ExcitationProblem(
+            regressor, excitation.FourierTrajectory(6, 2), limits, 50
+        )
+        rand = numpy.random.RandomState(0)
+        initial = numpy.concatenate((
+            numpy.zeros(6), rand.uniform(-0.5, 0.5, 24)
+        ))
+        self.assertLess(result.cond, problem.cond(initial))
+        self.assertGreaterEqual(result.evaluations, 300)
+        q, qdot, _ = result.trajectory.evaluate(problem.times)
+        self.assertEqual(result.max_violation, 0)
+        self.assertLessEqual(abs(q).max(), 2)
+        self.assertLessEqual(abs(qdot).max(), 3)
+
+    def test_scale_to_limits(self):
+        """A trajectory beyond the limits is scaled down to them."""
+        traj = excitation.FourierTrajectory(2, 3, 0.5)
+        rand = numpy.random.RandomState(1)
+        traj.set_coefs(rand.uniform(-2, 2, traj.num_coefs))
+        times = numpy.linspace(0, traj.period, 40, endpoint=False)
+        ones = numpy.ones(2)
+        limits = excitation.Limits(-ones, ones, 2 * ones, 5 * ones)
+        states = traj.evaluate(times)
+        self.assertGreater(
+            excitation.limits_violation(*states, limits=limits), 0
+        )
+        scale = excitation.scale_to_limits(traj, times, limits)
+        self.assertGreater(scale, 0)
+        self.assertLess(scale, 1)
+        q, qdot, qddot = traj.evaluate(times)
+        self.assertEqual(
+            excitation.limits_violation(q, qdot, qddot, limits), 0
+        )
+        self.assertLessEqual(abs(q).max(), 1)
+        self.assertLessEqual(abs(qddot).max(), 5)
+
+
+def run_tests():
+    """Load and run the unittests"""
+    unit_suite = unittest.TestLoader().loadTestsFromTestCase(
+        TestExcitation
+    )
+    unittest.TextTestRunner(verbosity=2).run(unit_suite)
+
+
+def main():
+    """Main function."""
+    run_tests()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+"""Unit test module for the identification module."""
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+from sympy import Matrix, sympify
+
+from pysymoro import identification
+from pysymoro import nealgos
+from symoroutils import samplerobots
+from symoroutils import symbolmgr
+
+
+VALUES = {'D3': 0.5, 'RL4': 0.4, 'G3': -9.81}
+
+
+class TestIdentification(unittest.TestCase):
+    """Unit test for the regressor and the least squares solution."""
+    def setUp(self):
+        self.rand = numpy.random.RandomState(0)
+        self.samples = self.rand.uniform(-2, 2, (3, 50, 6))
+
+    def test_regressor(self):
+        """W(q, qdot, qddot) * 1 is the inverse dynamic model with all
+        the dynamic parameters set to 1."""
+        robo = samplerobots.rx90()
+        regressor = identification.Regressor(robo, VALUES)
+        self.assertEqual(regressor.shape, (6, 78))
+        # the values are folded in a copy of the robot
+        self.assertEqual(robo.d[3], sympify('D3'))
+        W = regressor.stack(*self.samples, chunk=16)
+        self.assertEqual(W.shape, (300, 78))
+        # inverse dynamic model with all the parameters equal to 1
+        # and without external forces
+        robo.Fex[-1] = Matrix([0, 0, 0])
+        robo.Nex[-1] = Matrix([0, 0, 0])
+        symo = symbolmgr.SymbolManager(None)
+        nealgos.fixed_inverse_dynmodel(robo, symo)
+        values = dict((sympify(k), v) for k, v in VALUES.iteritems())
+        for sym in symo.order_list:
+            symo.sydi[sym] = symo.sydi[sym].xreplace(values)
+        gam = Matrix([sympify('GAM%d' % j) for j in regressor.joints])
+        # the undefined parameters are set to 1
+        idm = symo.gen_func(
+            'idm', gam, (regressor.q, regressor.qdot, regressor.qddot),
+            batch=True, strict=False
+        )
+        torques = idm(tuple(self.samples))
+        numpy.testing.assert_allclose(
+            W.sum(axis=1), torques.reshape(-1), rtol=1e-9, atol=1e-9
+        )
+
+    def test_identify(self):
+        """The base parameters are recovered from the torques."""
+        symo, base_robo = samplerobots.rx90().compute_baseparams()
+        regressor = identification.Regressor(base_robo, VALUES)
+        self.assertNotIn(sympify('XX1'), regressor.params)
+        params = self.rand.uniform(-1, 1, regressor.shape[1])
+        W = regressor.stack(*self.samples)
+        torques = numpy.dot(W, params).reshape(-1, 6)
+        noise = self.rand.normal(0, 1e-3, torques.shape)
+        estimate = identification.identify(
+            regressor, *self.samples, torques=torques + noise
+        )
+        numpy.testing.assert_allclose(estimate.params, params, atol=0.05)
+        self.assertTrue(numpy.isfinite(estimate.cond))
+        self.assertEqual(estimate.residuals.shape, (300,))
+        self.assertTrue(numpy.all(estimate.std > 0))
+        # the full set of parameters is not identifiable
+        W = identification.Regressor(
+            samplerobots.rx90(), VALUES
+        ).stack(*self.samples)
+        estimate = identification.least_squares(W, torques.reshape(-1))
+        self.assertEqual(estimate.cond, numpy.inf)
+
+    def test_sparse(self):
+        """The sparse layout gives the same regressor and estimate."""
+        symo, base_robo = samplerobots.rx90().compute_baseparams()
+        regressor = identification.Regressor(base_robo, VALUES)
+        # a parameter of link k only appears in the torques of joints
+        # 1 to k so the pattern is block upper triangular
+        last_rows = [
+            numpy.flatnonzero(column)[-1] for column in regressor.pattern.T
+        ]
+        self.assertEqual(last_rows, sorted(last_rows))
+        # the friction of joint 2 only appears in its own torque
+        column = regressor.params.index(sympify('FS2'))
+        self.assertEqual(
+            list(numpy.flatnonzero(regressor.pattern[:, column])), [1]
+        )
+        self.assertLess(regressor.density, 0.7)
+        W = regressor.stack(*self.samples)
+        values = regressor.stack_sparse(*self.samples, chunk=16)
+        self.assertEqual(values.shape, (50, len(regressor.nonzeros)))
+        numpy.testing.assert_allclose(
+            regressor.to_dense(values), W, rtol=1e-12, atol=1e-12
+        )
+        params = self.rand.uniform(-1, 1, regressor.shape[1])
+        torques = numpy.dot(W, params).reshape(-1, 6)
+        torques += self.rand.normal(0, 1e-3, torques.shape)
+        for weighted in (False, True):
+            dense = identification.identify(
+                regressor, *self.samples, torques=torques,
+                weighted=weighted
+            )
+            sparse = identification.identify(
+                regressor, *self.samples, torques=torques,
+                weighted=weighted, sparse=True
+            )
+            numpy.testing.assert_allclose(
+                sparse.params, dense.params, rtol=1e-6, atol=1e-8
+            )
+            numpy.testing.assert_allclose(
+                sparse.std, dense.std, rtol=1e-5, atol=1e-10
+            )
+            self.assertAlmostEqual(sparse.cond / dense.cond, 1.0, places=6)
+            numpy.testing.assert_allclose(
+                sparse.residuals,
+                numpy.sqrt(numpy.sum(
+                    dense.residuals.reshape(-1, 6) ** 2, axis=0
+                )),
+                rtol=1e-5, atol=1e-10
+            )
+
+    def test_base_parameters(self):
+        """The numeric base parameters are the symbolic ones."""
+        robo = samplerobots.rx90()
+        regressor = identification.Regressor(robo, VALUES)
+        base = identification.base_parameters(regressor)
+        symo, base_robo = robo.compute_baseparams()
+        symbolic = identification.Regressor(base_robo, VALUES).params
+        self.assertEqual(
+            [str(param) for param in base.params],
+            [str(param).replace('R', '') for param in symbolic]
+        )
+        self.assertIn(sympify('M2'), base.unidentifiable)
+        groups = dict(zip(base.params, base.groups))
+        self.assertEqual(
+            groups[sympify('XX6')], sympify('XX6') - sympify('YY6')
+        )
+        self.assertEqual(
+            groups[sympify('MX2')],
+            sympify('MX2 + 0.5*M3 + 0.5*M4 + 0.5*M5 + 0.5*M6')
+        )
+        # the grouped parameters give the same regressor
+        W = regressor.stack(*self.samples)
+        W_base = W[:, [regressor.params.index(p) for p in base.params]]
+        numpy.testing.assert_allclose(
+            numpy.dot(W_base, base.coefficients), W, atol=1e-9
+        )
+
+    def test_streaming(self):
+        """Recursive identification from chunked log files."""
+        symo, base_robo = samplerobots.rx90().compute_baseparams()
+        regressor = identification.Regressor(base_robo, VALUES)
+        params = self.rand.uniform(-1, 1, regressor.shape[1])
+        samples = identification.random_samples(400, 6, seed=1)
+        W = regressor.stack(*samples)
+        torques = numpy.dot(W, params).reshape(-1, 6)
+        log = numpy.hstack(samples + (torques,))
+        path = tempfile.mkdtemp()
+        try:
+            csv_path = os.path.join(path, 'log.csv')
+            numpy.savetxt(csv_path, log, delimiter=',', header='log')
+            bin_path = os.path.join(path, 'log.bin')
+            log.astype('<f8').tofile(bin_path)
+            for chunks in (
+                identification.csv_chunks(csv_path, 64, skip=1),
+                identification.binary_chunks(bin_path, 24, 64)
+            ):
+                ident = identification.StreamingIdentifier(regressor)
+                counts = [
+                    num for num, _ in ident.consume(
+                        identification.log_states(chunks, 6)
+                    )
+                ]
+                self.assertEqual(counts, range(64, 400, 64) + [400])
+                numpy.testing.assert_allclose(
+                    ident.params, params, atol=1e-6
+                )
+        finally:
+            shutil.rmtree(path)
+        # the forgetting factor follows a change of the parameters
+        new_params = params + 0.5
+        ident = identification.StreamingIdentifier(regressor, 0.9)
+        ident.update(*(samples + (torques,)))
+        new_torques = numpy.dot(W, new_params).reshape(-1, 6)
+        ident.update(*(samples + (new_torques,)))
+        numpy.testing.assert_allclose(ident.params, new_params, atol=1e-6)
+
+    def test_log_states(self):
+        """Central differences across the chunk borders."""
+        dt = 0.01
+        t = numpy.arange(0, 1, dt)
+        log = numpy.column_stack((t ** 2, 2 * t))
+        chunks = (log[i:i + 7] for i in range(0, len(log), 7))
+        states = list(identification.log_states(chunks, 1, dt))
+        q, qdot, qddot, tau = [numpy.vstack(x) for x in zip(*states)]
+        self.assertEqual(len(q), len(t) - 2)
+        numpy.testing.assert_allclose(qdot, tau, atol=1e-9)
+        numpy.testing.assert_allclose(qddot, 2.0, atol=1e-6)
+
+    def test_undefined(self):
+        with self.assertRaises(ValueError):
+            identification.Regressor(samplerobots.rx90())
+
+
+def run_tests():
+    """Load and run the unittests"""
+    unit_suite = unittest.TestLoader().loadTestsFromTestCase(
+        TestIdentification
+    )
+    unittest.TextTestRunner(verbosity=2).run(unit_suite)
+
+
+def main():
+    """Main function."""
+    run_tests()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+"""Unit test module for the incremental module."""
+
+
+import unittest
+
+from sympy import pi
+
+from pysymoro import incremental
+from pysymoro.robot import Robot
+from symoroutils import samplerobots
+from symoroutils import tools
+
+
+def tree_robot():
+    """Return a tree robot with two branches on link 1."""
+    robo = Robot('IncTree', 5, 5, 5)
+    robo.ant = [-1, 0, 1, 1, 2, 3]
+    robo.alpha = [0, 0, pi/2, pi/2, 0, -pi/2]
+    robo.d = [0, 0, tools.syms('D2'), 0, tools.syms('D4'), 0]
+    robo.r = [0, 0, 0, tools.syms('RL3'), 0, 0]
+    return robo
+
+
+class TestIncrementalIDM(unittest.TestCase):
+    """Unit test for the incremental Inverse Dynamic Model."""
+    def setUp(self):
+        self.robo = tree_robot()
+        self.idm = incremental.IncrementalIDM(self.robo)
+        self.symo = self.idm.compute()
+
+    def _check_full(self, symo):
+        """The model is the same as the one computed as a whole."""
+        # both models are written to the same file, the output is read
+        # before the reference overwrites it
+        with open(symo.file_out.name) as f:
+            output = f.read()
+        ref = self.robo.compute_idym()
+        self.assertEqual(symo.sydi, ref.sydi)
+        self.assertEqual(symo.order_list, ref.order_list)
+        with open(ref.file_out.name) as f:
+            self.assertEqual(output, f.read())
+
+    def test_first(self):
+        """The first computation is the usual model."""
+        self.assertEqual(self.idm.num_reused, 0)
+        self.assertEqual(self.idm.num_computed, len(self.idm.stages()))
+        self._check_full(self.symo)
+        self.assertEqual(self.idm.changed_params(), [])
+        symo = self.idm.compute()
+        self.assertEqual(self.idm.num_computed, 0)
+        self._check_full(symo)
+
+    def test_dynamic_param(self):
+        """An inertial parameter changes the backward recursion."""
+        self.robo.put_val(4, 'XX', 0)
+        self.assertEqual(self.idm.changed_params(), [('XX', 4)])
+        expected = set([
+            ('dyn', 4), ('wrench', 4), ('wrench', 2), ('wrench', 1),
+            ('torque', 4), ('torque', 2), ('torque', 1)
+        ])
+        self.assertEqual(self.idm.dirty_stages([('XX', 4)]), expected)
+        symo = self.idm.compute()
+        self.assertEqual(self.idm.num_computed, len(expected))
+        self._check_full(symo)
+
+    def test_geometric_param(self):
+        """A geometric parameter changes the subtree of the link."""
+        self.robo.put_val(2, 'd', 0)
+        dirty = self.idm.dirty_stages(self.idm.changed_params())
+        self.assertIn(('kin', 4), dirty)
+        for stage in [('geo', 3), ('kin', 3), ('kin', 5), ('wrench', 5)]:
+            self.assertNotIn(stage, dirty)
+        symo = self.idm.compute()
+        self.assertEqual(self.idm.num_computed, len(dirty))
+        self._check_full(symo)
+
+    def test_base_param(self):
+        """The gravity changes the whole forward recursion."""
+        self.robo.put_val(0, 'G', 'GX')
+        symo = self.idm.compute()
+        stages = [stage for stage in self.idm.stages() if stage[0] != 'geo']
+        self.assertEqual(self.idm.num_computed, len(stages))
+        self._check_full(symo)
+
+    def test_structure(self):
+        """A change of the structure computes the whole model."""
+        self.robo.ant[5] = 1
+        self.idm.compute()
+        self.assertEqual(self.idm.num_reused, 0)
+
+    def test_unsupported(self):
+        """Robots with floating base are computed as a whole."""
+        robo = samplerobots.planar2r()
+        robo.is_floating = True
+        idm = incremental.IncrementalIDM(robo)
+        self.assertFalse(idm.is_supported)
+        symo = idm.compute()
+        self.assertEqual(idm.records, {})
+        self.assertTrue(symo.order_list)
+
+
+def run_tests():
+    """Load and run the unittests"""
+    unit_suite = unittest.TestLoader().loadTestsFromTestCase(
+        TestIncrementalIDM
+    )
+    unittest.TextTestRunner(verbosity=2).run(unit_suite)
+
+
+def main():
+    """Main function."""
+    run_tests()
+
+
+if __name__ == '__main__':
+    main()
@@ -31,13 +31,14 @@ class TestIGM(unittest.TestCase):
         nTm[0, 3], nTm[1, 3] = var('p1, p2')
         invgeom._paul_solve(robo, self.symo, nTm, 0, robo.nf)
         self.symo.gen_func_string('IGM_gen', robo.q_vec,
-                                  var('p1, p2'), syntax='matlab')
+                                  var('p1, p2'), syntax='matlab',
+                                  strict=False)
         igm_f = self.symo.gen_func('IGM_gen', robo.q_vec,
-                                   var('p1, p2'))
+                                   var('p1, p2'), strict=False)
         T = geometry.dgm(robo, self.symo, 0, robo.nf,
                          fast_form=True, trig_subs=True)
         f06 = self.symo.gen_func('DGM_generated1', (T[0, 3], T[1, 3]),
-                                 robo.q_vec)
+                                 robo.q_vec, strict=False)
         for x in xrange(100):
             arg = random.normal(size=robo.nj)
             Ttest = f06(arg)
@@ -52,12 +53,13 @@ class TestIGM(unittest.TestCase):
         nTm = invgeom.T_GENERAL
         invgeom._paul_solve(robo, self.symo, nTm, 0, robo.nf)
         self.symo.gen_func_string('IGM_gen', robo.q_vec,
-                                  invgeom.T_GENERAL, syntax='matlab')
+                                  invgeom.T_GENERAL, syntax='matlab',
+                                  strict=False)
         igm_f = self.symo.gen_func('IGM_gen', robo.q_vec,
-                                   invgeom.T_GENERAL)
+                                   invgeom.T_GENERAL, strict=False)
         T = geometry.dgm(robo, self.symo, 0, robo.nf,
                          fast_form=True, trig_subs=True)
-        f06 = self.symo.gen_func('DGM_generated1', T, robo.q_vec)
+        f06 = self.symo.gen_func('DGM_generated1', T, robo.q_vec, strict=False)
         for x in xrange(100):
             arg = random.normal(size=robo.nj)
             Ttest = f06(arg)
@@ -69,12 +71,14 @@ class TestIGM(unittest.TestCase):
         self.robo = samplerobots.sr400()
         invgeom.loop_solve(self.robo, self.symo)
         self.symo.gen_func_string('IGM_gen', self.robo.q_vec,
-                                  self.robo.q_active, syntax='matlab')
+                                  self.robo.q_active, syntax='matlab',
+                                  strict=False)
         l_solver = self.symo.gen_func('IGM_gen', self.robo.q_vec,
-                                      self.robo.q_active)
+                                      self.robo.q_active, strict=False)
         T = geometry.dgm(self.robo, self.symo, 9, 10,
                          fast_form=True, trig_subs=True)
-        t_loop = self.symo.gen_func('DGM_generated1', T, self.robo.q_vec)
+        t_loop = self.symo.gen_func('DGM_generated1', T, self.robo.q_vec,
+                                    strict=False)
         for x in xrange(10):
             arg = random.normal(size=6)
             solution = l_solver(arg)
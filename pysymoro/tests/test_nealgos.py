@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+"""Unit test module for the structural zeros of the nealgos module."""
+
+
+import unittest
+
+from sympy import Matrix
+
+from pysymoro import nealgos
+from symoroutils import samplerobots
+from symoroutils import symbolmgr
+from symoroutils import tools
+
+
+class NoZeroMasks(nealgos.ZeroMasks):
+    """Masks without any known zero, i.e. nothing is skipped."""
+    def __init__(self, robo, links=None):
+        super(NoZeroMasks, self).__init__(robo, links)
+        for masks in (self.J, self.MS, self.skew_MS):
+            for j in masks:
+                masks[j] = (False,) * len(masks[j])
+
+    def add_transforms(self, antRj=None, antPj=None, jTant=None):
+        super(NoZeroMasks, self).add_transforms(antRj, antPj, jTant)
+        for masks in (self.rot, self.trans, self.screw_t):
+            for j in masks:
+                masks[j] = (False,) * len(masks[j])
+
+    def has_inertia(self, j):
+        return True
+
+    def has_ms(self, j):
+        return True
+
+
+def _plain_mul(mat_a, mat_b, mask_a=None, mask_b=None):
+    return mat_a * mat_b
+
+
+class TestZeroMasks(unittest.TestCase):
+    """Unit test for the structural zeros of the Newton-Euler terms."""
+    def setUp(self):
+        self.robo = samplerobots.rx90()
+        self.robo.MS[2] = Matrix([0, 0, 0])
+        self.robo.J[3] = Matrix.zeros(3, 3)
+
+    def _compare(self, algo):
+        """
+        The model is the same as the one computed without skipping
+        the known zeros.
+        """
+        symo = symbolmgr.SymbolManager(file_out=None)
+        algo(self.robo, symo)
+        masked_mul = tools.masked_mul
+        zero_masks = nealgos.ZeroMasks
+        tools.masked_mul = _plain_mul
+        nealgos.ZeroMasks = NoZeroMasks
+        try:
+            ref = symbolmgr.SymbolManager(file_out=None)
+            algo(self.robo, ref)
+        finally:
+            tools.masked_mul = masked_mul
+            nealgos.ZeroMasks = zero_masks
+        self.assertEqual(symo.order_list, ref.order_list)
+        self.assertEqual(symo.sydi, ref.sydi)
+
+    def test_masked_mul(self):
+        """The product is the one of the matrices."""
+        x, y, z = tools.syms('x, y, z')
+        mat_a = Matrix([[x, 0, y], [0, 0, 0], [z, 1, 0]])
+        mat_b = Matrix([[0, y], [x, 0], [z, 2]])
+        self.assertEqual(tools.masked_mul(mat_a, mat_b), mat_a * mat_b)
+        self.assertEqual(
+            tools.zero_mask(mat_a),
+            (False, True, False, True, True, True, False, False, True)
+        )
+        # the elements given as zero are not multiplied
+        self.assertEqual(
+            tools.masked_mul(mat_a, mat_b, mask_b=(True,) * 6),
+            Matrix.zeros(3, 2)
+        )
+        with self.assertRaises(ValueError):
+            tools.masked_mul(mat_a, mat_b.transpose())
+
+    def test_masks(self):
+        """The zero blocks of the links are found."""
+        masks = nealgos.ZeroMasks(self.robo)
+        self.assertFalse(masks.has_ms(2))
+        self.assertTrue(masks.has_ms(3))
+        self.assertFalse(masks.has_inertia(3))
+        self.assertTrue(masks.has_inertia(2))
+        masks = nealgos.ZeroMasks(self.robo, [3])
+        self.assertEqual(masks.J.keys(), [3])
+
+    def test_fixed(self):
+        """Same model for the fixed base Newton-Euler algorithm."""
+        self._compare(nealgos.fixed_inverse_dynmodel)
+
+    def test_composite(self):
+        """Same model for the composite Newton-Euler algorithm."""
+        self.robo.is_floating = True
+        self._compare(nealgos.composite_inverse_dynmodel)
+
+    def test_transforms(self):
+        """The masks of the transformations are computed once."""
+        calls = []
+        add_transforms = nealgos.ZeroMasks.add_transforms
+        def counted(masks, *args):
+            calls.append(len(args))
+            add_transforms(masks, *args)
+        nealgos.ZeroMasks.add_transforms = counted
+        try:
+            symo = symbolmgr.SymbolManager(file_out=None)
+            nealgos.composite_inverse_dynmodel(self.robo, symo)
+        finally:
+            nealgos.ZeroMasks.add_transforms = add_transforms
+        self.assertEqual(calls, [3])
+        antRj, antPj = nealgos.compute_rot_trans(self.robo, symo)
+        masks = nealgos.ZeroMasks(self.robo)
+        masks.add_transforms(antRj, antPj)
+        self.assertFalse(masks.has_trans(1))
+        self.assertTrue(masks.has_trans(4))
+        self.assertEqual(masks.screw_t, {})
+
+    def test_default_masks(self):
+        """Without masks the model is the same."""
+        models = []
+        for masks in (None, nealgos.ZeroMasks(self.robo)):
+            symo = symbolmgr.SymbolManager(file_out=None)
+            antRj, antPj = nealgos.compute_rot_trans(self.robo, symo)
+            w, wdot, vdot, U = nealgos.compute_vel_acc(
+                self.robo, symo, antRj, antPj
+            )
+            F = nealgos.ParamsInit.init_vec(self.robo)
+            N = nealgos.ParamsInit.init_vec(self.robo)
+            for j in xrange(1, self.robo.NL):
+                nealgos.compute_dynamic_wrench(
+                    self.robo, symo, j, w, wdot, U, vdot, F, N, masks
+                )
+            models.append((symo.sydi, F, N))
+        self.assertEqual(models[0], models[1])
+
+
+def run_tests():
+    """Load and run the unittests"""
+    unit_suite = unittest.TestLoader().loadTestsFromTestCase(TestZeroMasks)
+    unittest.TextTestRunner(verbosity=2).run(unit_suite)
+
+
+def main():
+    """Main function."""
+    run_tests()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+"""Unit test module for the robot module."""
+
+
+import random
+import unittest
+
+from sympy import Symbol
+
+from symoroutils import samplerobots
+from symoroutils import tools
+
+
+class TestSpecialize(unittest.TestCase):
+    """Unit test for the numerical specialization of the models."""
+    def setUp(self):
+        self.robo = samplerobots.rx90()
+        self.values = {'D3': 0.45, Symbol('RL4'): 0.45}
+        for j in xrange(1, self.robo.NL):
+            for name in ('XY', 'XZ', 'YZ', 'MY'):
+                self.values['%s%d' % (name, j)] = 0
+
+    def test_copy(self):
+        """The parameters of the copy are replaced."""
+        robo = self.robo.specialize(self.values)
+        self.assertEqual(robo.d[3], 0.45)
+        self.assertEqual(robo.r[4], 0.45)
+        self.assertEqual(robo.J[2][0, 1], 0)
+        self.assertEqual(robo.MS[2][1], 0)
+        self.assertEqual(robo.J[2][0, 0], tools.syms('XX2'))
+        # the files are not the ones of the robot
+        self.assertEqual(robo.name, self.robo.name + '_num')
+        self.assertEqual(robo.directory, self.robo.directory)
+        self.assertNotEqual(robo.par_file_path, self.robo.par_file_path)
+        # the robot is unchanged
+        self.assertEqual(self.robo.d[3], tools.syms('D3'))
+        self.assertEqual(self.robo.J[2][0, 1], tools.syms('XY2'))
+
+    def test_idym(self):
+        """The specialized model is the model with the values."""
+        symo = self.robo.compute_idym()
+        symo_num = self.robo.compute_idym(specialize=self.values)
+        self.assertLess(symo_num.op_count(), symo.op_count())
+        self.assertNotEqual(symo_num.file_out.name, symo.file_out.name)
+        self.assertLess(len(symo_num.sydi), len(symo.sydi))
+        for value in symo_num.sydi.itervalues():
+            self.assertFalse(value.is_Number)
+        subs = dict(
+            (tools.syms(key) if isinstance(key, str) else key, value)
+            for key, value in self.values.iteritems()
+        )
+        rand = random.Random(0)
+        # the torques of the wrist joints (the other ones are long to
+        # unfold)
+        for j in xrange(4, self.robo.NL):
+            gam = tools.syms('GAM%d' % j)
+            diff = symo.unfold(gam).xreplace(subs) - symo_num.unfold(gam)
+            point = dict(
+                (sym, rand.uniform(-1, 1)) for sym in diff.free_symbols
+            )
+            self.assertAlmostEqual(float(diff.xreplace(point)), 0)
+
+
+class TestPrunedModel(unittest.TestCase):
+    """Unit test for the models computed for some outputs only."""
+    def test_idym(self):
+        """Only the equations of the requested torques are written."""
+        robo = samplerobots.rx90()
+        symo = robo.compute_idym()
+        gam6 = tools.syms('GAM6')
+        symo_gam6 = robo.compute_idym(outputs=[gam6])
+        self.assertLess(len(symo_gam6.order_list), len(symo.order_list))
+        self.assertEqual(symo_gam6.order_list[-1], gam6)
+        self.assertEqual(symo_gam6.unfold(gam6), symo.unfold(gam6))
+        with open(symo_gam6.file_out.name) as output:
+            text = output.read()
+        self.assertIn('GAM6 = ', text)
+        self.assertNotIn('GAM5 = ', text)
+        robo.is_floating = True
+        with self.assertRaises(ValueError):
+            robo.compute_idym(outputs=[gam6])
+
+
+def run_tests():
+    """Load and run the unittests"""
+    unit_suite = unittest.TestLoader().loadTestsFromTestCase(TestSpecialize)
+    unit_suite.addTests(
+        unittest.TestLoader().loadTestsFromTestCase(TestPrunedModel)
+    )
+    unittest.TextTestRunner(verbosity=2).run(unit_suite)
+
+
+def main():
+    """Main function."""
+    run_tests()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+"""Unit test module for the numeric direct dynamic model and the
+simulation module."""
+
+
+import math
+import unittest
+
+import numpy
+
+from symoroutils import tools
+from pysymoro import numdynmodel
+from pysymoro import simulation
+from pysymoro.robotf import FloatingRobot as Robot
+
+
+def planar2r(is_floating=False):
+    """Create a numeric planar 2R robot with friction."""
+    robo = Robot(
+        'planar2r', 2, 2, 3, is_floating,
+        tools.SIMPLE, is_symbolic=False
+    )
+    robo.set_dyns_to_zero()
+    params = {
+        1: {'sigma': 0, 'mu': 1},
+        2: {'sigma': 0, 'mu': 1, 'd': 0.5},
+        3: {'sigma': 2, 'd': 0.4}
+    }
+    robo.update_params('geos', params)
+    params = {
+        1: {'zz': 3.7, 'frc': 0.3, 'frv': 0.3, 'mass': 1.2},
+        2: {
+            'zz': 0.35, 'frc': 0.25, 'frv': 0.18, 'mass': 0.8,
+            'msx': 0.4, 'msy': 0.15
+        }
+    }
+    if is_floating:
+        params[0] = {'mass': 2.0, 'xx': 0.3, 'yy': 0.4, 'zz': 0.5}
+    robo.update_params('dyns', params)
+    params = {0: {'qdots': 0, 'qddots': 0, 'torques': 0}}
+    robo.update_params('misc', params)
+    params = {0: {'gravity': 0}, 1: {'gravity': 0}, 2: {'gravity': -9.81}}
+    robo.update_params('misc', params)
+    return robo
+
+
+class TestNumericDirectDynModel(unittest.TestCase):
+    """Unit test for the numeric direct dynamic model."""
+    def _check_inverse(self, is_floating):
+        engine = numdynmodel.NumericDynModel(planar2r(is_floating))
+        rand = numpy.random.RandomState(7)
+        for k in range(10):
+            q, qdot, qddot = rand.uniform(-math.pi, math.pi, (3, 2))
+            torques = engine.inverse_dynamic_model(q, qdot, qddot)
+            qddots = engine.direct_dynamic_model(q, qdot, torques[1:])
+            numpy.testing.assert_allclose(qddots[1:], qddot, atol=1e-10)
+
+    def test_fixed(self):
+        """The direct model inverts the inverse model (fixed base)."""
+        self._check_inverse(is_floating=False)
+
+    def test_floating(self):
+        """The direct model inverts the inverse model (floating base)."""
+        self._check_inverse(is_floating=True)
+
+    def test_compute_ddym(self):
+        """FloatingRobot.compute_ddym uses the numeric engine."""
+        robo = planar2r()
+        robo.update_params('geos', {1: {'theta': 0.3}, 2: {'theta': -0.7}})
+        robo.update_params('misc', {
+            1: {'qdots': 0.5, 'qddots': -0.4},
+            2: {'qdots': 1.1, 'qddots': 0.9}
+        })
+        robo.compute_idym()
+        robo.update_params('misc', {
+            1: {'torques': robo.idym.torques[1]},
+            2: {'torques': robo.idym.torques[2]}
+        })
+        robo.compute_ddym()
+        self.assertAlmostEqual(robo.ddym.qddots[1], -0.4, places=10)
+        self.assertAlmostEqual(robo.ddym.qddots[2], 0.9, places=10)
+
+    def test_numeric_engine(self):
+        """The engine of the robot is rebuilt only when a constant
+        parameter changes."""
+        robo = planar2r()
+        engine = robo.numeric_engine
+        robo.update_params('geos', {1: {'theta': 0.3}, 2: {'theta': -0.7}})
+        robo.update_params('misc', {
+            1: {'qdots': 0.5, 'qddots': -0.4, 'torques': 1.5},
+            2: {'qdots': 1.1, 'qddots': 0.9, 'torques': -0.2}
+        })
+        robo.compute_idym()
+        robo.compute_ddym()
+        self.assertIs(robo.numeric_engine, engine)
+        torques = engine.inverse_dynamic_model().copy()
+        numpy.testing.assert_allclose(
+            torques, engine.inverse_dynamic_model(
+                [0.3, -0.7], [0.5, 1.1], [-0.4, 0.9]
+            )
+        )
+        self.assertAlmostEqual(robo.idym.torques[1], torques[1], places=10)
+        robo.update_params('dyns', {2: {'mass': 1.0}})
+        self.assertIsNot(robo.numeric_engine, engine)
+        engine = robo.numeric_engine
+        robo.update_params('misc', {2: {'gravity': -9.8}})
+        self.assertIsNot(robo.numeric_engine, engine)
+        engine = robo.numeric_engine
+        robo.is_floating = True
+        self.assertIsNot(robo.numeric_engine, engine)
+
+    def test_stored_state(self):
+        """Without arguments the joint state of the robot is used."""
+        robo = planar2r()
+        robo.update_params('misc', {
+            1: {'qdots': 0.5, 'qddots': -0.4, 'torques': 1.5},
+            2: {'qdots': 1.1, 'qddots': 0.9, 'torques': -0.2}
+        })
+        engine = numdynmodel.NumericDynModel(robo)
+        torques = engine.inverse_dynamic_model().copy()
+        numpy.testing.assert_allclose(
+            torques, engine.inverse_dynamic_model(
+                None, [0.5, 1.1], [-0.4, 0.9]
+            )
+        )
+        qddots = engine.direct_dynamic_model().copy()
+        numpy.testing.assert_allclose(
+            qddots, engine.direct_dynamic_model(None, [0.5, 1.1], [1.5, -0.2])
+        )
+
+
+class TestSimulation(unittest.TestCase):
+    """Unit test for the integrators and the Simulator class."""
+    def test_integrators(self):
+        """Integrate y' = -y whose solution is exp(-t)."""
+        func = lambda t, y: -y
+        steps = list(simulation.integrate_fixed(func, [1.0], 0, 1, 0.03))
+        self.assertEqual(steps[0][0], 0.0)
+        self.assertEqual(steps[-1][0], 1.0)
+        self.assertAlmostEqual(steps[-1][1][0], math.exp(-1), places=7)
+        steps = list(simulation.integrate_adaptive(
+            func, [1.0], 0, 1, rtol=1e-10, atol=1e-12
+        ))
+        self.assertAlmostEqual(steps[-1][0], 1.0, places=12)
+        self.assertAlmostEqual(steps[-1][1][0], math.exp(-1), places=9)
+
+    def test_tracking(self):
+        """
+        The torques computed with the inverse dynamic model for a
+        reference trajectory make the robot follow that trajectory.
+        """
+        engine = numdynmodel.NumericDynModel(planar2r())
+        q0 = numpy.array([0.2, -0.5])
+        qdot0 = numpy.array([0.4, 0.0])
+        qddot_ref = numpy.array([-1.0, 2.0])
+        def reference(t):
+            q = q0 + (qdot0 * t) + (0.5 * qddot_ref * t * t)
+            return q, qdot0 + (qddot_ref * t)
+        def torques(t, q, qdot):
+            q_ref, qdot_ref = reference(t)
+            return engine.inverse_dynamic_model(
+                q_ref, qdot_ref, qddot_ref
+            )[1:].copy()
+        sim = simulation.Simulator(planar2r(), torques)
+        for method in ('rk4', 'dopri'):
+            traj = sim.simulate(q0, qdot0, 1.0, step=0.01, method=method)
+            self.assertEqual(traj.t[-1], 1.0)
+            q_ref, qdot_ref = reference(1.0)
+            numpy.testing.assert_allclose(traj.q[-1], q_ref, atol=1e-6)
+            numpy.testing.assert_allclose(
+                traj.qdot[-1], qdot_ref, atol=1e-6
+            )
+            numpy.testing.assert_allclose(
+                traj.qddot[-1], qddot_ref, atol=1e-5
+            )
+
+    def test_states(self):
+        """The states are streamed by a generator."""
+        sim = simulation.Simulator(planar2r(), [0.0, 0.0])
+        states = sim.states([0.0, 0.0], [0.0, 0.0], 0.1, step=0.05)
+        state = next(states)
+        self.assertEqual(state.t, 0.0)
+        self.assertEqual(len(state.qddot), 2)
+        self.assertEqual([s.t for s in states], [0.05, 0.1])
+        with self.assertRaises(ValueError):
+            next(sim.states([0.0, 0.0], [0.0, 0.0], 0.1, method='euler'))
+
+    def test_floating(self):
+        """Robots with floating base are not simulated."""
+        with self.assertRaises(ValueError):
+            simulation.Simulator(planar2r(is_floating=True))
+
+    def test_torque_profile(self):
+        """Linear interpolation of tabulated torques."""
+        profile = simulation.torque_profile(
+            [0.0, 1.0], [[0.0, 2.0], [1.0, 4.0]]
+        )
+        numpy.testing.assert_allclose(profile(0.5, None, None), [0.5, 3.0])
+        numpy.testing.assert_allclose(profile(2.0, None, None), [1.0, 4.0])
+
+
+def run_tests():
+    """Load and run the unittests"""
+    unit_suite = unittest.TestLoader().loadTestsFromTestCase(
+        TestNumericDirectDynModel
+    )
+    unit_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(
+        TestSimulation
+    ))
+    unittest.TextTestRunner(verbosity=2).run(unit_suite)
+
+
+def main():
+    """Main function."""
+    run_tests()
+
+
+if __name__ == '__main__':
+    main()
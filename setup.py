@@ -19,9 +19,9 @@ def apply_folder_join(item):
 
 
 if os.name is 'nt':
-    bin_scripts = ['symoro-bin.py']
+    bin_scripts = ['symoro-bin.py', 'symoro-batch.py']
 else:
-    bin_scripts = ['symoro-bin']
+    bin_scripts = ['symoro-bin', 'symoro-batch']
 bin_scripts = map(apply_folder_join, bin_scripts)
 
 
@@ -21,6 +21,7 @@ import wx
 from pysymoro.robot import Robot
 from pysymoro import geometry
 from pysymoro import kinematics
+from pysymoro import incremental
 from pysymoro import invgeom
 from pysymoro import pieper
 from symoroutils import configfile
@@ -50,6 +51,8 @@ class MainFrame(wx.Frame):
         self.widget_keys = {}
         # object to store parameter values got from dialog box input
         self.par_dict = {}
+        # inverse dynamic model updated after the parameter changes
+        self.incremental_idm = None
         # setup panel and sizer for content
         self.panel = wx.Panel(self)
         self.szr_topmost = wx.BoxSizer(wx.VERTICAL)
@@ -998,7 +1001,10 @@ class MainFrame(wx.Frame):
         self.model_success(out_file_path)
 
     def OnInverseDynamic(self, event):
-        model_symo = self.robo.compute_idym()
+        if self.incremental_idm is None or \
+                self.incremental_idm.robo is not self.robo:
+            self.incremental_idm = incremental.IncrementalIDM(self.robo)
+        model_symo = self.incremental_idm.compute()
         out_file_path = self.prompt_file_save(model_symo)
         self.model_success(out_file_path)
 
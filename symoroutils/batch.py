@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+
+
+# This file is part of the OpenSYMORO project. Please see
+# https://github.com/symoro/symoro/blob/master/LICENCE for the licence.
+
+
+"""
+This module generates the models of several robots in batch. Each
+(PAR file, model) pair is an independent job and the jobs are run in
+parallel with a pool of worker processes. The output files are written
+next to the PAR files as done by the GUI.
+"""
+
+
+import multiprocessing
+import os
+import time
+import traceback
+from collections import namedtuple
+from collections import OrderedDict
+
+from symoroutils import tools
+
+
+# model type (also the output file extension) -> Robot method
+MODELS = OrderedDict([
+    ('idm', 'compute_idym'),
+    ('inm', 'compute_inertiamatrix'),
+    ('ccg', 'compute_pseudotorques'),
+    ('ddm', 'compute_ddym'),
+    ('regp', 'compute_baseparams'),
+    ('dim', 'compute_dynidenmodel')
+])
+
+
+JobResult = namedtuple(
+    'JobResult', ['par_file', 'kind', 'out_file', 'wall_time', 'error']
+)
+
+
+def read_robot(par_file):
+    """
+    Read a robot from a PAR file.
+
+    Args:
+        par_file: The path of the PAR file.
+
+    Returns:
+        An instance of Robot.
+
+    Raises:
+        IOError: If the file could not be read.
+    """
+    # parfile imports pysymoro.robot which imports this package
+    from symoroutils import parfile
+    robo_name = os.path.splitext(os.path.basename(par_file))[0]
+    robo, flag = parfile.readpar(robo_name, par_file)
+    if robo is None or flag == tools.FAIL:
+        raise IOError("Could not read the PAR file: %s" % par_file)
+    return robo
+
+
+def run_job(job):
+    """
+    Generate one model. The exceptions are caught so that a failing
+    job does not stop the other ones.
+
+    Args:
+        job: A tuple (par_file, kind, use_cache).
+
+    Returns:
+        A JobResult. `error` is None if the model was generated.
+    """
+    par_file, kind, use_cache = job
+    start = time.time()
+    out_file = None
+    error = None
+    try:
+        if kind not in MODELS:
+            raise ValueError("Unknown model type: %s" % kind)
+        robo = read_robot(par_file)
+        compute = getattr(robo, MODELS[kind])
+        if kind == 'regp':
+            # base params are not cached, a new PAR file is written
+            from symoroutils import parfile
+            symo, base_robo = compute()
+            parfile.writepar(base_robo)
+        else:
+            symo = compute(use_cache=use_cache)
+        out_file = symo.file_out.name
+    except Exception:
+        error = traceback.format_exc()
+    return JobResult(par_file, kind, out_file, time.time() - start, error)
+
+
+def make_jobs(par_files, kinds=None, use_cache=False):
+    """
+    Return the list of jobs for all the (PAR file, model) pairs.
+
+    Args:
+        par_files: A list of PAR file paths.
+        kinds: A list of model types (keys of `MODELS`). By default
+            all the models are generated.
+        use_cache: Passed to the Robot methods (see `modelcache`).
+    """
+    if kinds is None:
+        kinds = MODELS.keys()
+    return [
+        (os.path.abspath(par_file), kind, use_cache)
+        for par_file in par_files for kind in kinds
+    ]
+
+
+def run_batch(par_files, kinds=None, processes=None, use_cache=False,
+              callback=None):
+    """
+    Generate the models of several robots in parallel.
+
+    Args:
+        par_files: A list of PAR file paths.
+        kinds: A list of model types (keys of `MODELS`). By default
+            all the models are generated.
+        processes: The number of worker processes. By default it is
+            the number of CPUs. With 1 the jobs are run in the current
+            process.
+        use_cache: Passed to the Robot methods (see `modelcache`).
+        callback: A function called with each JobResult as soon as the
+            job is finished.
+
+    Returns:
+        The list of JobResult in the order of the jobs.
+    """
+    jobs = make_jobs(par_files, kinds, use_cache)
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    processes = max(1, min(processes, len(jobs)))
+    results = []
+    if processes == 1:
+        for job in jobs:
+            result = run_job(job)
+            if callback is not None:
+                callback(result)
+            results.append(result)
+        return results
+    pool = multiprocessing.Pool(processes)
+    try:
+        # chunksize of 1 since the jobs have very different durations
+        for result in pool.imap_unordered(run_job, jobs, 1):
+            if callback is not None:
+                callback(result)
+            results.append(result)
+    finally:
+        pool.close()
+        pool.join()
+    order = dict((job[:2], idx) for idx, job in enumerate(jobs))
+    results.sort(key=lambda result: order[result[:2]])
+    return results
+
+
+def format_result(result):
+    """
+    Return a one-line report of a job.
+    """
+    status = 'OK' if result.error is None else 'FAILED'
+    return '{0:>8.2f}s  {1:<6} {2:<5} {3}'.format(
+        result.wall_time, status, result.kind,
+        result.out_file or result.par_file
+    )
+
+
+def format_summary(results, wall_time):
+    """
+    Return the report of a batch with the errors of the failed jobs,
+    the total time of the jobs and the elapsed time.
+    """
+    lines = []
+    for result in results:
+        if result.error is not None:
+            lines.append('')
+            lines.append('{0} ({1}):'.format(result.par_file, result.kind))
+            lines.append(result.error.rstrip())
+    cpu_time = sum(result.wall_time for result in results)
+    if lines:
+        lines.append('')
+    lines.append(
+        '{0} jobs, {1} failed, {2:.2f}s of jobs in {3:.2f}s'.format(
+            len(results),
+            len([r for r in results if r.error is not None]),
+            cpu_time, wall_time
+        )
+    )
+    return '\n'.join(lines)
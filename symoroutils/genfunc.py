@@ -1,9 +1,17 @@
 # -*- coding: utf-8 -*-
 """
-This module provides MATLAB function generation
+This module provides MATLAB and C function generation
 """
 
+import ctypes
+import os
+import shutil
+import subprocess
+import tempfile
+
+import numpy
 from sympy import Matrix, Symbol
+from sympy.printing import ccode
 
 
 def gen_fheader_matlab(symo, name, args,
@@ -63,10 +71,12 @@ def convert_to_list(syms, keep_const=True):
         return []
 
 
-def gen_fbody_matlab(symo, name, to_return, args, ret_name=''):
+def gen_fbody_matlab(symo, name, to_return, args, ret_name='',
+                     strict=True):
     """Generates list of string statements of the function that
     computes symbolf from to_return.  arg_syms are considered to
-    be known
+    be known. If strict is True (default), ValueError is raised when
+    some required symbols are not defined.
     """
      # set of defined symbols
     arg_syms = symo.extract_syms(args)
@@ -83,7 +93,7 @@ def gen_fbody_matlab(symo, name, to_return, args, ret_name=''):
         else:
             to_ret_str = convert_syms_matlab(to_return)
     # defines order of computation
-    order_list = symo.sift_syms(res_syms, arg_syms)
+    order_list = symo.sift_syms(res_syms, arg_syms, strict)
     # list of instructions in final function
     func_body = []
     # will be switched to true when branching detected
@@ -140,3 +150,276 @@ def gen_fbody_matlab(symo, name, to_return, args, ret_name=''):
     func_body.append('end\n')
     func_body.insert(0, glob_item + '\n')
     return func_body
+
+
+C_PRELUDE = """#include <math.h>
+
+#ifndef M_PI
+#define M_PI 3.14159265358979323846
+#endif
+
+static double sign(double x)
+{
+    return (double)((x > 0.0) - (x < 0.0));
+}
+
+"""
+
+
+# names that can not be used as C variable names
+C_RESERVED = set([
+    'auto', 'break', 'case', 'char', 'const', 'continue', 'default',
+    'do', 'double', 'else', 'enum', 'extern', 'float', 'for', 'goto',
+    'if', 'int', 'long', 'register', 'return', 'short', 'signed',
+    'sizeof', 'static', 'struct', 'switch', 'typedef', 'union',
+    'unsigned', 'void', 'volatile', 'while', 'args', 'result',
+    'count', 'sign', 'sin', 'cos', 'tan', 'sqrt', 'pow', 'fabs',
+    'atan2', 'exp', 'log', 'gamma', 'j0', 'j1', 'jn', 'y0', 'y1', 'yn'
+])
+
+
+def _c_name(sym):
+    name = str(sym)
+    if name in C_RESERVED:
+        return name + '_'
+    return name
+
+
+def _c_expr(expr, rename):
+    if rename and hasattr(expr, 'xreplace'):
+        expr = expr.xreplace(rename)
+    return ccode(expr)
+
+
+def gen_fheader_c(symo, name, args, to_return):
+    """Generates list of string statements for the C function header.
+    The function reads its input from a flat array of doubles `args`
+    and writes its output into a flat array of doubles `result`.
+    Return value is the number of solutions written into `result`.
+    """
+    func_head = [C_PRELUDE]
+    func_head.append(
+        'int %s(const double *args, double *result)\n{\n' % name
+    )
+    return func_head
+
+
+def gen_fbody_c(symo, name, to_return, args, strict=True):
+    """Generates list of string statements of the C function that
+    computes the symbols from to_return. arg_syms are considered to
+    be known. The equations are emitted in the same order as for
+    the python syntax.
+    """
+    arg_list = convert_to_list(args, keep_const=True)
+    ret_list = convert_to_list(to_return, keep_const=True)
+    arg_syms = symo.extract_syms(args)
+    res_syms = symo.extract_syms(to_return)
+    order_list = symo.sift_syms(res_syms, arg_syms, strict)
+    rename = dict(
+        (s, Symbol(_c_name(s))) for s in arg_syms | set(order_list)
+        if str(s) in C_RESERVED
+    )
+    space = '    '
+    folded = 1
+    func_body = ['%sint count = 0;\n' % space]
+    declared = set()
+    for i, s in enumerate(arg_list):
+        if isinstance(s, Symbol) and s not in declared:
+            declared.add(s)
+            func_body.append(
+                '%sdouble %s = args[%s];\n' % (space, _c_name(s), i)
+            )
+    for s in order_list:
+        if s not in symo.sydi:
+            item = '%sdouble %s = 1.;\n' % (space * folded, _c_name(s))
+        elif isinstance(symo.sydi[s], tuple):
+            vals = ', '.join(_c_expr(x, rename) for x in symo.sydi[s])
+            cnt = len(symo.sydi[s])
+            item = '%sconst double %s_vals[%s] = {%s};\n' % (
+                space * folded, _c_name(s), cnt, vals
+            )
+            item += '%sint %s_idx;\n' % (space * folded, _c_name(s))
+            item += '%sfor (%s_idx = 0; %s_idx < %s; %s_idx++) {\n' % (
+                space * folded, _c_name(s), _c_name(s), cnt, _c_name(s)
+            )
+            folded += 1
+            item += '%sdouble %s = %s_vals[%s_idx];\n' % (
+                space * folded, _c_name(s), _c_name(s), _c_name(s)
+            )
+        else:
+            item = '%sdouble %s = %s;\n' % (
+                space * folded, _c_name(s), _c_expr(symo.sydi[s], rename)
+            )
+        func_body.append(item)
+    num_ret = len(ret_list)
+    for i, s in enumerate(ret_list):
+        func_body.append('%sresult[count*%s + %s] = %s;\n' % (
+            space * folded, num_ret, i, _c_expr(s, rename)
+        ))
+    func_body.append('%scount++;\n' % (space * folded))
+    for f in xrange(folded - 1, 0, -1):
+        func_body.append('%s}\n' % (space * f))
+    func_body.append('%sreturn count;\n}\n' % space)
+    return func_body
+
+
+def branch_sizes(symo, to_return, args):
+    """Returns the list of the numbers of values of the multivalued
+    symbols needed to compute to_return. The generated function
+    returns a list of solutions if this list is not empty.
+    """
+    arg_syms = symo.extract_syms(args)
+    res_syms = symo.extract_syms(to_return)
+    return [
+        len(symo.sydi[s]) for s in symo.sift_syms(res_syms, arg_syms, False)
+        if isinstance(symo.sydi.get(s), tuple)
+    ]
+
+
+def _flatten_values(vals):
+    if hasattr(vals, 'tolist'):
+        vals = vals.tolist()
+    if isinstance(vals, Matrix):
+        vals = list(vals)
+    if isinstance(vals, (list, tuple)):
+        res = []
+        for item in vals:
+            res.extend(_flatten_values(item))
+        return res
+    return [float(vals)]
+
+
+def result_shape(syms):
+    """Returns the structure of the result of the generated function
+    for to_return = syms: a list of the structures of the items for
+    a list or a tuple, the (rows, cols) shape for a Matrix and None
+    for a single value.
+    """
+    if isinstance(syms, (list, tuple)):
+        return [result_shape(item) for item in syms]
+    elif isinstance(syms, Matrix):
+        return syms.shape
+    else:
+        return None
+
+
+def _shape_values(shape, flat_iter):
+    """Rebuilds the nested list structure produced by
+    SymbolManager.convert_syms from the flat result values.
+    shape is given by result_shape.
+    """
+    if isinstance(shape, list):
+        return [_shape_values(item, flat_iter) for item in shape]
+    elif shape is not None:
+        return [
+            [flat_iter.next() for j in xrange(shape[1])]
+            for i in xrange(shape[0])
+        ]
+    else:
+        return flat_iter.next()
+
+
+def compile_c_func(symo, name, to_return, args, build_dir=None,
+                   strict=True):
+    """Generates the C function, compiles it into a shared library
+    with the system C compiler and loads it with ctypes.
+
+    Parameters
+    ==========
+    symo: SymbolManager
+        Instance that contains the model equations
+    name: string
+        Function name, must be a valid C identifier
+    to_return: list, Matrix or tuple of them
+        Determins the shape of the output and symbols inside it
+    args: list, Matrix or tuple of them
+        Determins the shape of the input and symbols names
+    build_dir: string, optional
+        Folder for the generated source and library. If not
+        specified, a temporary folder is used and removed once the
+        library is loaded.
+    strict: bool, optional
+        If True (default), ValueError is raised when the result
+        depends on symbols that are neither defined nor given in args
+
+    Returns
+    =======
+    func: function
+        Python function with the same calling signature and the same
+        result structure as the one returned by SymbolManager.gen_func.
+        Every call returns new lists and the function can be called
+        from several threads. The C code is kept in func.c_source
+
+    Notes
+    =====
+    The compiler is taken from the CC environment variable, `cc` is
+    used by default.
+    """
+    c_string = symo.gen_func_string(name, to_return, args, syntax='c',
+                                    strict=strict)
+    is_temp = build_dir is None
+    if is_temp:
+        build_dir = tempfile.mkdtemp(prefix='symoro-c-')
+    try:
+        src_path = os.path.join(build_dir, '%s.c' % name)
+        lib_path = os.path.join(build_dir, '%s.so' % name)
+        with open(src_path, 'w') as src_file:
+            src_file.write(c_string)
+        compiler = os.environ.get('CC', 'cc')
+        cmd = [compiler, '-O2', '-shared', '-fPIC',
+               '-o', lib_path, src_path, '-lm']
+        proc = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        )
+        output = proc.communicate()[0]
+        if proc.returncode != 0:
+            raise RuntimeError(
+                "Compilation of %s failed:\n%s" % (src_path, output)
+            )
+        # the loaded library stays mapped after its file is removed
+        c_func = getattr(ctypes.CDLL(lib_path), name)
+    finally:
+        if is_temp:
+            shutil.rmtree(build_dir, ignore_errors=True)
+    c_func.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+    c_func.restype = ctypes.c_int
+    num_args = len(convert_to_list(args, keep_const=True))
+    ret_list = convert_to_list(to_return, keep_const=True)
+    num_ret = len(ret_list)
+    ret_shape = result_shape(to_return)
+    # a list of single values is returned as it is
+    flat_ret = isinstance(ret_shape, list) and \
+        all(item is None for item in ret_shape)
+    branches = branch_sizes(symo, to_return, args)
+    multival = len(branches) > 0
+    num_sol = reduce(lambda x, y: x * y, branches, 1)
+    res_size = max(num_ret * num_sol, 1)
+
+    def shape(values):
+        if flat_ret:
+            return values
+        return _shape_values(ret_shape, iter(values))
+
+    def func(*vals):
+        try:
+            arg_buf = numpy.ascontiguousarray(vals[0], dtype=float)
+        except (ValueError, TypeError):
+            arg_buf = numpy.array(_flatten_values(vals[0]))
+        if arg_buf.size != num_args:
+            raise ValueError(
+                "%s expects %s input values, got %s" % (
+                    name, num_args, arg_buf.size
+                )
+            )
+        # a result buffer for each call keeps the function re-entrant
+        res_buf = numpy.empty(res_size)
+        count = c_func(arg_buf.ctypes.data, res_buf.ctypes.data)
+        res = res_buf[:count*num_ret].tolist()
+        if not multival:
+            return shape(res)
+        return [
+            shape(res[k*num_ret:(k + 1)*num_ret]) for k in xrange(count)
+        ]
+    func.__name__ = name
+    func.c_source = c_string
+    return func
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+
+
+# This file is part of the OpenSYMORO project. Please see
+# https://github.com/symoro/symoro/blob/master/LICENCE for the licence.
+
+
+"""
+This module provides a persistent on-disk cache of the models generated
+by the SYMORO software package. A model is identified by the hash of
+the PAR file content of the robot, the model type, the options used
+to compute it and the source code that generates it. Least recently
+used entries are evicted when the total size of the cache exceeds the
+limit.
+"""
+
+
+import cPickle as pickle
+import functools
+import glob
+import hashlib
+import inspect
+import os
+import tempfile
+
+from symoroutils import filemgr
+from symoroutils import sinks
+from symoroutils import symbolmgr
+
+
+CACHE_FOLDER = "cache"
+CACHE_VERSION = 1
+CACHE_EXT = ".pkl"
+# suffix of the entries being written
+TMP_EXT = ".tmp"
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+# packages whose source code generates the models
+CODE_PACKAGES = ('pysymoro', 'symoroutils')
+# errors of pickle.load for a corrupted entry or an entry that refers
+# to classes or functions that changed
+LOAD_ERRORS = (
+    IOError, EOFError, pickle.UnpicklingError, AttributeError,
+    ImportError, IndexError, KeyError, TypeError, ValueError
+)
+
+
+_code_fingerprint = []
+
+
+class ModelCache(object):
+    """
+    Directory of pickled models with a size limit.
+    """
+    def __init__(self, path=None, max_size=DEFAULT_MAX_SIZE):
+        """
+        Constructor period.
+
+        Args:
+            path: The cache folder. By default it is the `cache` folder
+                in the base path of the SYMORO robot files.
+            max_size: The maximum total size of the cache in bytes.
+        """
+        if path is None:
+            path = os.path.join(filemgr.get_base_path(), CACHE_FOLDER)
+        self.path = path
+        self.max_size = max_size
+
+    def entry_path(self, key):
+        """
+        Return the file path of the cache entry.
+        """
+        return os.path.join(self.path, key + CACHE_EXT)
+
+    def get(self, key):
+        """
+        Return the cached data or None if the key is not in the cache.
+        The access time of the entry is updated for the LRU eviction.
+        """
+        fname = self.entry_path(key)
+        try:
+            with open(fname, 'rb') as f:
+                data = pickle.load(f)
+        except LOAD_ERRORS:
+            return None
+        os.utime(fname, None)
+        return data
+
+    def put(self, key, data):
+        """
+        Store the data in the cache and evict the least recently used
+        entries if the cache is too large.
+        """
+        filemgr.make_folders(self.path)
+        # write to a temporary file first so that a concurrent reader
+        # never sees a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=TMP_EXT)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+            os.rename(tmp_path, self.entry_path(key))
+        except:
+            _remove(tmp_path)
+            raise
+        self.evict()
+
+    def entries(self):
+        """
+        Return the list of (access time, size, file path) of the cache
+        entries sorted from the least to the most recently used.
+        """
+        if not os.path.isdir(self.path):
+            return []
+        entries = []
+        for fname in os.listdir(self.path):
+            if not fname.endswith(CACHE_EXT):
+                continue
+            fpath = os.path.join(self.path, fname)
+            stat = os.stat(fpath)
+            entries.append((stat.st_mtime, stat.st_size, fpath))
+        return sorted(entries)
+
+    def size(self):
+        """
+        Return the total size of the cache in bytes.
+        """
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the total size of
+        the cache does not exceed the limit.
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, fpath in entries:
+            if total <= self.max_size:
+                break
+            os.remove(fpath)
+            total -= size
+
+    def clear(self):
+        """
+        Remove all the entries of the cache and the temporary files
+        left by the interrupted writes.
+        """
+        for _, _, fpath in self.entries():
+            os.remove(fpath)
+        for fpath in glob.glob(os.path.join(self.path, '*' + TMP_EXT)):
+            _remove(fpath)
+
+
+def _remove(fpath):
+    """
+    Remove a file that may already be removed.
+    """
+    try:
+        os.remove(fpath)
+    except OSError:
+        pass
+
+
+def code_fingerprint():
+    """
+    Return the SHA-1 digest of the source files of the packages that
+    generate the models so that the cached models are not used after a
+    change of the code. The digest is computed once per process.
+    """
+    if not _code_fingerprint:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        digest = hashlib.sha1()
+        for package in CODE_PACKAGES:
+            pattern = os.path.join(root, package, '*.py')
+            for fname in sorted(glob.glob(pattern)):
+                digest.update(os.path.basename(fname) + '\n')
+                with open(fname, 'rb') as f:
+                    digest.update(f.read())
+        _code_fingerprint.append(digest.hexdigest())
+    return _code_fingerprint[0]
+
+
+def model_key(robo, kind, options=None):
+    """
+    Return the cache key of a model.
+
+    Args:
+        robo: The Robot instance.
+        kind: The model type (e.g. 'idm', 'ddm', 'inm').
+        options: A dictionary of the options used to compute the model.
+
+    Returns:
+        A string with the hexadecimal SHA-1 digest.
+    """
+    # parfile imports pysymoro.robot which uses this module
+    from symoroutils import parfile
+    key = hashlib.sha1()
+    key.update('version = %s\n' % CACHE_VERSION)
+    key.update('code = %s\n' % code_fingerprint())
+    key.update('kind = %s\n' % kind)
+    for name, value in sorted((options or {}).items()):
+        key.update('%s = %r\n' % (name, value))
+    key.update(parfile.get_par_string(robo))
+    return key.hexdigest()
+
+
+def _read_output(symo):
+    """
+    Return the content of the closed output file of a SymbolManager.
+    """
+    fname = getattr(symo.file_out, 'name', None)
+    if fname is None or not os.path.isfile(fname):
+        return None
+    # only the text output is restored
+    if not isinstance(symo.file_out, sinks.TextSink):
+        return None
+    with open(fname, 'r') as f:
+        return f.read()
+
+
+def _restore(robo, ext, data):
+    """
+    Return a SymbolManager filled with the cached model. The model
+    output file is written again as if the model was computed.
+    """
+    symo = symbolmgr.SymbolManager(None)
+    symo.sydi = data['sydi']
+    symo.order_list = data['order_list']
+    symo.revdi = symbolmgr.SignedRevDict(
+        (symo.sydi[k], k) for k in symo.sydi
+    )
+    if data['output'] is not None:
+        symo.file_open(robo, ext, 'text')
+        symo.file_out.write(data['output'])
+        symo.file_out.close()
+    return symo
+
+
+def cached(ext, ignore=()):
+    """
+    Decorator for the Robot methods that compute a model and return
+    the SymbolManager instance. The decorated method accepts an extra
+    keyword argument `use_cache` that can be True (default cache),
+    a ModelCache instance or False (the model is always computed).
+
+    Args:
+        ext: The model type, also used as the output file extension.
+        ignore: The names of the arguments of the method that do not
+            change the model (e.g. the number of processes). They are
+            not part of the key.
+    """
+    def decorator(compute):
+        @functools.wraps(compute)
+        def wrapper(robo, *args, **kwargs):
+            cache = kwargs.pop('use_cache', False)
+            if not cache:
+                return compute(robo, *args, **kwargs)
+            if not isinstance(cache, ModelCache):
+                cache = ModelCache()
+            options = inspect.getcallargs(compute, robo, *args, **kwargs)
+            options.pop(inspect.getargspec(compute).args[0])
+            for name in ignore:
+                options.pop(name, None)
+            key = model_key(robo, ext, options)
+            data = cache.get(key)
+            if data is not None:
+                return _restore(robo, ext, data)
+            symo = compute(robo, *args, **kwargs)
+            data = {
+                'sydi': symo.sydi,
+                'order_list': symo.order_list,
+                'output': _read_output(symo)
+            }
+            cache.put(key, data)
+            return symo
+        return wrapper
+    return decorator
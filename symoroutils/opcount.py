@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+
+# This file is part of the OpenSYMORO project. Please see
+# https://github.com/symoro/symoro/blob/master/LICENCE for the licence.
+
+
+"""
+This module counts the operations of the models generated by the
+SYMORO software package. The counts are given per group of equations
+(symbols that share the same name prefix like W, VP, F, N, GAM) and in
+total so that different algorithms and releases can be compared.
+"""
+
+
+import json
+import re
+from collections import OrderedDict
+
+from sympy import Expr, Rational
+from sympy import sin, cos, atan2
+
+from symoroutils import symbolmgr
+from symoroutils import tools
+
+
+OPERATIONS = ('mul', 'add', 'sincos', 'sqrt', 'atan2')
+
+
+def new_counts():
+    """
+    Return a dictionary with all the operation counts set to zero.
+    """
+    return OrderedDict((op, 0) for op in OPERATIONS)
+
+
+def count_expr(expr):
+    """
+    Count the operations needed to compute an expression.
+
+    Args:
+        expr: The symbolic expression.
+
+    Returns:
+        An OrderedDict with the number of multiplications, additions,
+        sin/cos, sqrt and atan2 evaluations.
+    """
+    counts = new_counts()
+    if not isinstance(expr, Expr):
+        return counts
+    counts['mul'], counts['add'] = tools.count_mul_add(expr)
+    counts['sincos'] = len(_find_nodes(expr, (sin, cos)))
+    counts['atan2'] = len(_find_nodes(expr, (atan2,)))
+    counts['sqrt'] = len([
+        node for node in _find_nodes(expr, ())
+        if node.is_Pow and abs(node.exp) == Rational(1, 2)
+    ])
+    return counts
+
+
+def _find_nodes(expr, types):
+    """
+    Return the list of all the sub-expressions of `expr` that are
+    instances of `types` (or all of them if `types` is empty). The
+    repeated sub-expressions are counted as many times as they appear.
+    """
+    nodes = []
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        if not types or isinstance(node, types):
+            nodes.append(node)
+        stack.extend(node.args)
+    return nodes
+
+
+def group_name(sym):
+    """
+    Return the group name of a symbol that is the alphabetic prefix of
+    its name.
+
+    >>> group_name('VP12')
+    'VP'
+    >>> group_name('GAM3')
+    'GAM'
+    """
+    return re.match(r'[A-Za-z]*', str(sym)).group() or str(sym)
+
+
+def profile(symo):
+    """
+    Count the operations of all the equations of a SymbolManager.
+
+    Args:
+        symo: The SymbolManager instance holding the generated model.
+
+    Returns:
+        An OrderedDict with the keys `groups` (operation counts and the
+        number of equations of each group of symbols, in order of the
+        first appearance of the group) and `total`.
+    """
+    groups = OrderedDict()
+    total = new_counts()
+    total['equations'] = 0
+    for sym in symo.order_list:
+        val = symo.sydi[sym]
+        vals = val if isinstance(val, tuple) else (val,)
+        name = group_name(sym)
+        if name not in groups:
+            groups[name] = new_counts()
+            groups[name]['equations'] = 0
+        groups[name]['equations'] += 1
+        total['equations'] += 1
+        for item in vals:
+            for op, num in count_expr(item).iteritems():
+                groups[name][op] += num
+                total[op] += num
+    return OrderedDict([('groups', groups), ('total', total)])
+
+
+def idm_profiles(robo):
+    """
+    Generate the inverse dynamic model of the robot with every
+    Newton-Euler algorithm and count the operations of each of them.
+
+    Args:
+        robo: The Robot instance.
+
+    Returns:
+        An OrderedDict with the profile of the `fixed`, `composite`
+        and `flexible` algorithms.
+    """
+    from pysymoro import nealgos
+    algos = (
+        ('fixed', nealgos.fixed_inverse_dynmodel),
+        ('composite', nealgos.composite_inverse_dynmodel),
+        ('flexible', nealgos.flexible_inverse_dynmodel)
+    )
+    profiles = OrderedDict()
+    for name, algo in algos:
+        symo = symbolmgr.SymbolManager(None)
+        algo(robo, symo)
+        profiles[name] = profile(symo)
+    return profiles
+
+
+def to_json(data, indent=2):
+    """
+    Return the JSON representation of a profile.
+    """
+    return json.dumps(data, indent=indent)
+
+
+def write_json(data, file_path):
+    """
+    Write a profile to a JSON file.
+
+    Args:
+        data: The profile as returned by `profile` or `idm_profiles`.
+        file_path: The path of the output file.
+    """
+    with open(file_path, 'w') as json_file:
+        json_file.write(to_json(data))
+        json_file.write('\n')
+
+
+def write_profile(symo, data):
+    """
+    Write a profile as a table into the output of a SymbolManager.
+
+    Args:
+        symo: The SymbolManager instance whose output is used.
+        data: The profile as returned by `profile`.
+    """
+    header = ['Group', 'Eqs'] + [op.upper() for op in OPERATIONS]
+    symo.write_line(tools.l2str(header))
+    rows = data['groups'].items() + [('Total', data['total'])]
+    for name, counts in rows:
+        line = [name, counts['equations']]
+        line.extend(counts[op] for op in OPERATIONS)
+        symo.write_line(tools.l2str(line))
+    symo.write_line()
+
+
+def main():
+    """
+    Print the operation counts of the inverse dynamic models of the
+    RX-90 robot as JSON.
+    """
+    from symoroutils import samplerobots
+    print(to_json(idm_profiles(samplerobots.rx90())))
+
+
+if __name__ == '__main__':
+    main()
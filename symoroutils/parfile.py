@@ -13,6 +13,7 @@ plain text file used to represent the different parameters of the robot.
 
 import os
 import re
+from cStringIO import StringIO
 
 from symoroutils import filemgr
 from symoroutils import tools
@@ -87,38 +88,74 @@ def _write_par_list(robo, f, key, N0, N):
 def writepar(robo):
     fname = robo.par_file_path
     with open(fname, 'w') as f:
-        # robot description
-        f.write('(* Robotname = \'{0}\' *)\n'.format(robo.name))
-        f.write('NL = {0}\n'.format(robo.nl))
-        f.write('NJ = {0}\n'.format(robo.nj))
-        f.write('NF = {0}\n'.format(robo.nf))
-        f.write('Type = {0}\n'.format(tools.TYPES.index(robo.structure)))
-        f.write('is_floating = {0}\n'.format(robo.is_floating))
-        f.write('is_mobile = {0}\n'.format(robo.is_mobile))
-        # geometric parameters
-        f.write('\n(* Geometric parameters *)\n')
-        for key in _NF:
-            _write_par_list(robo, f, key, 1, robo.NF)
-        # dynamic parameters
-        f.write('\n(* Dynamic parameters and external forces *)\n')
-        N0 = 0 if robo.is_floating or robo.is_mobile else 1
-        for key in _NL:
-            _write_par_list(robo, f, key, N0, robo.NL)
-        # joint parameters
-        f.write('\n(* Joint parameters *)\n')
-        for key in _NJ:
-            _write_par_list(robo, f, key, 1, robo.NJ)
-        # base parameters - velocity and acceleration
-        f.write('\n(* Velocity and acceleration of the base *)\n')
-        for key in _VEC:
-            _write_par_list(robo, f, key, 0, 3)
-        # gravity vector
-        f.write('\n(* Acceleration of gravity *)\n')
-        _write_par_list(robo, f, 'G', 0, 3)
-        # base parameters - Z matrix
-        f.write('\n(* Transformation of 0 frame position fT0 *)\n')
-        _write_par_list(robo, f, 'Z', 0, 16)
-        f.write('\n(* End of definition *)\n')
+        _write_par(robo, f)
+
+
+def get_par_string(robo):
+    """Returns the content of the PAR file of the robot as a string."""
+    f = StringIO()
+    _write_par(robo, f)
+    return f.getvalue()
+
+
+def get_par_values(robo):
+    """Returns the parameters of the PAR file of the robot as a
+    dictionary {(key, index): value}. The description of the robot
+    (NL, NJ, NF, Type, is_floating, is_mobile) has None as index.
+    """
+    values = {
+        ('NL', None): robo.nl,
+        ('NJ', None): robo.nj,
+        ('NF', None): robo.nf,
+        ('Type', None): robo.structure,
+        ('is_floating', None): robo.is_floating,
+        ('is_mobile', None): robo.is_mobile
+    }
+    N0 = 0 if robo.is_floating or robo.is_mobile else 1
+    ranges = [
+        (_NF, 1, robo.NF), (_NL, N0, robo.NL), (_NJ, 1, robo.NJ),
+        (_VEC + ['G'], 0, 3), (['Z'], 0, 16)
+    ]
+    for keys, start, stop in ranges:
+        for key in keys:
+            for i in xrange(start, stop):
+                values[key, i] = robo.get_val(i, key)
+    return values
+
+
+def _write_par(robo, f):
+    # robot description
+    f.write('(* Robotname = \'{0}\' *)\n'.format(robo.name))
+    f.write('NL = {0}\n'.format(robo.nl))
+    f.write('NJ = {0}\n'.format(robo.nj))
+    f.write('NF = {0}\n'.format(robo.nf))
+    f.write('Type = {0}\n'.format(tools.TYPES.index(robo.structure)))
+    f.write('is_floating = {0}\n'.format(robo.is_floating))
+    f.write('is_mobile = {0}\n'.format(robo.is_mobile))
+    # geometric parameters
+    f.write('\n(* Geometric parameters *)\n')
+    for key in _NF:
+        _write_par_list(robo, f, key, 1, robo.NF)
+    # dynamic parameters
+    f.write('\n(* Dynamic parameters and external forces *)\n')
+    N0 = 0 if robo.is_floating or robo.is_mobile else 1
+    for key in _NL:
+        _write_par_list(robo, f, key, N0, robo.NL)
+    # joint parameters
+    f.write('\n(* Joint parameters *)\n')
+    for key in _NJ:
+        _write_par_list(robo, f, key, 1, robo.NJ)
+    # base parameters - velocity and acceleration
+    f.write('\n(* Velocity and acceleration of the base *)\n')
+    for key in _VEC:
+        _write_par_list(robo, f, key, 0, 3)
+    # gravity vector
+    f.write('\n(* Acceleration of gravity *)\n')
+    _write_par_list(robo, f, 'G', 0, 3)
+    # base parameters - Z matrix
+    f.write('\n(* Transformation of 0 frame position fT0 *)\n')
+    _write_par_list(robo, f, 'Z', 0, 16)
+    f.write('\n(* End of definition *)\n')
 
 
 def readpar(robo_name, file_path):
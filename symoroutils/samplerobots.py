@@ -11,7 +11,7 @@ for multiple purposes.
 """
 
 
-from sympy import pi, var, zeros
+from sympy import pi, zeros
 from sympy import Matrix
 
 from pysymoro.robot import Robot
@@ -26,8 +26,8 @@ def cart_pole():
     robo.sigma = (0, 1, 0)
     robo.alpha = (0, pi/2, pi/2)
     robo.d = (0, 0, 0)
-    robo.theta = (0, pi/2, var('th2'))
-    robo.r = (0, var('r1'), 0)
+    robo.theta = (0, pi/2, tools.syms('th2'))
+    robo.r = (0, tools.syms('r1'), 0)
     robo.b = (0, 0, 0)
     robo.gamma = (0, 0, 0)
     robo.structure = tools.SIMPLE
@@ -36,26 +36,26 @@ def cart_pole():
     robo.Fex = [zeros(3, 1) for i in robo.num]
     robo.FS = [0 for i in robo.num]
     robo.IA = [0 for i in robo.num]
-    robo.FV = [var('FV{0}'.format(i)) for i in robo.num]
+    robo.FV = [tools.syms('FV{0}'.format(i)) for i in robo.num]
     robo.MS = [zeros(3, 1) for i in robo.num]
-    robo.MS[1][0] = var('MX2')
-    robo.M = [var('M{0}'.format(i)) for i in robo.num]
-    robo.GAM = [var('GAM{0}'.format(i)) for i in robo.num]
+    robo.MS[1][0] = tools.syms('MX2')
+    robo.M = [tools.syms('M{0}'.format(i)) for i in robo.num]
+    robo.GAM = [tools.syms('GAM{0}'.format(i)) for i in robo.num]
     inertia_matrix_terms = ("XX{0}, XY{0}, XZ{0}, ") + \
         ("XY{0}, YY{0}, YZ{0}, ") + \
         ("XZ{0}, YZ{0}, ZZ{0}")
     robo.J = [
-        Matrix(3, 3, var(inertia_matrix_terms.format(i))) \
+        Matrix(3, 3, tools.syms(inertia_matrix_terms.format(i))) \
         for i in robo.num
     ]
-    robo.G = Matrix([0, 0, -var('G3')])
+    robo.G = Matrix([0, 0, -tools.syms('G3')])
     robo.w0 = zeros(3, 1)
     robo.wdot0 = zeros(3, 1)
     robo.v0 = zeros(3, 1)
     robo.vdot0 = zeros(3, 1)
-    robo.q = [0, var('r1'), var('th2')]
-    robo.qdot = [0, var('r1d'), var('th2d')]
-    robo.qddot = [0, var('r1dd'), var('th2dd')]
+    robo.q = [0, tools.syms('r1'), tools.syms('th2')]
+    robo.qdot = [0, tools.syms('r1d'), tools.syms('th2d')]
+    robo.qddot = [0, tools.syms('r1dd'), tools.syms('th2dd')]
     return robo
 
 
@@ -68,33 +68,35 @@ def planar2r():
     robo.gamma = [0, 0, 0]
     robo.b = [0, 0, 0]
     robo.alpha = [0, 0, 0]
-    robo.d = [0, 0, var('L1')]
-    robo.theta = [0, var('q1'), var('q2')]
+    robo.d = [0, 0, tools.syms('L1')]
+    robo.theta = [0, tools.syms('q1'), tools.syms('q2')]
     robo.r = [0, 0, 0]
     robo.num = range(0, 3)
     robo.Nex = [zeros(3, 1) for i in robo.num]
     robo.Fex = [zeros(3, 1) for i in robo.num]
     robo.FS = [0 for i in robo.num]
     robo.IA = [0 for i in robo.num]
-    robo.FV = [var('FV{0}'.format(i)) for i in robo.num]
-    robo.MS = [Matrix(var('MX{0}, MY{0}, MZ{0}'.format(i))) for i in robo.num]
-    robo.M = [var('M{0}'.format(i)) for i in robo.num]
-    robo.GAM = [var('GAM{0}'.format(i)) for i in robo.num]
+    robo.FV = [tools.syms('FV{0}'.format(i)) for i in robo.num]
+    robo.MS = [
+        Matrix(tools.syms('MX{0}, MY{0}, MZ{0}'.format(i))) for i in robo.num
+    ]
+    robo.M = [tools.syms('M{0}'.format(i)) for i in robo.num]
+    robo.GAM = [tools.syms('GAM{0}'.format(i)) for i in robo.num]
     inertia_matrix_terms = ("XX{0}, XY{0}, XZ{0}, ") + \
         ("XY{0}, YY{0}, YZ{0}, ") + \
         ("XZ{0}, YZ{0}, ZZ{0}")
     robo.J = [
-        Matrix(3, 3, var(inertia_matrix_terms.format(i))) \
+        Matrix(3, 3, tools.syms(inertia_matrix_terms.format(i))) \
         for i in robo.num
     ]
-    robo.G = Matrix([0, 0, -var('G3')])
+    robo.G = Matrix([0, 0, -tools.syms('G3')])
     robo.w0 = zeros(3, 1)
     robo.wdot0 = zeros(3, 1)
     robo.v0 = zeros(3, 1)
     robo.vdot0 = zeros(3, 1)
-    robo.q = [0, var('q1'), var('q2')]
-    robo.qdot = [0, var('QP1'), var('QP2')]
-    robo.qddot = [0, var('QDP1'), var('QDP2')]
+    robo.q = [0, tools.syms('q1'), tools.syms('q2')]
+    robo.qdot = [0, tools.syms('QP1'), tools.syms('QP2')]
+    robo.qddot = [0, tools.syms('QDP1'), tools.syms('QDP2')]
     return robo
 
 
@@ -106,11 +108,11 @@ def sr400():
     robo.sigma = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2]
     robo.mu = [0, 1, 1, 0, 1, 1, 1, 1, 0, 0, 0]
     robo.alpha = [0, 0, -pi/2, 0, -pi/2, pi/2, -pi/2, -pi/2, 0, 0, 0]
-    d_var = var('D:9')
+    d_var = tools.syms('D:9')
     robo.d = [0, 0, d_var[2], d_var[3], d_var[4], 0, 0,
               d_var[2], d_var[8], d_var[3], -d_var[8]]
-    robo.theta = [0] + list(var('th1:10')) + [0]
-    robo.r = [0, 0, 0, 0, var('RL4'), 0, 0, 0, 0, 0, 0]
+    robo.theta = [0] + list(tools.syms('th1:10')) + [0]
+    robo.r = [0, 0, 0, 0, tools.syms('RL4'), 0, 0, 0, 0, 0, 0]
     robo.b = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
     robo.gamma = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, pi/2]
     robo.structure = tools.CLOSED_LOOP
@@ -123,9 +125,9 @@ def rx90():
     # table of geometric parameters RX90
     robo.sigma = [2, 0, 0, 0, 0, 0, 0]
     robo.alpha = [0, 0, pi/2, 0, -pi/2, pi/2, -pi/2]
-    robo.d = [0, 0, 0, var('D3'), 0, 0, 0]
-    robo.theta = [0] + list(var('th1:7'))
-    robo.r = [0, 0, 0, 0, var('RL4'), 0, 0]
+    robo.d = [0, 0, 0, tools.syms('D3'), 0, 0, 0]
+    robo.theta = [0] + list(tools.syms('th1:7'))
+    robo.r = [0, 0, 0, 0, tools.syms('RL4'), 0, 0]
     robo.b = [0, 0, 0, 0, 0, 0, 0]
     robo.gamma = [0, 0, 0, 0, 0, 0, 0]
     robo.mu = [0, 1, 1, 1, 1, 1, 1]
@@ -135,26 +137,28 @@ def rx90():
     robo.v0 = zeros(3, 1)
     robo.vdot0 = zeros(3, 1)
     num = range(0, 7)
-    robo.qdot = [var('QP{0}'.format(i)) for i in num]
-    robo.qddot = [var('QDP{0}'.format(i)) for i in num]
+    robo.qdot = [tools.syms('QP{0}'.format(i)) for i in num]
+    robo.qddot = [tools.syms('QDP{0}'.format(i)) for i in num]
     robo.Nex= [zeros(3, 1) for i in num]
-    robo.Nex[-1] = Matrix(var('CX{0}, CY{0}, CZ{0}'.format(robo.NJ)))
+    robo.Nex[-1] = Matrix(tools.syms('CX{0}, CY{0}, CZ{0}'.format(robo.NJ)))
     robo.Fex = [zeros(3, 1) for i in num]
-    robo.Fex[-1] = Matrix(var('FX{0}, FY{0}, FZ{0}'.format(robo.NJ)))
-    robo.FS = [var('FS{0}'.format(i)) for i in num]
-    robo.IA = [var('IA{0}'.format(i)) for i in num]
-    robo.FV = [var('FV{0}'.format(i)) for i in num]
-    robo.MS = [Matrix(var('MX{0}, MY{0}, MZ{0}'.format(i))) for i in num]
-    robo.M = [var('M{0}'.format(i)) for i in num]
-    robo.GAM = [var('GAM{0}'.format(i)) for i in num]
+    robo.Fex[-1] = Matrix(tools.syms('FX{0}, FY{0}, FZ{0}'.format(robo.NJ)))
+    robo.FS = [tools.syms('FS{0}'.format(i)) for i in num]
+    robo.IA = [tools.syms('IA{0}'.format(i)) for i in num]
+    robo.FV = [tools.syms('FV{0}'.format(i)) for i in num]
+    robo.MS = [
+        Matrix(tools.syms('MX{0}, MY{0}, MZ{0}'.format(i))) for i in num
+    ]
+    robo.M = [tools.syms('M{0}'.format(i)) for i in num]
+    robo.GAM = [tools.syms('GAM{0}'.format(i)) for i in num]
     inertia_matrix_terms = ("XX{0}, XY{0}, XZ{0}, ") + \
         ("XY{0}, YY{0}, YZ{0}, ") + \
         ("XZ{0}, YZ{0}, ZZ{0}")
     robo.J = [
-        Matrix(3, 3, var(inertia_matrix_terms.format(i))) \
+        Matrix(3, 3, tools.syms(inertia_matrix_terms.format(i))) \
         for i in num
     ]
-    robo.G = Matrix([0, 0, var('G3')])
+    robo.G = Matrix([0, 0, tools.syms('G3')])
     return robo
 
 
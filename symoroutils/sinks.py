@@ -0,0 +1,415 @@
+# -*- coding: utf-8 -*-
+
+
+# This file is part of the OpenSYMORO project. Please see
+# https://github.com/symoro/symoro/blob/master/LICENCE for the licence.
+
+
+"""
+This module contains the output sinks of the SymbolManager. A sink is
+a file-like object (`name`, `write`, `flush`, `close`) that also
+accepts whole equations through `write_equation`. The equations and
+lines are kept in a buffer and are converted to text or to binary
+records only when the buffer is flushed, so that model generation does
+not wait for the printing of every expression and for the disk.
+
+Three formats are available:
+    text: the usual SYMORO output file.
+    jsonl: one JSON object per line, {"lhs": ..., "rhs": ...} for an
+        equation and {"text": ...} for the other lines.
+    binary: the equation DAG, every unique subexpression is stored
+        once as a node referring to its arguments (see `read_binary`).
+"""
+
+
+import json
+from collections import OrderedDict
+
+import sympy
+from sympy import Basic, Function
+
+
+DEFAULT_FORMAT = 'text'
+# number of buffered items before the buffer is written
+DEFAULT_BUFFER = 4096
+# size of the buffer of the underlying file object
+FILE_BUFFER = 1 << 20
+BINARY_MAGIC = 'SYMOROEQB1\n'
+
+
+# record tags of the binary format
+(_STRING, _SYMBOL, _INTEGER, _RATIONAL, _FLOAT, _CONST, _RAW, _TUPLE,
+ _FUNC, _EQUATION, _TEXT) = range(11)
+
+
+def _put_uint(out, value):
+    """
+    Append an unsigned integer to a bytearray in LEB128.
+    """
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _zigzag(value):
+    return (value << 1) if value >= 0 else ((-value << 1) - 1)
+
+
+def _unzigzag(value):
+    return (value >> 1) if not value & 1 else -((value + 1) >> 1)
+
+
+class Sink(object):
+    """
+    Base class of the buffered sinks. The subclasses implement
+    `_render` that writes a list of items into the file.
+    """
+    mode = 'w'
+    suffix = ''
+
+    def __init__(self, path, buffer_size=DEFAULT_BUFFER):
+        """
+        Constructor period.
+
+        Args:
+            path: The path of the output file without the suffix of
+                the format.
+            buffer_size: The number of equations and lines kept before
+                they are written.
+        """
+        self.name = path + self.suffix
+        self.buffer_size = buffer_size
+        self.items = []
+        self.texts = None
+        """Dictionary expression -> text, memo of the conversion of
+        the expressions shared between sinks. None to disable it."""
+        self._file = open(self.name, self.mode, FILE_BUFFER)
+
+    @property
+    def closed(self):
+        """
+        Get whether the sink is closed.
+        """
+        return self._file.closed
+
+    def write(self, text):
+        """
+        Write a string.
+        """
+        self._append((None, text))
+
+    def write_equation(self, lhs, rhs):
+        """
+        Write the equation lhs = rhs. The expressions are converted
+        when the buffer is flushed.
+        """
+        self._append((lhs, rhs))
+
+    def _append(self, item):
+        self.items.append(item)
+        if len(self.items) >= self.buffer_size:
+            self._write_items()
+
+    def _write_items(self):
+        if self.items:
+            self._render(self.items)
+            self.items = []
+
+    def _render(self, items):
+        raise NotImplementedError
+
+    def _text(self, expr):
+        """
+        Return str(expr) using the memo `texts` if it is enabled.
+        """
+        if self.texts is None:
+            return str(expr)
+        text = self.texts.get(expr)
+        if text is None:
+            text = str(expr)
+            self.texts[expr] = text
+        return text
+
+    def flush(self):
+        """
+        Write the buffer and flush the underlying file.
+        """
+        self._write_items()
+        self._file.flush()
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def close(self):
+        """
+        Write the buffer and close the file.
+        """
+        if not self._file.closed:
+            self._write_items()
+            self._file.close()
+
+
+class TextSink(Sink):
+    """
+    Buffered writer of the usual text output.
+    """
+    def _render(self, items):
+        self._file.write(''.join(
+            text if lhs is None else '%s = %s;\n' % (lhs, self._text(text))
+            for lhs, text in items
+        ))
+
+
+class JsonLinesSink(Sink):
+    """
+    Buffered writer of JSON lines.
+    """
+    suffix = '.jsonl'
+
+    def _render(self, items):
+        lines = []
+        for lhs, rhs in items:
+            if lhs is None:
+                record = {'text': rhs}
+            else:
+                record = OrderedDict([
+                    ('lhs', str(lhs)), ('rhs', self._text(rhs))
+                ])
+            lines.append(json.dumps(record) + '\n')
+        self._file.write(''.join(lines))
+
+
+class BinarySink(Sink):
+    """
+    Buffered writer of the equation DAG. Every unique subexpression is
+    stored once as a node referring to its arguments. The file starts
+    with `BINARY_MAGIC` and is followed by records made of a tag byte
+    and unsigned LEB128 integers:
+        STRING length bytes: adds a string to the string table.
+        SYMBOL, FLOAT, CONST, RAW string: a symbol name, a float
+            string, a sympy constant name (e.g. 'Pi') or any value
+            that is not a sympy expression (e.g. the numpy lines of
+            the floating base models) as a string.
+        INTEGER zigzag, RATIONAL zigzag(p) q: a number.
+        TUPLE n args, FUNC string n args: a tuple or an expression
+            given by its class name and its arguments.
+        EQUATION lhs rhs: an equation.
+        TEXT string: a text line.
+    The nodes are numbered in the order of the file and a node is
+    referred to by the difference between the current number of nodes
+    and its number, which is small for the recent subexpressions.
+    """
+    mode = 'wb'
+    suffix = '.eqb'
+
+    def __init__(self, path, buffer_size=DEFAULT_BUFFER):
+        super(BinarySink, self).__init__(path, buffer_size)
+        self.nodes = {}
+        self.num_nodes = 0
+        self.strings = {}
+        self._file.write(BINARY_MAGIC)
+
+    def _string(self, text, out):
+        """
+        Return the id of a string and add it to the table if needed.
+        """
+        if text not in self.strings:
+            data = text.encode('utf-8')
+            out.append(_STRING)
+            _put_uint(out, len(data))
+            out.extend(data)
+            self.strings[text] = len(self.strings)
+        return self.strings[text]
+
+    def _ref(self, node_id, out):
+        _put_uint(out, self.num_nodes - node_id)
+
+    def _node(self, expr, out):
+        """
+        Return the id of the node of an expression and add the
+        records of the new nodes.
+        """
+        if not isinstance(expr, (Basic, tuple)):
+            # strings such as 'numpy.zeros((6, 6))' are not sympified
+            name = self._string(str(expr), out)
+            out.append(_RAW)
+            _put_uint(out, name)
+            return self._new_id()
+        if expr in self.nodes:
+            return self.nodes[expr]
+        if isinstance(expr, tuple):
+            args = [self._node(arg, out) for arg in expr]
+            out.append(_TUPLE)
+            _put_uint(out, len(args))
+            for arg in args:
+                self._ref(arg, out)
+        elif expr.is_Symbol:
+            name = self._string(expr.name, out)
+            out.append(_SYMBOL)
+            _put_uint(out, name)
+        elif expr.is_Integer:
+            out.append(_INTEGER)
+            _put_uint(out, _zigzag(int(expr)))
+        elif expr.is_Rational:
+            out.append(_RATIONAL)
+            _put_uint(out, _zigzag(int(expr.p)))
+            _put_uint(out, int(expr.q))
+        elif expr.is_Float:
+            name = self._string(str(expr), out)
+            out.append(_FLOAT)
+            _put_uint(out, name)
+        elif expr.is_Atom:
+            name = self._string(type(expr).__name__, out)
+            out.append(_CONST)
+            _put_uint(out, name)
+        else:
+            args = [self._node(arg, out) for arg in expr.args]
+            name = self._string(type(expr).__name__, out)
+            out.append(_FUNC)
+            _put_uint(out, name)
+            _put_uint(out, len(args))
+            for arg in args:
+                self._ref(arg, out)
+        self.nodes[expr] = self._new_id()
+        return self.nodes[expr]
+
+    def _new_id(self):
+        self.num_nodes += 1
+        return self.num_nodes - 1
+
+    def _render(self, items):
+        out = bytearray()
+        for lhs, rhs in items:
+            if lhs is None:
+                text = self._string(rhs, out)
+                out.append(_TEXT)
+                _put_uint(out, text)
+            else:
+                lhs_id = self._node(lhs, out)
+                rhs_id = self._node(rhs, out)
+                out.append(_EQUATION)
+                self._ref(lhs_id, out)
+                self._ref(rhs_id, out)
+        self._file.write(out)
+
+
+FORMATS = OrderedDict([
+    ('text', TextSink),
+    ('jsonl', JsonLinesSink),
+    ('binary', BinarySink)
+])
+
+
+def open_sink(path, sink_format=None, buffer_size=DEFAULT_BUFFER):
+    """
+    Open an output sink.
+
+    Args:
+        path: The path of the output file. The suffix of the format
+            is added (none for text).
+        sink_format: A key of `FORMATS`. By default it is
+            `DEFAULT_FORMAT`.
+        buffer_size: See `Sink`.
+
+    Returns:
+        An instance of the Sink subclass of the format.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if sink_format is None:
+        sink_format = DEFAULT_FORMAT
+    if sink_format not in FORMATS:
+        raise ValueError("Unknown output format: %s" % sink_format)
+    return FORMATS[sink_format](path, buffer_size)
+
+
+def read_jsonl(path):
+    """
+    Read a file written by JsonLinesSink.
+
+    Yields:
+        The records as dictionaries.
+    """
+    with open(path, 'r') as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def _read_uint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _build_func(name, args):
+    func = getattr(sympy, name, None)
+    if func is None:
+        func = Function(name)
+    return func(*args)
+
+
+def read_binary(path):
+    """
+    Read a file written by BinarySink.
+
+    Yields:
+        Tuples ('equation', lhs, rhs) with the rebuilt expressions and
+        ('text', text) for the other lines.
+
+    Raises:
+        ValueError: If the file is not a binary equation file.
+    """
+    with open(path, 'rb') as f:
+        data = bytearray(f.read())
+    if data[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+        raise ValueError("Not a binary equation file: %s" % path)
+    strings = []
+    nodes = []
+    pos = len(BINARY_MAGIC)
+    while pos < len(data):
+        tag = data[pos]
+        value, pos = _read_uint(data, pos + 1)
+        if tag == _STRING:
+            strings.append(str(data[pos:pos + value]).decode('utf-8'))
+            pos += value
+        elif tag == _SYMBOL:
+            nodes.append(sympy.Symbol(strings[value]))
+        elif tag == _INTEGER:
+            nodes.append(sympy.Integer(_unzigzag(value)))
+        elif tag == _RATIONAL:
+            q, pos = _read_uint(data, pos)
+            nodes.append(sympy.Rational(_unzigzag(value), q))
+        elif tag == _FLOAT:
+            nodes.append(sympy.Float(strings[value]))
+        elif tag == _CONST:
+            nodes.append(getattr(sympy.S, strings[value]))
+        elif tag == _RAW:
+            nodes.append(strings[value])
+        elif tag in (_TUPLE, _FUNC):
+            if tag == _FUNC:
+                name = strings[value]
+                value, pos = _read_uint(data, pos)
+            args = []
+            for _ in xrange(value):
+                ref, pos = _read_uint(data, pos)
+                args.append(nodes[len(nodes) - ref])
+            if tag == _TUPLE:
+                nodes.append(tuple(args))
+            else:
+                nodes.append(_build_func(name, args))
+        elif tag == _EQUATION:
+            rhs_ref, pos = _read_uint(data, pos)
+            yield ('equation', nodes[len(nodes) - value],
+                   nodes[len(nodes) - rhs_ref])
+        elif tag == _TEXT:
+            yield 'text', strings[value]
+        else:
+            raise ValueError("Unknown record %d in %s" % (tag, path))
@@ -12,31 +12,200 @@ import os
 
 from sympy import sin, cos
 from sympy import Symbol, Matrix, Expr
-from sympy import Mul, Add, factor, var, sympify
+from sympy import Mul, Add, factor, sympify, cse
 
 from symoroutils import filemgr
+from symoroutils import sinks
 from symoroutils import tools
 from genfunc import gen_fheader_matlab, gen_fbody_matlab
+from genfunc import gen_fheader_c, gen_fbody_c, compile_c_func
+
+
+def _rebuild(expr):
+    """Rebuilds the expression tree so that the nested operations
+    left unevaluated are flattened.
+    """
+    if expr.is_Atom or not expr.args:
+        return expr
+    return expr.func(*[_rebuild(arg) for arg in expr.args])
+
+
+class SignedRevDict(object):
+    """Reverse dictionary of the symbol manager (expression -> symbol).
+    An expression and its negation share one entry so that both are
+    found with one lookup.
+    """
+    def __init__(self, items=()):
+        self.table = {}
+        """Dictionary. Normalised expression -> {sign: symbol}"""
+        self.size = 0
+        for expr, sym in items:
+            self[expr] = sym
+
+    @staticmethod
+    def is_negative(expr):
+        """Tells if the expression is the negative element of the set
+        {expr, -expr}. Exactly one of them is negative (except 0).
+        The rule only uses the numeric coefficients and the hashes of
+        the terms so -expr is not computed.
+        """
+        if expr.is_Number:
+            return expr.is_negative
+        if expr.is_Mul:
+            return expr.as_coeff_Mul()[0].is_negative
+        if not expr.is_Add:
+            return False
+        # more negative terms or, for a tie, the term with the lowest
+        # hash is negative (the terms of an Add have distinct
+        # non-numeric parts)
+        terms = [term.as_coeff_Mul() for term in expr.args]
+        balance = sum(1 if coef.is_negative else -1 for coef, _ in terms)
+        if balance != 0:
+            return balance > 0
+        return min(terms, key=lambda term: hash(term[1]))[0].is_negative
+
+    @classmethod
+    def normalize(cls, expr):
+        """Returns (key, sign) such that expr = sign*key. The key is
+        the same for expr and -expr.
+        """
+        if isinstance(expr, Expr) and cls.is_negative(expr):
+            return -expr, -1
+        return expr, 1
+
+    def find(self, expr):
+        """Returns the symbol of the expression, or minus the symbol
+        of its negation, or None if none of them is stored.
+        """
+        key, sign = self.normalize(expr)
+        syms = self.table.get(key)
+        if not syms:
+            return None
+        if sign in syms:
+            return syms[sign]
+        return -syms[-sign]
+
+    def __setitem__(self, expr, sym):
+        key, sign = self.normalize(expr)
+        syms = self.table.get(key)
+        if syms is None:
+            syms = self.table[key] = {}
+        if sign not in syms:
+            self.size += 1
+        syms[sign] = sym
+
+    def __getitem__(self, expr):
+        key, sign = self.normalize(expr)
+        try:
+            return self.table[key][sign]
+        except KeyError:
+            raise KeyError(expr)
+
+    def __delitem__(self, expr):
+        key, sign = self.normalize(expr)
+        syms = self.table.get(key, {})
+        if sign not in syms:
+            raise KeyError(expr)
+        del syms[sign]
+        self.size -= 1
+        if not syms:
+            del self.table[key]
+
+    def __contains__(self, expr):
+        key, sign = self.normalize(expr)
+        return sign in self.table.get(key, ())
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for key, syms in self.table.iteritems():
+            for sign in syms:
+                yield key if sign == 1 else -key
+
+    def __eq__(self, other):
+        return dict(self.items()) == dict(other.items())
+
+    def __ne__(self, other):
+        return not self == other
+
+    def get(self, expr, default=None):
+        try:
+            return self[expr]
+        except KeyError:
+            return default
+
+    def items(self):
+        return [
+            (key if sign == 1 else -key, sym)
+            for key, syms in self.table.iteritems()
+            for sign, sym in syms.iteritems()
+        ]
+
 
 class SymbolManager(object):
     """Symbol manager, responsible for symbol replacing, file writing."""
-    def __init__(self, file_out='disp', sydi=dict()):
+    def __init__(self, file_out='disp', sydi=dict(),
+                 cache_size=tools.CACHE_SIZE):
         """Default values correspond to empty dictionary and screen output.
+        cache_size is the number of entries of each memo cache of the
+        simplification functions (0 to disable them).
         """
         self.file_out = file_out
         """Output descriptor. Can be None, 'disp', file
         defines the output destination"""
         self.sydi = dict((k, sydi[k]) for k in sydi)
         """Dictionary. All the substitutions are saved in it"""
-        self.revdi = dict((sydi[k], k) for k in sydi)
-        """Dictionary. Revers to the self.sydi"""
+        self.revdi = SignedRevDict((sydi[k], k) for k in sydi)
+        """SignedRevDict. Revers to the self.sydi"""
         self.order_list = sydi.keys()
         """keeps the order of variables to be compute"""
+        self.caches = {
+            'simp': tools.MemoCache(cache_size),
+            'C2S2_simp': tools.MemoCache(cache_size),
+            'CS12_simp': tools.MemoCache(cache_size),
+            'count_ops': tools.MemoCache(cache_size)
+        }
+        """Memo caches of the simplification functions"""
+        self.unfolded = {}
+        """Dictionary. The fully unfolded value of the symbols, filled
+        by unfold. It must be cleared with clear_caches if the values
+        of sydi are changed directly."""
+
+    def cache_stats(self):
+        """Returns a dictionary with the hits, misses and size of each
+        memo cache.
+        """
+        return dict(
+            (name, cache.stats()) for name, cache in self.caches.iteritems()
+        )
+
+    def clear_caches(self):
+        """Empties the memo caches."""
+        for cache in self.caches.itervalues():
+            cache.clear()
+        self.unfolded.clear()
+
+    def count_ops(self, sym):
+        """Returns sym.count_ops() using the memo cache."""
+        cache = self.caches['count_ops']
+        count = cache.get(sym)
+        if count is None:
+            count = sym.count_ops()
+            cache.put(sym, count)
+        return count
+
+    def sym_less(self, sym_a, sym_b):
+        """Same as tools.sym_less with the memo cache of count_ops."""
+        return self.count_ops(sym_a) < self.count_ops(sym_b)
 
     def simp(self, sym):
-        sym = factor(sym)
+        cache = self.caches['simp']
+        new_sym = cache.get(sym)
+        if new_sym is not None:
+            return new_sym
         new_sym = tools.ONE
-        for expr in Mul.make_args(sym):
+        for expr in Mul.make_args(factor(sym)):
             if expr.is_Pow:
                 expr, pow_val = expr.args
             else:
@@ -44,6 +213,7 @@ class SymbolManager(object):
             expr = self.C2S2_simp(expr)
             expr = self.CS12_simp(expr, silent=True)
             new_sym *= expr**pow_val
+        cache.put(sym, new_sym)
         return new_sym
 
     def C2S2_simp(self, sym):
@@ -53,22 +223,28 @@ class SymbolManager(object):
         >> print C2S2_simp(sympify("-C**2*RL + S*(D - RL*S)"))
         D*S - RL
         """
+        cache = self.caches['C2S2_simp']
+        new_sym = cache.get(sym)
+        if new_sym is not None:
+            return new_sym
         if not sym.is_Add:
             repl_dict = {}
             for term in sym.atoms(Add):
                 repl_dict[term] = self.C2S2_simp(term)
-            sym = sym.xreplace(repl_dict)
-            return sym
-        names, short_form = tools.trignometric_info(sym)
-        for name in names:
-            if short_form:
-                cos_term, sin_term = tools.cos_sin_syms(name)
-            else:
-                cos_term, sin_term = cos(name), sin(name)
-            sym = self.try_opt(
-                tools.ONE, None, sin_term**2, cos_term**2, sym
-            )
-        return sym
+            new_sym = sym.xreplace(repl_dict)
+        else:
+            new_sym = sym
+            names, short_form = tools.trignometric_info(sym)
+            for name in names:
+                if short_form:
+                    cos_term, sin_term = tools.cos_sin_syms(name)
+                else:
+                    cos_term, sin_term = cos(name), sin(name)
+                new_sym = self.try_opt(
+                    tools.ONE, None, sin_term**2, cos_term**2, new_sym
+                )
+        cache.put(sym, new_sym)
+        return new_sym
 
     def CS12_simp(self, sym, silent=False):
         """
@@ -81,6 +257,16 @@ class SymbolManager(object):
         S23 = C2*S3 + S2*C3
         R*S23
         """
+        # the equations written by a call that is not silent are
+        # already in the dictionary when the result is reused
+        cache = self.caches['CS12_simp']
+        new_sym = cache.get((sym, silent))
+        if new_sym is None:
+            new_sym = self._CS12_simp(sym, silent)
+            cache.put((sym, silent), new_sym)
+        return new_sym
+
+    def _CS12_simp(self, sym, silent):
         if not sym.is_Add:
             repl_dict = {}
             for term in sym.atoms(Add):
@@ -125,9 +311,9 @@ class SymbolManager(object):
             Res_tmp = Res
             for coef in Bcfs:
                 Res_tmp += A*coef - B*coef - C*coef
-                if tools.sym_less(Res_tmp, Res):
+                if self.sym_less(Res_tmp, Res):
                     Res = Res_tmp
-            if tools.sym_less(Res, old_sym) and Am is None:
+            if self.sym_less(Res, old_sym) and Am is None:
                 if not A.is_number and not silent:
                     self.add_to_dict(A, B + C)
                 return Res
@@ -136,13 +322,13 @@ class SymbolManager(object):
                 Res_tmp = Res2
                 for coef in Bcfs:
                     Res_tmp += Am*coef - B*coef + C*coef
-                    if tools.sym_less(Res_tmp, Res2):
+                    if self.sym_less(Res_tmp, Res2):
                         Res2 = Res_tmp
-                if tools.sym_less(Res2, Res) and tools.sym_less(Res2, old_sym):
+                if self.sym_less(Res2, Res) and self.sym_less(Res2, old_sym):
                     if not Am.is_number and not silent:
                         self.add_to_dict(Am, B - C)
                     return Res2
-                elif tools.sym_less(Res, old_sym):
+                elif self.sym_less(Res, old_sym):
                     if not A.is_number and not silent:
                         self.add_to_dict(A, B + C)
                     return Res
@@ -180,19 +366,42 @@ class SymbolManager(object):
         The cos(x) and sin(x) will be replaced by CX and SX,
         where X is the name and x is the angle
         """
-        if not isinstance(angle, Expr) or angle.is_number:
-            return M
-        cos_sym, sin_sym = tools.cos_sin_syms(name)
-        sym_list = [(cos_sym, cos(angle)), (sin_sym, sin(angle))]
+        return self.trig_replace_all(M, [(angle, name)])
+
+    def trig_replace_all(self, M, angles):
+        """Replaces the trigonometric expressions of several angles
+        in one traversal of each element.
+
+        Parameters
+        ==========
+        M: var or Matrix
+            Object of substitution
+        angles: list
+            (angle, name) couples, see trig_replace
+
+        Notes
+        =====
+        The replaced expressions are exact atoms of the expression
+        tree so xreplace gives the same result as subs.
+        """
         subs_dict = {}
-        for sym, sym_old in sym_list:
-            if -1 in Mul.make_args(sym_old):
-                sym_old = -sym_old
-            subs_dict[sym_old] = sym
-            self.add_to_dict(sym, sym_old)
+        for angle, name in angles:
+            if not isinstance(angle, Expr) or angle.is_number:
+                continue
+            cos_sym, sin_sym = tools.cos_sin_syms(name)
+            sym_list = [(cos_sym, cos(angle)), (sin_sym, sin(angle))]
+            for sym, sym_old in sym_list:
+                if -1 in Mul.make_args(sym_old):
+                    sym_old = -sym_old
+                subs_dict[sym_old] = sym
+                self.add_to_dict(sym, sym_old)
+        if not subs_dict:
+            return M
+        if not isinstance(M, Matrix):
+            return sympify(M).xreplace(subs_dict)
         for i1 in xrange(M.shape[0]):
             for i2 in xrange(M.shape[1]):
-                M[i1, i2] = M[i1, i2].subs(subs_dict)
+                M[i1, i2] = M[i1, i2].xreplace(subs_dict)
         return M
 
     #TODO remove index
@@ -220,13 +429,12 @@ class SymbolManager(object):
         if not forced:
             if not isinstance(old_sym, Expr):
                 return old_sym
-            inv_sym = -old_sym
-            if old_sym.is_Atom or inv_sym.is_Atom:
+            if SignedRevDict.normalize(old_sym)[0].is_Atom:
                 return old_sym
-            for i in (1, -1):
-                if i * old_sym in self.revdi:
-                    return i * self.revdi[i * old_sym]
-        new_sym = var(str(name) + str(index))
+            known_sym = self.revdi.find(old_sym)
+            if known_sym is not None:
+                return known_sym
+        new_sym = tools.syms(str(name) + str(index))
         self.add_to_dict(new_sym, old_sym)
         return new_sym
 
@@ -287,30 +495,307 @@ class SymbolManager(object):
                 M[i1, i2] = self.replace(M[i1, i2], name_index, index, forced)
         return M
 
-    def unfold(self, expr):
+    def unfold(self, expr, depth=None):
         """Unfold the expression using the dictionary.
 
         Parameters
         ==========
         expr: symbolic expression
             Symbolic expression to be unfolded
+        depth: int, optional
+            Number of substitution levels. By default the expression
+            is unfolded until it contains no symbol of the dictionary.
 
         Returns
         =======
         expr: symbolic expression
             Unfolded expression
+
+        Notes
+        =====
+        The unfolded value of every symbol met is kept in
+        self.unfolded so that the symbols shared by several
+        expressions are unfolded only once.
         """
-        while set(self.sydi.keys()) & expr.atoms():
-            expr = expr.subs(self.sydi)
-        return expr
+        if depth is not None:
+            for level in xrange(depth):
+                repl_dict = dict(
+                    (sym, self.sydi[sym]) for sym in expr.free_symbols
+                    if isinstance(self.sydi.get(sym), Expr)
+                )
+                if not repl_dict:
+                    break
+                expr = expr.xreplace(repl_dict)
+            return expr
+        syms = [sym for sym in expr.free_symbols if sym in self.sydi]
+        for sym in syms:
+            self._unfold_sym(sym)
+        return expr.xreplace(dict((sym, self.unfolded[sym]) for sym in syms))
+
+    def _unfold_sym(self, sym):
+        """Computes the unfolded value of a symbol of the dictionary
+        and of the symbols it depends on, in the order of computation.
+        """
+        stack = [sym]
+        visiting = set()
+        while stack:
+            top = stack[-1]
+            if top in self.unfolded:
+                stack.pop()
+                continue
+            val = self.sydi[top]
+            if not isinstance(val, Expr):
+                self.unfolded[top] = top
+                stack.pop()
+                continue
+            deps = [
+                atom for atom in val.free_symbols
+                if atom in self.sydi and atom not in self.unfolded
+            ]
+            if deps and top not in visiting:
+                visiting.add(top)
+                stack.extend(deps)
+                continue
+            if deps:
+                raise ValueError("Cyclic definition of %s" % top)
+            self.unfolded[top] = val.xreplace(dict(
+                (atom, self.unfolded[atom]) for atom in val.free_symbols
+                if atom in self.unfolded
+            ))
+            stack.pop()
 
-    def mat_unfold(self, mat):
+    def mat_unfold(self, mat, depth=None):
         for i in xrange(mat.shape[0]):
             for j in xrange(mat.shape[1]):
                 if isinstance(mat[i, j], Expr):
-                    mat[i, j] = self.unfold(mat[i, j])
+                    mat[i, j] = self.unfold(mat[i, j], depth)
         return mat
 
+    def op_count(self):
+        """Returns the total number of multiplications and additions
+        of the equations in the dictionary.
+        """
+        muls, adds = 0, 0
+        for sym in self.order_list:
+            if isinstance(self.sydi[sym], Expr):
+                sym_muls, sym_adds = tools.count_mul_add(self.sydi[sym])
+                muls += sym_muls
+                adds += sym_adds
+        return muls, adds
+
+    def cse(self, name='CSE', silent=False, write=True):
+        """Common subexpression elimination over all the equations
+        of the dictionary. Subexpressions shared by several equations
+        are replaced by new symbols that are inserted in order_list
+        just before their first use.
+
+        Parameters
+        ==========
+        name: string, optional
+            denotion of the new symbols, an index is attached to it
+        silent: bool, optional
+            If False, the operation count before and after the
+            elimination is written to the output
+        write: bool, optional
+            If True, all the equations after the elimination are
+            written to the output (after the ones already written),
+            so that the output ends with the model that gen_func
+            emits. If False, the caller has to write them, e.g. with
+            write_equations.
+
+        Returns
+        =======
+        counts: tuple
+            ((muls, adds) before, (muls, adds) after)
+
+        Notes
+        =====
+        Must be called after the model is generated and before
+        file_close or gen_func. The equations written to the output
+        before the call are not changed. Negations are never
+        replaced as they do not save any operation.
+        """
+        before = self.op_count()
+        syms = [s for s in self.order_list if isinstance(self.sydi[s], Expr)]
+        taken = set(str(s) for s in self.sydi)
+        new_syms = (tools.syms('%s%d' % (name, i))
+                    for i in itertools.count(1)
+                    if '%s%d' % (name, i) not in taken)
+        replacements, reduced = cse([self.sydi[s] for s in syms],
+                                    symbols=new_syms)
+        # put back the trivial replacements such as -x
+        trivial = {}
+        new_eqs = []
+        for new_sym, expr in replacements:
+            expr = _rebuild(expr.xreplace(trivial))
+            if tools.count_mul_add(expr) == (0, 0):
+                trivial[new_sym] = expr
+            else:
+                new_eqs.append((new_sym, expr))
+        reduced = [_rebuild(red.xreplace(trivial)) for red in reduced]
+        # find the first equation that uses each new symbol
+        users = dict((new_sym, len(syms)) for new_sym, _ in new_eqs)
+        for i, expr in enumerate(reduced):
+            for atom in expr.atoms(Symbol):
+                if atom in users:
+                    users[atom] = min(users[atom], i)
+        for new_sym, expr in reversed(new_eqs):
+            for atom in expr.atoms(Symbol):
+                if atom in users:
+                    users[atom] = min(users[atom], users[new_sym])
+        inserts = {}
+        for new_sym, expr in new_eqs:
+            inserts.setdefault(syms[users[new_sym]], []).append(new_sym)
+            self.sydi[new_sym] = expr
+        for sym, expr in zip(syms, reduced):
+            self.sydi[sym] = expr
+        order_list = []
+        for sym in self.order_list:
+            order_list.extend(inserts.get(sym, []))
+            order_list.append(sym)
+        self.order_list = order_list
+        self.revdi = SignedRevDict((self.sydi[k], k) for k in self.sydi)
+        # the memoized results may refer to rewritten equations
+        self.clear_caches()
+        after = self.op_count()
+        if not silent:
+            self.write_line('Common subexpression elimination: ' +
+                            '%s new symbols' % len(new_eqs))
+            self.write_line('Before: %s multiplications, %s additions' %
+                            before)
+            self.write_line('After: %s multiplications, %s additions' %
+                            after)
+            self.write_line()
+        if write:
+            self.write_line('Equations after common subexpression ' +
+                            'elimination')
+            self.write_line()
+            self.write_equations()
+            self.write_line()
+        return before, after
+
+    def dependency_graph(self):
+        """Returns the dependency graph of the equations.
+
+        Returns
+        =======
+        graph: dict
+            For every symbol of the dictionary the set of symbols
+            its value depends on. Symbols that are not keys of the
+            graph are inputs of the model.
+        """
+        graph = {}
+        for sym in self.order_list:
+            val = self.sydi[sym]
+            vals = val if isinstance(val, tuple) else (val,)
+            graph[sym] = set()
+            for item in vals:
+                if isinstance(item, Expr):
+                    graph[sym] |= item.atoms(Symbol)
+        return graph
+
+    def prune(self, to_return, args=(), strict=True):
+        """Removes from the dictionary all the equations that are not
+        needed to compute the symbols in to_return.
+
+        Parameters
+        ==========
+        to_return: list, Matrix or tuple of them
+            Symbols that have to be computed
+        args: list, Matrix or tuple of them, optional
+            Symbols that are considered to be known. The equations
+            that define them are not needed.
+        strict: bool, optional
+            If True (default), ValueError is raised when the result
+            depends on symbols that are neither defined nor given in
+            args
+
+        Returns
+        =======
+        removed: list
+            Symbols whose equations have been removed, in the order
+            of computation
+        """
+        graph = self.dependency_graph()
+        known = self.extract_syms(args)
+        needed = set()
+        undefined = set()
+        stack = list(self.extract_syms(to_return))
+        while stack:
+            sym = stack.pop()
+            if sym in needed or sym in known:
+                continue
+            if sym not in graph:
+                undefined.add(sym)
+                continue
+            needed.add(sym)
+            stack.extend(graph[sym])
+        if strict and undefined:
+            raise ValueError(
+                "Undefined symbols: %s" % ', '.join(
+                    sorted(str(x) for x in undefined)
+                )
+            )
+        removed = [s for s in self.order_list if s not in needed]
+        for sym in removed:
+            val = self.sydi.pop(sym)
+            if self.revdi.get(val) == sym:
+                del self.revdi[val]
+        self.order_list = [s for s in self.order_list if s in needed]
+        # the removed symbols are free in the expansions now and the
+        # memoized simplifications may return them
+        self.clear_caches()
+        return removed
+
+    def compute_pruned(self, compute, to_return, args=(), strict=True):
+        """Computes a model without writing its equations, removes the
+        ones that are not needed for to_return (see prune) and writes
+        the remaining ones into the output.
+
+        Parameters
+        ==========
+        compute: callable
+            Called with this SymbolManager, generates the model
+        to_return: list, Matrix or tuple of them
+            Symbols that have to be computed
+        args: list, Matrix or tuple of them, optional
+            Symbols that are considered to be known
+        strict: bool, optional
+            If True (default), ValueError is raised when the result
+            depends on symbols that are neither defined nor given in
+            args
+
+        Returns
+        =======
+        removed: list
+            Symbols whose equations have been removed
+        """
+        file_out = self.file_out
+        self.file_out = None
+        try:
+            compute(self)
+        finally:
+            self.file_out = file_out
+        removed = self.prune(to_return, args, strict)
+        self.write_equations()
+        return removed
+
+    def write_equations(self, syms=None):
+        """Writes the equations of the dictionary into the output
+        in the order of computation.
+
+        Parameters
+        ==========
+        syms: list, optional
+            Symbols whose equations are written. All the equations
+            are written if not specified.
+        """
+        if syms is not None:
+            syms = set(syms)
+        for sym in self.order_list:
+            if syms is None or sym in syms:
+                self.write_equation(sym, self.sydi[sym])
+
     def write_param(self, name, header, robo, N):
         """Low-level function for writing the parameters table
 
@@ -401,8 +886,16 @@ class SymbolManager(object):
             left-hand side of the equation.
         B: expression or var
             right-hand side of the equation
+
+        Notes
+        =====
+        With a sink (see sinks module) the equation is converted
+        to text only when the sink is flushed
         """
-        self.write_line(str(A) + ' = ' + str(B) + ';')
+        if hasattr(self.file_out, 'write_equation'):
+            self.file_out.write_equation(A, B)
+        else:
+            self.write_line(str(A) + ' = ' + str(B) + ';')
 
     def write_line(self, line=''):
         """Writes string data into tha output with new line symbol
@@ -417,15 +910,18 @@ class SymbolManager(object):
         elif self.file_out is not None:
             self.file_out.write(str(line) + '\n')
 
-    def flushout(self):
+    def flushout(self, sync=False):
         """
-        Flush the buffer and make sure the data is written to the disk
+        Flush the buffer. With sync, make sure the data is written
+        to the disk
         """
+        if self.file_out is None or self.file_out == 'disp':
+            return
         self.file_out.flush()
-        if self.file_out != 'disp':
+        if sync:
             os.fsync(self.file_out.fileno())
 
-    def file_open(self, robo, ext):
+    def file_open(self, robo, ext, sink_format=None):
         """
         Initialize file stream
 
@@ -435,9 +931,12 @@ class SymbolManager(object):
             provides the robot's name
         ext: string
             provides the file name extention
+        sink_format: string, optional
+            output format, a key of sinks.FORMATS. The default is
+            sinks.DEFAULT_FORMAT
         """
         fname = filemgr.get_file_path(robo, ext)
-        self.file_out = open(fname, 'w')
+        self.file_out = sinks.open_sink(fname, sink_format)
 
     def file_close(self):
         """
@@ -466,6 +965,77 @@ class SymbolManager(object):
             fun_head.append('    %s=args[%s]\n' % (v_str_list, i))
         return fun_head
 
+    def gen_fheader_batch(self, name, args):
+        """Generates the function header for the batch mode. Every
+        leaf of args (list of symbols, Matrix or a single symbol) is
+        expected to be an array with the samples along the first axis.
+        The sample axis is moved to the end so that the array can be
+        unpacked to the symbols in the same way as in the normal mode.
+        """
+        fun_head = []
+        fun_head.append('def %s(*args):\n' % name)
+        imp_s_1 = 'from numpy import pi, sin, cos, sign\n'
+        imp_s_2 = 'from numpy import array, arctan2 as atan2, sqrt\n'
+        imp_s_3 = 'from numpy import asarray, rollaxis, zeros\n'
+        fun_head.append('    %s' % imp_s_1)
+        fun_head.append('    %s' % imp_s_2)
+        fun_head.append('    %s' % imp_s_3)
+        leaves = self._batch_leaves(args, 'args[0]')
+        if not leaves:
+            raise ValueError("Batch mode requires at least one argument")
+        for i, (syms, path, ndim) in enumerate(leaves):
+            fun_head.append(
+                '    _b%s=rollaxis(asarray(%s, dtype=float), 0, %s)\n' % (
+                    i, path, ndim
+                )
+            )
+            v_str_list = self.convert_syms(syms, True)
+            fun_head.append('    %s=_b%s\n' % (v_str_list, i))
+        fun_head.append('    _zero=zeros(_b0.shape[-1])\n')
+        return fun_head
+
+    def _batch_leaves(self, syms, path):
+        """Returns the list of (syms, path, ndim) for every part of
+        syms that is passed as one array in the batch mode.
+        """
+        if isinstance(syms, Matrix):
+            return [(syms, path, 3)]
+        elif isinstance(syms, tuple) or isinstance(syms, list):
+            nested = [isinstance(item, (tuple, list, Matrix))
+                      for item in syms]
+            if not any(nested):
+                return [(syms, path, 2)]
+            leaves = []
+            for i, item in enumerate(syms):
+                leaves.extend(
+                    self._batch_leaves(item, '%s[%s]' % (path, i))
+                )
+            return leaves
+        else:
+            return [(syms, path, 1)]
+
+    def convert_syms_batch(self, syms, stack=True):
+        """Converts 'syms' structure to sintactically correct string
+        for the batch mode. Every scalar is broadcasted to the number
+        of samples, lists of scalars and Matrices are stacked into
+        arrays with the samples along the first axis.
+        """
+        if isinstance(syms, Matrix):
+            rows = [self.convert_syms_batch(list(syms[i, :]), False)
+                    for i in xrange(syms.shape[0])]
+            return 'rollaxis(array([%s]), -1)' % ','.join(rows)
+        elif isinstance(syms, tuple) or isinstance(syms, list):
+            nested = any(isinstance(item, (tuple, list, Matrix))
+                         for item in syms)
+            items = [self.convert_syms_batch(item, stack and nested)
+                     for item in syms]
+            res = '[%s]' % ','.join(items)
+            if stack and not nested:
+                res = 'rollaxis(array(%s), -1)' % res
+            return res
+        else:
+            return '(%s)+_zero' % syms
+
     def convert_syms(self, syms, rpl_liter=False):
         """Converts 'syms' structure to sintactically correct string
 
@@ -513,8 +1083,10 @@ class SymbolManager(object):
         else:
             return set()
 
-    def sift_syms(self, rq_syms, wr_syms):
-        """Returns ordered list of variables to be compute
+    def sift_syms(self, rq_syms, wr_syms, strict=True):
+        """Returns ordered list of variables to be compute.
+        If strict is True (default), ValueError is raised when some
+        required variables are not defined in the dictionary
         """
         order_list = []   # vars that are defined in sydi
         for s in reversed(self.order_list):
@@ -527,19 +1099,26 @@ class SymbolManager(object):
         rq_vals = [s for s in rq_syms if not (s in self.sydi or s in wr_syms)]
             # required vars that are not defined in sydi
             # will be set to '1.'
+        if strict and rq_vals:
+            raise ValueError(
+                "Undefined symbols: %s" % ', '.join(
+                    sorted(str(x) for x in rq_vals)
+                )
+            )
         return rq_vals + order_list
 
-    def gen_fbody(self, name, to_return, args):
+    def gen_fbody(self, name, to_return, args, batch=False, strict=True):
         """Generates list of string statements of the function that
         computes symbolf from to_return.  wr_syms are considered to
-        be known
+        be known. In the batch mode the results are stacked
+        along the first axis.
         """
          # set of defined symbols
         wr_syms = self.extract_syms(args)
         # final symbols to be compute
         syms = self.extract_syms(to_return)
         # defines order of computation
-        order_list = self.sift_syms(syms, wr_syms)
+        order_list = self.sift_syms(syms, wr_syms, strict)
         # list of instructions in final function
         fun_body = []
         # will be switched to true when branching detected
@@ -556,7 +1135,10 @@ class SymbolManager(object):
             else:
                 item = '%s%s=%s\n' % (space * folded, s, self.sydi[s])
             fun_body.append(item)
-        ret_expr = self.convert_syms(to_return)
+        if batch:
+            ret_expr = self.convert_syms_batch(to_return)
+        else:
+            ret_expr = self.convert_syms(to_return)
         if multival:
             fun_body.insert(0, '    %s_result=[]\n' % (name))
             item = '%s%s_result.append(%s)\n' % (space*folded, name, ret_expr)
@@ -566,7 +1148,8 @@ class SymbolManager(object):
         fun_body.append('    return %s_result\n' % (name))
         return fun_body
 
-    def gen_func_string(self, name, to_return, args, syntax='python'):
+    def gen_func_string(self, name, to_return, args, syntax='python',
+                        batch=False, strict=True):
         #TODO self, name, toret, *args, **kwargs
         """ Returns function string. The rest is the same as for
         gen_func
@@ -582,23 +1165,48 @@ class SymbolManager(object):
             Determins the shape of the input and symbols
             names to assigned
 
+        syntax: string
+            'python', 'matlab' or 'c'
+        batch: bool
+            if true, the python function is vectorized: every part of
+            args is an array of samples along the first axis and
+            the results are stacked in the same way
+        strict: bool
+            if true (default), ValueError is raised when the result
+            depends on symbols that are neither defined nor given in
+            args
+
         Notes
         =====
-        -All unassigned used symbols will be set to '1.0'.
+        -With strict=False all unassigned used symbols are set
+            to '1.0'.
         -This function must be called only after the model that
             computes symbols in to_return have been generated.
         """
         #if kwargs.get
-        if syntax == 'python':
+        if syntax == 'python' and batch:
+            fun_head = self.gen_fheader_batch(name, args)
+            fun_body = self.gen_fbody(name, to_return, args, True, strict)
+        elif batch:
+            raise ValueError("Batch mode is available only for python")
+        elif syntax == 'python':
             fun_head = self.gen_fheader(name, args)
-            fun_body = self.gen_fbody(name, to_return, args)
+            fun_body = self.gen_fbody(name, to_return, args,
+                                      strict=strict)
         elif syntax == 'matlab':
             fun_head = gen_fheader_matlab(self, name, args, to_return)
-            fun_body = gen_fbody_matlab(self, name, to_return, args)
+            fun_body = gen_fbody_matlab(self, name, to_return, args,
+                                        strict=strict)
+        elif syntax == 'c':
+            fun_head = gen_fheader_c(self, name, args, to_return)
+            fun_body = gen_fbody_c(self, name, to_return, args, strict)
+        else:
+            raise ValueError("Unknown syntax '%s'" % syntax)
         fun_string = "".join(fun_head + fun_body)
         return fun_string
 
-    def gen_func(self, name, to_return, args):
+    def gen_func(self, name, to_return, args, syntax='python',
+                 batch=False, strict=True):
         """ Returns function that computes what is in to_return
         using args as arguments
 
@@ -612,14 +1220,34 @@ class SymbolManager(object):
         *args: any number of lists, Matrices or tuples of them
             Determins the shape of the input and symbols
             names to assigned
+        syntax: string
+            'python' - the function is executed by the interpreter,
+            'c' - the function is compiled with the system C compiler
+            and loaded with ctypes. Calling signature and result
+            structure are the same in both cases.
+        batch: bool
+            if true, the function evaluates many samples at once.
+            Every list of symbols in args is given as an (N, n) array,
+            every Matrix as an (N, rows, cols) array and every single
+            symbol as an (N,) array. Results are stacked in the same
+            way, e.g. (N, 4, 4) for a transformation matrix.
+        strict: bool
+            if true (default), ValueError is raised when the result
+            depends on symbols that are neither defined nor given in
+            args
 
         Notes
         =====
-        -All unassigned used symbols will be set to '1.0'.
+        -With strict=False all unassigned used symbols are set
+            to '1.0'.
         -This function must be called only after the model that
             computes symbols in to_return have been generated.
         """
-        exec self.gen_func_string(name, to_return, args)
+        if syntax == 'c' and not batch:
+            return compile_c_func(self, name, to_return, args,
+                                  strict=strict)
+        exec self.gen_func_string(name, to_return, args, syntax,
+                                  batch, strict)
         return eval('%s' % name)
 
 
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+# This file is part of the OpenSYMORO project. Please see
+# https://github.com/symoro/symoro/blob/master/LICENCE for the licence.
+
+
+"""Unit test module for batch module."""
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from symoroutils import batch
+from symoroutils import parfile
+from symoroutils import samplerobots
+
+
+class TestBatch(unittest.TestCase):
+    """Unit test for the batch generation of models."""
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.par_files = []
+        for robo in (samplerobots.rx90(), samplerobots.sr400()):
+            robo.directory = self.path
+            robo.set_par_file_path(
+                os.path.join(self.path, robo.name + '.par')
+            )
+            parfile.writepar(robo)
+            self.par_files.append(robo.par_file_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_run_batch(self):
+        kinds = ['idm', 'inm']
+        finished = []
+        results = batch.run_batch(
+            self.par_files, kinds, processes=2, callback=finished.append
+        )
+        self.assertEqual(len(finished), 4)
+        self.assertEqual(
+            [(r.par_file, r.kind) for r in results],
+            [(f, k) for f in self.par_files for k in kinds]
+        )
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertGreater(result.wall_time, 0)
+            self.assertTrue(os.path.isfile(result.out_file))
+            self.assertEqual(os.path.dirname(result.out_file), self.path)
+        # same output as the sequential generation
+        with open(results[0].out_file) as f:
+            output = f.read()
+        result = batch.run_batch(self.par_files[:1], ['idm'], 1)[0]
+        with open(result.out_file) as f:
+            self.assertEqual(f.read(), output)
+
+    def test_errors(self):
+        results = batch.run_batch(
+            [os.path.join(self.path, 'missing.par')], ['idm'], 1
+        )
+        self.assertIsNone(results[0].out_file)
+        self.assertIn('IOError', results[0].error)
+        result = batch.run_job((self.par_files[0], 'xyz', False))
+        self.assertIn('Unknown model type', result.error)
+        summary = batch.format_summary(results + [result], 1.0)
+        self.assertIn('2 jobs, 2 failed', summary)
+
+
+def run_tests():
+    """Load and run the unittests"""
+    unit_suite = unittest.TestLoader().loadTestsFromTestCase(TestBatch)
+    unittest.TextTestRunner(verbosity=2).run(unit_suite)
+
+
+def main():
+    """Main function."""
+    run_tests()
+
+
+if __name__ == '__main__':
+    main()
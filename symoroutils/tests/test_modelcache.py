@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+# This file is part of the OpenSYMORO project. Please see
+# https://github.com/symoro/symoro/blob/master/LICENCE for the licence.
+
+
+"""Unit test module for modelcache module."""
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from sympy import var
+
+from pysymoro import nealgos
+from symoroutils import modelcache
+from symoroutils import samplerobots
+
+
+class TestModelCache(unittest.TestCase):
+    """Unit test for the on-disk model cache."""
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.cache = modelcache.ModelCache(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_key(self):
+        robo = samplerobots.rx90()
+        key = modelcache.model_key(robo, 'idm')
+        self.assertEqual(key, modelcache.model_key(robo, 'idm'))
+        self.assertNotEqual(key, modelcache.model_key(robo, 'ddm'))
+        self.assertNotEqual(
+            key, modelcache.model_key(robo, 'idm', {'option': True})
+        )
+        robo.d[3] = var('D4')
+        self.assertNotEqual(key, modelcache.model_key(robo, 'idm'))
+        key = modelcache.model_key(robo, 'idm')
+        # the key depends on the code that generates the models
+        fingerprint = modelcache.code_fingerprint()
+        modelcache._code_fingerprint[0] = 'changed'
+        try:
+            self.assertNotEqual(key, modelcache.model_key(robo, 'idm'))
+        finally:
+            modelcache._code_fingerprint[0] = fingerprint
+        self.assertEqual(key, modelcache.model_key(robo, 'idm'))
+
+    def test_ignored_options(self):
+        """Serial and parallel computations share the entries."""
+        robo = samplerobots.planar2r()
+        robo.compute_dynidenmodel(use_cache=self.cache)
+        robo.compute_dynidenmodel(2, use_cache=self.cache)
+        robo.compute_dynidenmodel(processes=None, use_cache=self.cache)
+        self.assertEqual(len(self.cache.entries()), 1)
+
+    def test_load_error(self):
+        """An entry that cannot be unpickled is a miss."""
+        self.cache.put('key', {'data': 'x'})
+        with open(self.cache.entry_path('key'), 'wb') as f:
+            # a global that does not exist
+            f.write('cos\nno_such_function\n.')
+        self.assertIsNone(self.cache.get('key'))
+        with open(self.cache.entry_path('key'), 'wb') as f:
+            f.write('cno_such_module\nfunc\n.')
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_put_error(self):
+        """A failed write leaves no file in the cache."""
+        with self.assertRaises(modelcache.pickle.PicklingError):
+            self.cache.put('key', {'data': lambda x: x})
+        self.assertEqual(os.listdir(self.path), [])
+        # the files of the interrupted writes are removed by clear
+        stray = os.path.join(self.path, 'stray' + modelcache.TMP_EXT)
+        open(stray, 'wb').close()
+        self.cache.put('key', {'data': 'x'})
+        self.assertEqual(len(self.cache.entries()), 1)
+        self.cache.clear()
+        self.assertEqual(os.listdir(self.path), [])
+
+    def test_compute_idym(self):
+        robo = samplerobots.rx90()
+        symo = robo.compute_idym(use_cache=self.cache)
+        with open(symo.file_out.name) as f:
+            output = f.read()
+        self.assertEqual(len(self.cache.entries()), 1)
+        # the cached model must not call the algorithm
+        algo = nealgos.fixed_inverse_dynmodel
+        nealgos.fixed_inverse_dynmodel = None
+        try:
+            cached_symo = robo.compute_idym(use_cache=self.cache)
+        finally:
+            nealgos.fixed_inverse_dynmodel = algo
+        self.assertEqual(cached_symo.sydi, symo.sydi)
+        self.assertEqual(cached_symo.order_list, symo.order_list)
+        self.assertEqual(cached_symo.revdi, symo.revdi)
+        self.assertEqual(cached_symo.file_out.name, symo.file_out.name)
+        with open(cached_symo.file_out.name) as f:
+            self.assertEqual(f.read(), output)
+
+    def test_eviction(self):
+        for i in xrange(4):
+            self.cache.put('key%d' % i, {'data': 'x' * 1000})
+            os.utime(self.cache.entry_path('key%d' % i), (i, i))
+        self.assertEqual(len(self.cache.entries()), 4)
+        # touching an entry makes it the most recently used one
+        self.assertEqual(self.cache.get('key0'), {'data': 'x' * 1000})
+        self.cache.max_size = self.cache.size() - 1
+        self.cache.evict()
+        self.assertIsNone(self.cache.get('key1'))
+        self.assertIsNotNone(self.cache.get('key0'))
+        self.assertEqual(len(self.cache.entries()), 3)
+        self.cache.clear()
+        self.assertEqual(self.cache.entries(), [])
+
+
+def run_tests():
+    """Load and run the unittests"""
+    unit_suite = unittest.TestLoader().loadTestsFromTestCase(
+        TestModelCache
+    )
+    unittest.TextTestRunner(verbosity=2).run(unit_suite)
+
+
+def main():
+    """Main function."""
+    run_tests()
+
+
+if __name__ == '__main__':
+    main()
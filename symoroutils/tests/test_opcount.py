@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+# This file is part of the OpenSYMORO project. Please see
+# https://github.com/symoro/symoro/blob/master/LICENCE for the licence.
+
+
+"""Unit test module for opcount module."""
+
+
+import json
+import unittest
+
+from sympy import sympify
+
+from pysymoro import nealgos
+from symoroutils import opcount
+from symoroutils import samplerobots
+from symoroutils import symbolmgr
+
+
+class TestOpCount(unittest.TestCase):
+    """Unit test for operation counting functions."""
+    def test_count_expr(self):
+        counts = opcount.count_expr(
+            sympify("a*b*sin(th1) - 2*c/d + sqrt(a**2 + b**2)")
+        )
+        self.assertEqual(counts['mul'], 6)
+        self.assertEqual(counts['add'], 3)
+        self.assertEqual(counts['sincos'], 1)
+        self.assertEqual(counts['sqrt'], 1)
+        self.assertEqual(counts['atan2'], 0)
+        counts = opcount.count_expr(sympify("atan2(S1, -C1)"))
+        self.assertEqual(counts['atan2'], 1)
+        self.assertEqual(counts['mul'], 0)
+
+    def test_group_name(self):
+        self.assertEqual(opcount.group_name(sympify('VP12')), 'VP')
+        self.assertEqual(opcount.group_name(sympify('GAM3')), 'GAM')
+        self.assertEqual(opcount.group_name('S1m2'), 'S')
+
+    def test_profile(self):
+        robo = samplerobots.rx90()
+        symo = symbolmgr.SymbolManager(None)
+        nealgos.fixed_inverse_dynmodel(robo, symo)
+        data = opcount.profile(symo)
+        total = data['total']
+        self.assertEqual(total['equations'], len(symo.order_list))
+        self.assertEqual((total['mul'], total['add']), symo.op_count())
+        self.assertEqual(total['sincos'], 2 * robo.nj)
+        self.assertEqual(data['groups']['GAM']['equations'], robo.nj)
+        for op in opcount.OPERATIONS + ('equations',):
+            self.assertEqual(
+                sum(group[op] for group in data['groups'].values()),
+                total[op]
+            )
+        self.assertEqual(json.loads(opcount.to_json(data)), data)
+
+    def test_idm_profiles(self):
+        data = opcount.idm_profiles(samplerobots.rx90())
+        self.assertEqual(data.keys(), ['fixed', 'composite', 'flexible'])
+        self.assertLess(data['fixed']['total']['mul'],
+                        data['composite']['total']['mul'])
+
+
+def run_tests():
+    """Load and run the unittests"""
+    unit_suite = unittest.TestLoader().loadTestsFromTestCase(
+        TestOpCount
+    )
+    unittest.TextTestRunner(verbosity=2).run(unit_suite)
+
+
+def main():
+    """Main function."""
+    run_tests()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+# This file is part of the OpenSYMORO project. Please see
+# https://github.com/symoro/symoro/blob/master/LICENCE for the licence.
+
+
+"""Unit test module for sinks module."""
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from sympy import preorder_traversal
+
+from pysymoro import nealgos
+from symoroutils import samplerobots
+from symoroutils import sinks
+from symoroutils import symbolmgr
+
+
+class TestSinks(unittest.TestCase):
+    """Unit test for the output sinks of the SymbolManager."""
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.robo = samplerobots.rx90()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _write_model(self, sink_format, buffer_size=sinks.DEFAULT_BUFFER,
+                     model=nealgos.fixed_inverse_dynmodel):
+        symo = symbolmgr.SymbolManager(None)
+        symo.file_out = sinks.open_sink(
+            os.path.join(self.path, 'rx90.idm'), sink_format, buffer_size
+        )
+        symo.write_line('Equations:')
+        model(self.robo, symo)
+        symo.file_close()
+        return symo
+
+    def test_text(self):
+        """The text sink writes the usual output."""
+        symo = self._write_model('text', buffer_size=7)
+        with open(symo.file_out.name) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(
+            symo.file_out.name, os.path.join(self.path, 'rx90.idm')
+        )
+        self.assertEqual(lines[0], 'Equations:')
+        self.assertEqual(lines[-1], '*=*')
+        sym = symo.order_list[0]
+        self.assertEqual(lines[1], '%s = %s;' % (sym, symo.sydi[sym]))
+        self.assertEqual(len(lines), len(symo.order_list) + 2)
+
+    def test_jsonl(self):
+        """The JSON lines sink writes one record per line."""
+        symo = self._write_model('jsonl')
+        self.assertTrue(symo.file_out.name.endswith('.jsonl'))
+        records = list(sinks.read_jsonl(symo.file_out.name))
+        self.assertEqual(records[0], {'text': 'Equations:\n'})
+        self.assertEqual(records[-1], {'text': '*=*\n'})
+        sym = symo.order_list[-1]
+        self.assertEqual(
+            records[-2], {'lhs': str(sym), 'rhs': str(symo.sydi[sym])}
+        )
+
+    def test_binary(self):
+        """The binary sink stores the equation DAG."""
+        symo = self._write_model('binary', buffer_size=50)
+        self.assertTrue(symo.file_out.name.endswith('.eqb'))
+        items = list(sinks.read_binary(symo.file_out.name))
+        self.assertEqual(items[0], ('text', 'Equations:\n'))
+        self.assertEqual(items[-1], ('text', '*=*\n'))
+        equations = [item[1:] for item in items if item[0] == 'equation']
+        self.assertEqual(
+            equations, [(sym, symo.sydi[sym]) for sym in symo.order_list]
+        )
+        # the shared subexpressions are stored once
+        tree_size = sum(
+            len(list(preorder_traversal(symo.sydi[sym]))) + 1
+            for sym in symo.order_list
+        )
+        self.assertLess(symo.file_out.num_nodes, tree_size)
+
+    def test_binary_floating(self):
+        """The numpy lines of a floating base model are kept as they
+        are in the binary sink."""
+        self.robo = samplerobots.planar2r()
+        self.robo.is_floating = True
+        model = nealgos.composite_inverse_dynmodel
+        symo = self._write_model('text', model=model)
+        with open(symo.file_out.name) as f:
+            text = f.read()
+        symo = self._write_model('binary', buffer_size=50, model=model)
+        lines = []
+        for item in sinks.read_binary(symo.file_out.name):
+            if item[0] == 'text':
+                lines.append(item[1])
+            else:
+                lines.append('%s = %s;\n' % item[1:])
+        self.assertIn('numMJE0 = numpy.zeros((6, 6));\n', lines)
+        self.assertEqual(''.join(lines), text)
+
+    def test_unknown(self):
+        """An unknown format is rejected."""
+        with self.assertRaises(ValueError):
+            sinks.open_sink(os.path.join(self.path, 'out'), 'xml')
+
+
+def run_tests():
+    """Load and run the unittests"""
+    unit_suite = unittest.TestLoader().loadTestsFromTestCase(TestSinks)
+    unittest.TextTestRunner(verbosity=2).run(unit_suite)
+
+
+def main():
+    """Main function."""
+    run_tests()
+
+
+if __name__ == '__main__':
+    main()
@@ -9,11 +9,21 @@
 """Unit test for SymbolManager class."""
 
 
+import glob
+import os
+import tempfile
 import unittest
+from cStringIO import StringIO
+from distutils.spawn import find_executable
 
-from sympy import sympify, var, Matrix
+from numpy import random, amax, array, abs as np_abs
+from sympy import sympify, var, Matrix, sin, cos
 from sympy.abc import A, B, C, X, Y, Z
 
+from pysymoro import geometry
+from pysymoro import invgeom
+from pysymoro import nealgos
+from symoroutils import samplerobots
 from symoroutils import symbolmgr
 from symoroutils import tools
 
@@ -46,6 +56,22 @@ class TestSymbolManager(unittest.TestCase):
         self.assertEqual(tools.get_trig_couple_names(expr2), set())
         expr3 = sympify("C2*S3*R + S1*C4*R")
         self.assertEqual(tools.get_trig_couple_names(expr3), set())
+        # only whole symbol names are considered
+        expr4 = sympify("FS1*C1 + CSE1*S3 + C2")
+        self.assertEqual(tools.get_trig_couple_names(expr4), set())
+        self.assertEqual(tools.trig_name(sympify('C1m2')), ('C', '1m2'))
+        self.assertEqual(tools.trig_name(sympify('FS1')), None)
+        cos_sym, sin_sym = tools.cos_sin_syms('mG4')
+        self.assertEqual(tools.trig_name(cos_sym), ('C', 'G4'))
+        self.assertEqual(tools.trig_name(-sin_sym), ('S', 'G4'))
+
+    def test_syms(self):
+        print("\n")
+        mx1, my1 = tools.syms('MX1, MY1')
+        self.assertEqual(mx1, sympify('MX1'))
+        self.assertIs(tools.syms('MX1, MY1')[1], my1)
+        self.assertEqual(tools.syms('th1:4'), sympify('th1, th2, th3'))
+        self.assertNotIn('MX1', globals())
 
     def test_name_operations(self):
         print("\n")
@@ -131,11 +157,322 @@ class TestSymbolManager(unittest.TestCase):
         e4ans = sympify("C3*D3*RL4*S5*(C2*D3 - RL4*S23)")
         self.assertEqual((self.symo.simp(e4)-e4ans).expand(), tools.ZERO)
 
+    def test_simp_cache(self):
+        print("\n")
+        symo = symbolmgr.SymbolManager(None)
+        expr = sympify("-C2**2*RL + S2*(D - RL*S2) + C2*C3 - S2*S3")
+        result = symo.simp(expr)
+        stats = symo.cache_stats()
+        self.assertEqual(stats['simp'], {'hits': 0, 'misses': 1, 'size': 1})
+        self.assertGreater(stats['count_ops']['hits'], 0)
+        self.assertEqual(symo.simp(expr), result)
+        self.assertEqual(symo.cache_stats()['simp']['hits'], 1)
+        self.assertEqual(
+            symbolmgr.SymbolManager(None, cache_size=0).simp(expr), result
+        )
+        symo.clear_caches()
+        self.assertEqual(symo.cache_stats()['simp']['size'], 0)
+        # least recently used entries are dropped
+        cache = tools.MemoCache(2)
+        cache.put(A, 1)
+        cache.put(B, 2)
+        self.assertEqual(cache.get(A), 1)
+        cache.put(C, 3)
+        self.assertNotIn(B, cache)
+        self.assertEqual(cache.get(B), None)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1, 'size': 2})
+
+    def test_signed_rev_dict(self):
+        print("\n")
+        store = symbolmgr.SignedRevDict()
+        u1, u2 = sympify('U1, U2')
+        expr = A*B*(X - Y) + C
+        store[expr] = u1
+        self.assertIn(expr, store)
+        self.assertNotIn(-expr, store)
+        self.assertEqual(store.find(-expr), -u1)
+        self.assertEqual(store.find(-A*B*(X - Y) - C), -u1)
+        self.assertEqual(store.find(A*B), None)
+        # an expression and its negation can have their own symbols
+        store[-expr] = u2
+        self.assertEqual(store.find(-expr), u2)
+        self.assertEqual(len(store), 2)
+        del store[expr]
+        self.assertEqual(store.find(expr), -u2)
+        self.assertEqual(store.get(expr), None)
+        self.assertEqual(dict(store.items()), {-expr: u2})
+        for expr in (A - B, B - A, A + B - C, -A*B, sympify(-3)):
+            self.assertNotEqual(
+                symbolmgr.SignedRevDict.is_negative(expr),
+                symbolmgr.SignedRevDict.is_negative(-expr)
+            )
+
+    def test_trig_replace(self):
+        print("\n")
+        symo = symbolmgr.SymbolManager(None)
+        th1, th2, d3 = var('th1, th2, D3')
+        robo_mat = Matrix([
+            [cos(th1)*cos(th2), -sin(th2)**2, d3*sin(-th1)],
+            [cos(th1 + th2), 1, sin(th1)*cos(th2) + sin(th1 + th2)]
+        ])
+        expected = robo_mat.subs({
+            cos(th1): sympify('C1'), sin(th1): sympify('S1'),
+            cos(th2): sympify('C2'), sin(th2): sympify('S2')
+        })
+        result = symo.trig_replace_all(
+            robo_mat[:, :], [(th1, 1), (th2, 2), (sympify(0), 3)]
+        )
+        self.assertEqual(result, expected)
+        self.assertEqual(symo.order_list, list(sympify('C1, S1, C2, S2')))
+        self.assertEqual(symo.sydi[sympify('S2')], sin(th2))
+        result = symo.trig_replace(result, th1 + th2, 12)
+        self.assertEqual(result[1, 0], sympify('C12'))
+
+    def test_unfold(self):
+        print("\n")
+        symo = symbolmgr.SymbolManager(None)
+        u1, u2, u3 = sympify('U1, U2, U3')
+        symo.add_to_dict(u1, A*B + C)
+        symo.add_to_dict(u2, u1*X)
+        symo.add_to_dict(u3, u2 + u1)
+        self.assertEqual(symo.unfold(u3 + Y), (A*B + C)*X + A*B + C + Y)
+        self.assertEqual(symo.unfolded[u2], (A*B + C)*X)
+        self.assertEqual(symo.unfold(u3, depth=1), u2 + u1)
+        self.assertEqual(symo.unfold(u3, depth=0), u3)
+        mat = symo.mat_unfold(Matrix([u2, u3]), depth=2)
+        self.assertEqual(mat, Matrix([(A*B + C)*X, u1*X + A*B + C]))
+        symo.clear_caches()
+        self.assertEqual(symo.unfolded, {})
+        symo.sydi[u1] = u3
+        self.assertRaises(ValueError, symo.unfold, u2)
+
+    def test_cse(self):
+        print("\n")
+        symo = symbolmgr.SymbolManager(None)
+        symo.add_to_dict(sympify('U1'), A*B*(X + Y) + C)
+        symo.add_to_dict(sympify('U2'), -A*B*(X + Y) + Z*C)
+        symo.add_to_dict(sympify('U3'), sympify('U1')*(X + Y))
+        before, after = symo.cse()
+        self.assertEqual(before, (6, 5))
+        self.assertEqual(after, (4, 3))
+        cse1, cse2 = sympify('CSE1, CSE2')
+        self.assertEqual(symo.order_list[:2], [cse1, cse2])
+        # the new symbols are the ones of the registry
+        self.assertIs(symo.order_list[0], tools.syms('CSE1'))
+        self.assertEqual(symo.sydi[cse1], X + Y)
+        self.assertEqual(symo.sydi[cse2], A*B*cse1)
+        self.assertEqual(symo.sydi[sympify('U2')], C*Z - cse2)
+        self.assertEqual(symo.revdi[X + Y], cse1)
+        self.assertEqual(symo.unfold(sympify('U3')),
+                         (A*B*(X + Y) + C)*(X + Y))
+
+    def test_cse_output(self):
+        print("\n")
+        symo = symbolmgr.SymbolManager(StringIO())
+        symo.add_to_dict(sympify('U1'), A*B*(X + Y) + C)
+        symo.add_to_dict(sympify('U2'), -A*B*(X + Y) + Z*C)
+        symo.cse(silent=True)
+        output = symo.file_out.getvalue()
+        # the rewritten model is written after the original one
+        self.assertLess(output.index('U2 = -A*B*(X + Y) + C*Z;'),
+                        output.index('CSE1 = A*B*(X + Y);'))
+        self.assertTrue(output.rstrip().endswith('U2 = C*Z - CSE1;'))
+
+    def test_cse_idm(self):
+        print("\n")
+        robo = samplerobots.sr400()
+        symo = symbolmgr.SymbolManager(None)
+        nealgos.fixed_inverse_dynmodel(robo, symo)
+        torques = [s for s in symo.order_list if str(s).startswith('GAM')]
+        args = (robo.q_vec, robo.qdot[1:], robo.qddot[1:])
+        idm = symo.gen_func('IDM_generated', torques, args, strict=False)
+        before, after = symo.cse()
+        self.assertLess(after[0], before[0])
+        idm_cse = symo.gen_func('IDM_cse', torques, args, strict=False)
+        for x in xrange(10):
+            vals = [random.normal(size=robo.nj) for i in xrange(3)]
+            self.assertLess(amax(np_abs(
+                array(idm(vals)) - array(idm_cse(vals)))), 1e-12)
+
+    def test_prune(self):
+        print("\n")
+        symo = symbolmgr.SymbolManager(None)
+        u1, u2, u3, u4 = sympify('U1, U2, U3, U4')
+        symo.add_to_dict(u1, A*B + C)
+        symo.add_to_dict(u2, u1*X)
+        symo.add_to_dict(u3, A*Y + Z)
+        symo.add_to_dict(u4, u2 + C)
+        graph = symo.dependency_graph()
+        self.assertEqual(graph[u4], {u2, C})
+        self.assertRaises(ValueError, symo.prune, [u4], [A, B], True)
+        self.assertEqual(symo.order_list, [u1, u2, u3, u4])
+        self.assertEqual(symo.prune([u4], [A, B, C, X], True), [u3])
+        self.assertEqual(symo.order_list, [u1, u2, u4])
+        self.assertNotIn(A*Y + Z, symo.revdi)
+        self.assertEqual(symo.unfold(u4), (A*B + C)*X + C)
+        self.assertEqual(symo.prune([u4], [u2], strict=False), [u1, u2])
+        self.assertEqual(symo.sydi, {u4: u2 + C})
+        self.assertEqual(symo.unfold(u4), u2 + C)
+
+    def test_prune_caches(self):
+        print("\n")
+        symo = symbolmgr.SymbolManager(None)
+        expr = sympify('C2*C3 - S2*S3')
+        c23 = sympify('C23')
+        self.assertEqual(symo.CS12_simp(expr), c23)
+        self.assertIn(c23, symo.sydi)
+        # the memoized result must not refer to a removed symbol
+        symo.prune([X], strict=False)
+        self.assertNotIn(c23, symo.sydi)
+        self.assertEqual(symo.CS12_simp(expr), c23)
+        self.assertIn(c23, symo.sydi)
+        symo.cse(write=False)
+        self.assertEqual(symo.cache_stats()['CS12_simp']['size'], 0)
+
+    def test_prune_idm(self):
+        print("\n")
+        robo = samplerobots.rx90()
+        symo = symbolmgr.SymbolManager(None)
+        nealgos.fixed_inverse_dynmodel(robo, symo)
+        torques = [s for s in symo.order_list if str(s).startswith('GAM')]
+        args = (robo.q_vec, robo.qdot[1:], robo.qddot[1:])
+        # the parameters of the robot are not given
+        self.assertRaises(ValueError, symo.gen_func_string,
+                          'IDM_generated', torques, args)
+        self.assertRaises(ValueError, symo.gen_func_string,
+                          'IDM_generated', torques, args, 'matlab')
+        idm = symo.gen_func('IDM_generated', torques, args, strict=False)
+        num_eqs = len(symo.order_list)
+        removed = symo.prune(torques[-1:], args, strict=False)
+        self.assertEqual(len(symo.order_list) + len(removed), num_eqs)
+        self.assertEqual(symo.order_list[-1], torques[-1])
+        idm6 = symo.gen_func('IDM6_generated', torques[-1:], args,
+                             strict=False)
+        vals = [random.normal(size=robo.nj) for i in xrange(3)]
+        self.assertEqual(idm(vals)[-1], idm6(vals)[0])
+
+
+@unittest.skipIf(find_executable(os.environ.get('CC', 'cc')) is None,
+                 "C compiler is not available")
+class TestCFunction(unittest.TestCase):
+    def setUp(self):
+        self.symo = symbolmgr.SymbolManager(None)
+        self.robo = samplerobots.rx90()
+
+    def test_dgm(self):
+        T = geometry.dgm(self.robo, self.symo, 0, self.robo.nf,
+                         fast_form=True, trig_subs=True)
+        f_py = self.symo.gen_func('DGM_py', T, self.robo.q_vec, strict=False)
+        f_c = self.symo.gen_func('DGM_c', T, self.robo.q_vec,
+                                 syntax='c', strict=False)
+        for x in xrange(20):
+            arg = random.normal(size=self.robo.nj)
+            self.assertEqual(f_py(arg), f_c(arg))
+
+    def test_calls(self):
+        T = geometry.dgm(self.robo, self.symo, 0, self.robo.nf,
+                         fast_form=True, trig_subs=True)
+        pattern = os.path.join(tempfile.gettempdir(), 'symoro-c-*')
+        num_dirs = len(glob.glob(pattern))
+        f_c = self.symo.gen_func('DGM_c', T, self.robo.q_vec,
+                                 syntax='c', strict=False)
+        # the temporary build folder is removed
+        self.assertEqual(len(glob.glob(pattern)), num_dirs)
+        self.assertIn('int DGM_c(', f_c.c_source)
+        # the results of the calls are independent
+        arg1 = random.normal(size=self.robo.nj)
+        res1 = f_c(arg1)
+        ref1 = [list(row) for row in res1]
+        f_c(random.normal(size=self.robo.nj))
+        self.assertEqual(res1, ref1)
+        self.assertEqual(f_c(arg1), ref1)
+
+    def test_igm(self):
+        invgeom._paul_solve(self.robo, self.symo, invgeom.T_GENERAL,
+                            0, self.robo.nf)
+        igm_py = self.symo.gen_func('IGM_py', self.robo.q_vec,
+                                    invgeom.T_GENERAL, strict=False)
+        igm_c = self.symo.gen_func('IGM_c', self.robo.q_vec,
+                                   invgeom.T_GENERAL, syntax='c', strict=False)
+        T = geometry.dgm(self.robo, self.symo, 0, self.robo.nf,
+                         fast_form=True, trig_subs=True)
+        f06 = self.symo.gen_func('DGM_generated1', T, self.robo.q_vec,
+                                 strict=False)
+        for x in xrange(20):
+            Ttest = f06(random.normal(size=self.robo.nj))
+            sol_py = igm_py(Ttest)
+            sol_c = igm_c(Ttest)
+            self.assertEqual(len(sol_py), len(sol_c))
+            for q_py, q_c in zip(sol_py, sol_c):
+                self.assertLess(amax(np_abs(
+                    [float(x) - y for x, y in zip(q_py, q_c)])), 1e-12)
+
+    def test_shapes(self):
+        u1 = sympify('U1')
+        self.symo.add_to_dict(u1, A*B)
+        for to_return in ([Matrix([[u1]]), u1], [[u1], [A]], u1,
+                          [u1, A], Matrix([[u1, A]])):
+            f_py = self.symo.gen_func('shape_py', to_return, [A, B])
+            f_c = self.symo.gen_func('shape_c', to_return, [A, B],
+                                     syntax='c')
+            self.assertEqual(f_c([2., 3.]), f_py([2., 3.]))
+
+    def test_c_string(self):
+        T = geometry.dgm(self.robo, self.symo, 0, self.robo.nf,
+                         fast_form=True, trig_subs=True)
+        c_string = self.symo.gen_func_string('DGM_c', T,
+                                             self.robo.q_vec, syntax='c',
+                                             strict=False)
+        self.assertIn('int DGM_c(const double *args, double *result)',
+                      c_string)
+        self.assertIn('double th1 = args[0];', c_string)
+
+
+class TestBatchFunction(unittest.TestCase):
+    def setUp(self):
+        self.symo = symbolmgr.SymbolManager(None)
+        self.robo = samplerobots.rx90()
+
+    def test_dgm(self):
+        T = geometry.dgm(self.robo, self.symo, 0, self.robo.nf,
+                         fast_form=True, trig_subs=True)
+        f06 = self.symo.gen_func('DGM_generated1', T, self.robo.q_vec,
+                                 strict=False)
+        f06_batch = self.symo.gen_func('DGM_batch', T, self.robo.q_vec,
+                                       batch=True, strict=False)
+        q_samples = random.normal(size=(30, self.robo.nj))
+        T_samples = f06_batch(q_samples)
+        self.assertEqual(T_samples.shape, (30, 4, 4))
+        for q, T_batch in zip(q_samples, T_samples):
+            self.assertLess(amax(np_abs(array(f06(q)) - T_batch)), 1e-12)
+
+    def test_idm(self):
+        nealgos.fixed_inverse_dynmodel(self.robo, self.symo)
+        torques = [s for s in self.symo.order_list
+                   if str(s).startswith('GAM')]
+        args = (self.robo.q_vec, self.robo.qdot[1:], self.robo.qddot[1:])
+        idm = self.symo.gen_func('IDM_generated', torques, args, strict=False)
+        idm_batch = self.symo.gen_func('IDM_batch', torques, args,
+                                       batch=True, strict=False)
+        samples = [random.normal(size=(30, self.robo.nj))
+                   for i in xrange(3)]
+        gam = idm_batch(samples)
+        self.assertEqual(gam.shape, (30, self.robo.nj))
+        for i in xrange(30):
+            gam_i = idm([x[i] for x in samples])
+            self.assertLess(amax(np_abs(array(gam_i) - gam[i])), 1e-12)
+
 
 def main():
     suite = unittest.TestLoader().loadTestsFromTestCase(
         TestSymbolManager
     )
+    suite.addTests(
+        unittest.TestLoader().loadTestsFromTestCase(TestCFunction)
+    )
+    suite.addTests(
+        unittest.TestLoader().loadTestsFromTestCase(TestBatchFunction)
+    )
     unittest.TextTestRunner(verbosity=2).run(suite)
 
 
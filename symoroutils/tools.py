@@ -11,12 +11,14 @@ SYMORO software package.
 """
 
 
+import operator
 import re
+from collections import OrderedDict
 
 from sympy import Matrix
 from sympy import Integer
 from sympy import sin, cos
-from sympy import Mul, Add, var
+from sympy import Mul, Add, symbols
 
 
 ZERO = Integer(0)
@@ -28,6 +30,7 @@ SIMPLE = 'Simple'
 TREE = 'Tree'
 TYPES = [SIMPLE, TREE, CLOSED_LOOP]
 INT_KEYS = ['ant', 'sigma', 'mu']
+CACHE_SIZE = 4096
 
 
 def skew(vec):
@@ -64,6 +67,61 @@ def skew2vec(mat):
     return Matrix([vec0, vec1, vec2])
 
 
+def zero_mask(mat):
+    """
+    Return the structural zeros of a matrix.
+
+    Args:
+        mat: A Matrix.
+    Returns:
+        A tuple of booleans in the order of the elements (row by row),
+        True for the elements equal to zero.
+    """
+    return tuple(elem == ZERO for elem in mat)
+
+
+def masked_mul(mat_a, mat_b, mask_a=None, mask_b=None):
+    """
+    Return the product mat_a * mat_b without computing the products of
+    the known zero elements. The result is the same as the one of the
+    Matrix product.
+
+    Args:
+        mat_a, mat_b: Matrices of compatible dimensions.
+        mask_a, mask_b: The zero masks of the matrices (see
+            `zero_mask`). They are computed if not given.
+    Returns:
+        The product (Matrix)
+    """
+    if mask_a is None:
+        mask_a = zero_mask(mat_a)
+    if mask_b is None:
+        mask_b = zero_mask(mat_b)
+    rows, inner, cols = mat_a.rows, mat_a.cols, mat_b.cols
+    if inner != mat_b.rows:
+        raise ValueError("Matrices size mismatch.")
+    elems_a = list(mat_a)
+    elems_b = list(mat_b)
+    # indices of the nonzero elements of the rows of a and columns of b
+    rows_a = [
+        set(k for k in xrange(inner) if not mask_a[(i*inner) + k])
+        for i in xrange(rows)
+    ]
+    cols_b = [
+        [k for k in xrange(inner) if not mask_b[(k*cols) + j]]
+        for j in xrange(cols)
+    ]
+    elems = []
+    for i in xrange(rows):
+        for j in xrange(cols):
+            terms = [
+                elems_a[(i*inner) + k] * elems_b[(k*cols) + j]
+                for k in cols_b[j] if k in rows_a[i]
+            ]
+            elems.append(reduce(operator.add, terms) if terms else ZERO)
+    return Matrix(rows, cols, elems)
+
+
 def l2str(list_var, spacing=8):
     """Converts a list into string, that will be
     written into the text table.
@@ -90,17 +148,59 @@ def l2str(list_var, spacing=8):
     return ret_str
 
 
-def find_trig_names(sym, pref=r'', pref_len=0, post=r'', post_len=0):
-    search_res = re.findall(pref + r'[AGm0-9]*' + post, str(sym))
-    if post_len == 0:
-        return set([s[pref_len:] for s in search_res])
-    else:
-        return set([s[pref_len:-post_len] for s in search_res])
+# names -> symbols given by `syms`
+SYMBOLS = {}
+# symbol -> (prefix, angle name) of the C and S symbols, None for
+# the other symbols
+TRIG_NAMES = {}
+TRIG_PATTERN = re.compile(r'([CS])([AGm0-9]+)$')
+
+
+def syms(names):
+    """
+    Return the symbols of the given names. The names are given as to
+    sympy.symbols, for example 'QP1', 'MX1, MY1, MZ1' or 'th1:7'. The
+    symbols are kept in a process-wide registry and, unlike with
+    sympy.var, nothing is injected in the global namespace of the
+    caller.
+    """
+    try:
+        return SYMBOLS[names]
+    except KeyError:
+        SYMBOLS[names] = symbols(names)
+        return SYMBOLS[names]
+
+
+def trig_name(sym):
+    """
+    Return the (prefix, angle name) of a cosine or sine symbol such as
+    ('C', '23') for C23, or None for the other symbols. The symbols
+    created by `cos_sin_syms` are registered, the names of the other
+    ones are parsed once.
+    """
+    try:
+        return TRIG_NAMES[sym]
+    except KeyError:
+        match = TRIG_PATTERN.match(sym.name)
+        TRIG_NAMES[sym] = match.groups() if match else None
+        return TRIG_NAMES[sym]
+
+
+def find_trig_names(sym):
+    """
+    Return the sets of the angle names of the cosine and sine symbols
+    in an expression.
+    """
+    names = {'C': set(), 'S': set()}
+    for atom in sym.free_symbols:
+        info = trig_name(atom)
+        if info is not None:
+            names[info[0]].add(info[1])
+    return names['C'], names['S']
 
 
 def get_trig_couple_names(sym):
-    names_s = find_trig_names(sym, r'S', 1)
-    names_c = find_trig_names(sym, r'C', 1)
+    names_c, names_s = find_trig_names(sym)
     return names_c & names_s
 
 
@@ -178,10 +278,79 @@ def ang_sum(np1, np2, nm1, nm2):
 
 def cos_sin_syms(name):
     if isinstance(name, str) and name[0] == 'm':
-        cos_term, sin_term = var('C{0}, S{0}'.format(name[1:]))
+        cos_term, sin_term = cos_sin_syms(name[1:])
         return cos_term, -sin_term
     else:
-        return var('C{0}, S{0}'.format(name))
+        cos_term, sin_term = syms('C{0}, S{0}'.format(name))
+        TRIG_NAMES[cos_term] = ('C', str(name))
+        TRIG_NAMES[sin_term] = ('S', str(name))
+        return cos_term, sin_term
+
+
+class MemoCache(object):
+    """
+    A bounded memo cache. When it is full the least recently used
+    entry is dropped. The number of hits and misses is recorded.
+    """
+    def __init__(self, max_size=CACHE_SIZE):
+        """
+        Constructor period.
+
+        Args:
+            max_size: The maximum number of entries. With 0 nothing is
+                stored.
+        """
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, default=None):
+        """
+        Return the value of a key and mark it as recently used.
+        """
+        try:
+            value = self.entries.pop(key)
+        except KeyError:
+            self.misses += 1
+            return default
+        self.entries[key] = value
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Store the value of a key.
+        """
+        if self.max_size <= 0:
+            return
+        self.entries.pop(key, None)
+        self.entries[key] = value
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove all the entries and reset the statistics.
+        """
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """
+        Return a dictionary with the hits, misses and size.
+        """
+        return {
+            'hits': self.hits, 'misses': self.misses,
+            'size': len(self.entries)
+        }
 
 
 def sym_less(val_a, val_b):
@@ -190,6 +359,33 @@ def sym_less(val_a, val_b):
     return val_a_measure < val_b_measure
 
 
+def count_mul_add(sym, in_mul=False):
+    """Returns the number of multiplications and additions needed
+    to compute the expression. Sign changes are not counted,
+    divisions are counted as multiplications, integer powers as
+    repeated multiplications.
+    """
+    if not hasattr(sym, 'args') or sym.is_Atom:
+        return 0, 0
+    muls, adds = 0, 0
+    for arg in sym.args:
+        arg_muls, arg_adds = count_mul_add(arg, sym.is_Mul)
+        muls += arg_muls
+        adds += arg_adds
+    if sym.is_Add:
+        adds += len(sym.args) - 1
+    elif sym.is_Mul:
+        coef, term = sym.as_coeff_Mul()
+        muls += len(Mul.make_args(term)) - 1
+        if coef != ONE and coef != -ONE:
+            muls += 1
+    elif sym.is_Pow and sym.exp.is_Integer:
+        muls += abs(int(sym.exp)) - 1
+        if sym.exp < 0 and not in_mul:
+            muls += 1
+    return muls, adds
+
+
 def get_angles(expr):
     angles_s = set()
     for sin_term in expr.atoms(sin):
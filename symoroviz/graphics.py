@@ -52,6 +52,8 @@ class VizGlCanvas(GLCanvas):
         self.q_pas_sym = self.robo.q_passive
         self.q_act_sym = self.robo.q_active
         self.pars_num = params
+        # the robot with the numerical values of the parameters
+        self.robo_num = robo.specialize(params)
         self.init = 0.0
         self.distance = 5.0
         self.fov = 40.0
@@ -188,8 +190,10 @@ class VizGlCanvas(GLCanvas):
             if i > 0 and jnt.r == 0 and jnt.d == 0 and jnt.b == 0:
                 self.dgms[i] = self.dgm_for_frame(self.robo.ant[i])
             else:
-                symo = symbolmgr.SymbolManager(sydi=self.pars_num)
-                T = dgm(self.robo, symo, 0, i, fast_form=True, trig_subs=True)
+                symo = symbolmgr.SymbolManager()
+                T = dgm(
+                    self.robo_num, symo, 0, i, fast_form=True, trig_subs=True
+                )
                 self.dgms[i] = symo.gen_func('dgm_generated', T, self.q_sym)
         return self.dgms[i]
 
@@ -230,8 +234,8 @@ class VizGlCanvas(GLCanvas):
         self.find_solution(qs_act, qs_pas)
 
     def generate_loop_fcn(self):
-        symo = symbolmgr.SymbolManager(sydi=self.pars_num)
-        loop_solve(self.robo, symo)
+        symo = symbolmgr.SymbolManager()
+        loop_solve(self.robo_num, symo)
         self.l_solver = symo.gen_func(
             'IGM_gen', self.q_pas_sym, self.q_act_sym
         )